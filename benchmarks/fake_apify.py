@@ -0,0 +1,265 @@
+import gzip
+import itertools
+import json
+import random
+import threading
+import time
+import zlib
+from typing import Dict, Iterable, List, Optional
+
+from apify_shared.models import ListPage
+
+from benchmarks.payloads import generate_listings
+
+TERMINAL_STATUSES = ("SUCCEEDED", "FAILED", "TIMED-OUT", "ABORTED")
+
+
+class FakeApifyError(Exception):
+    """Raised where the Apify API would answer with an error response."""
+
+    def __init__(self, message: str, status_code: int = 400):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+def load_dataset(path: str) -> List[Dict]:
+    """Load a recorded dataset from a JSON array, JSON lines or gzipped JSON lines file."""
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, "rt", encoding="utf-8") as fh:
+        if path.endswith(".json"):
+            return json.load(fh)
+        return [json.loads(line) for line in fh if line.strip()]
+
+
+class _FakeRun:
+    """Timeline of one simulated actor run."""
+
+    def __init__(self, run_id: str, dataset_id: str, items: List[Dict], status: str, started: float,
+                 run_seconds: float, ready_delay: float, stream_items: bool):
+        self.id = run_id
+        self.dataset_id = dataset_id
+        self.items = items
+        self.final_status = status
+        self.started = started
+        self.finished = started + run_seconds
+        self.ready = started + ready_delay
+        self.stream_items = stream_items
+
+    def status(self, now: float) -> str:
+        """Run status at a point in time."""
+        return self.final_status if now >= self.finished else "RUNNING"
+
+    def visible_items(self, now: float) -> int:
+        """Number of dataset items readable at a point in time."""
+        if now < self.ready:
+            return 0
+        if now >= self.finished:
+            return len(self.items)
+        if not self.stream_items:
+            return 0
+        # Items are pushed at a steady rate while the run is in progress
+        return int(len(self.items) * (now - self.started) / (self.finished - self.started))
+
+    def as_dict(self, now: float) -> Dict:
+        """Run object as returned by the Apify API."""
+        status = self.status(now)
+        return {
+            "id": self.id,
+            "status": status,
+            "defaultDatasetId": self.dataset_id,
+            "startedAt": self.started,
+            "finishedAt": self.finished if status in TERMINAL_STATUSES else None,
+        }
+
+
+class FakeApifyClient:
+    """In-process stand-in for ``ApifyClient`` serving synthetic or recorded datasets.
+
+    Supports the calls the scraper makes: ``actor(id).start/call``,
+    ``run(id).get/wait_for_finish`` and ``dataset(id).list_items``. Runs take
+    real wall-clock time, so polling, timeouts and concurrency behave as they
+    would against the service.
+    """
+
+    def __init__(self, datasets: Optional[Dict[str, List[Dict]]] = None, run_seconds: float = 0.0,
+                 page_latency: float = 0.0, ready_delay: float = 0.0, stream_items: bool = False,
+                 fail_locations: Iterable[str] = (), failure_rate: float = 0.0,
+                 failure_mode: str = "error", seed: int = 0, max_concurrent_runs: Optional[int] = None):
+        """
+        Configure the simulated backend.
+
+        Args:
+            datasets: Recorded datasets by location; other locations get synthetic listings
+            run_seconds: Duration of every actor run
+            page_latency: Delay of every dataset page request
+            ready_delay: Seconds after the start of a run during which its dataset reads as empty
+            stream_items: Make items readable progressively while the run is in progress
+            fail_locations: Locations whose runs always fail
+            failure_rate: Probability that any other run fails
+            failure_mode: "error" to raise FakeApifyError when the run is started,
+                "failed" to let the run finish with status FAILED and an empty dataset
+            seed: Seed for synthetic datasets and random failures
+            max_concurrent_runs: Account limit on runs in progress; starts beyond it are
+                refused with status 402 like the service's memory quota, without creating a run
+        """
+        if failure_mode not in ("error", "failed"):
+            raise ValueError("failure_mode must be 'error' or 'failed'")
+        self.datasets = {location.strip().lower(): items for location, items in (datasets or {}).items()}
+        self.run_seconds = run_seconds
+        self.page_latency = page_latency
+        self.ready_delay = ready_delay
+        self.stream_items = stream_items
+        self.fail_locations = {location.strip().lower() for location in fail_locations}
+        self.failure_rate = failure_rate
+        self.failure_mode = failure_mode
+        self.seed = seed
+        self.max_concurrent_runs = max_concurrent_runs
+
+        self._rng = random.Random(seed)
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._runs: Dict[str, _FakeRun] = {}
+        self._datasets: Dict[str, _FakeRun] = {}
+        self.stats = {"runs": 0, "failed_runs": 0, "aborted_runs": 0, "refused_starts": 0, "pages": 0,
+                      "items": 0, "peak_concurrent_runs": 0}
+
+    def actor(self, actor_id: str) -> "_FakeActorClient":
+        """Return a client for an actor; any actor ID is accepted."""
+        return _FakeActorClient(self, actor_id)
+
+    def run(self, run_id: str) -> "_FakeRunClient":
+        """Return a client for a run started earlier."""
+        return _FakeRunClient(self, run_id)
+
+    def dataset(self, dataset_id: str) -> "_FakeDatasetClient":
+        """Return a client for a run's default dataset."""
+        return _FakeDatasetClient(self, dataset_id)
+
+    def _dataset_for(self, run_input: Dict) -> List[Dict]:
+        """Pick the recorded or synthetic listings for an actor input."""
+        location = (run_input.get("locationQueries") or [""])[0]
+        limit = run_input.get("maxListings") or 300
+        key = location.strip().lower()
+        if key in self.datasets:
+            return self.datasets[key][:limit]
+        # The same location always yields the same listings
+        return generate_listings(limit, seed=zlib.crc32(key.encode("utf-8")) ^ self.seed, amenities=False)
+
+    def _start(self, run_input: Dict) -> _FakeRun:
+        """Register a new run, deciding up front whether it fails."""
+        run_input = run_input or {}
+        location = (run_input.get("locationQueries") or [""])[0].strip().lower()
+        with self._lock:
+            now = time.monotonic()
+            running = sum(run.status(now) == "RUNNING" for run in self._runs.values()) + 1
+            if self.max_concurrent_runs is not None and running > self.max_concurrent_runs:
+                self.stats["refused_starts"] += 1
+                raise FakeApifyError("By launching this job you will exceed the memory limit of your account",
+                                     status_code=402)
+            fails = location in self.fail_locations or self._rng.random() < self.failure_rate
+            number = next(self._ids)
+            self.stats["runs"] += 1
+            self.stats["failed_runs"] += fails
+            self.stats["peak_concurrent_runs"] = max(self.stats["peak_concurrent_runs"], running)
+
+        if fails and self.failure_mode == "error":
+            raise FakeApifyError(f"Actor run for '{location}' could not be started")
+
+        run = _FakeRun(
+            run_id=f"run-{number}",
+            dataset_id=f"dataset-{number}",
+            items=[] if fails else self._dataset_for(run_input),
+            status="FAILED" if fails else "SUCCEEDED",
+            started=now,
+            run_seconds=self.run_seconds,
+            ready_delay=self.ready_delay,
+            stream_items=self.stream_items,
+        )
+        with self._lock:
+            self._runs[run.id] = run
+            self._datasets[run.dataset_id] = run
+        return run
+
+    def _get_run(self, run_id: str) -> _FakeRun:
+        """Look up a run, failing like the API does for unknown IDs."""
+        try:
+            return self._runs[run_id]
+        except KeyError:
+            raise FakeApifyError(f"Run {run_id} was not found", status_code=404) from None
+
+
+class _FakeActorClient:
+    """Actor endpoints of the fake client."""
+
+    def __init__(self, backend: FakeApifyClient, actor_id: str):
+        self.backend = backend
+        self.actor_id = actor_id
+
+    def start(self, *, run_input: Dict = None, wait_for_finish: int = None, **kwargs) -> Dict:
+        """Start a run, optionally waiting up to wait_for_finish seconds for it to end."""
+        run = self.backend._start(run_input)
+        if wait_for_finish:
+            return self.backend.run(run.id).wait_for_finish(wait_secs=wait_for_finish)
+        return run.as_dict(time.monotonic())
+
+    def call(self, *, run_input: Dict = None, wait_secs: int = None, **kwargs) -> Dict:
+        """Start a run and wait for it to finish, or for wait_secs seconds."""
+        run = self.backend._start(run_input)
+        return self.backend.run(run.id).wait_for_finish(wait_secs=wait_secs)
+
+
+class _FakeRunClient:
+    """Run endpoints of the fake client."""
+
+    def __init__(self, backend: FakeApifyClient, run_id: str):
+        self.backend = backend
+        self.run_id = run_id
+
+    def get(self) -> Dict:
+        """Return the run object."""
+        return self.backend._get_run(self.run_id).as_dict(time.monotonic())
+
+    def wait_for_finish(self, *, wait_secs: int = None) -> Dict:
+        """Block until the run ends or wait_secs elapse, then return the run object."""
+        run = self.backend._get_run(self.run_id)
+        now = time.monotonic()
+        until = run.finished if wait_secs is None else min(run.finished, now + wait_secs)
+        if until > now:
+            time.sleep(until - now)
+        return run.as_dict(time.monotonic())
+
+    def abort(self, **kwargs) -> Dict:
+        """Stop the run if it is still in progress and return the run object."""
+        run = self.backend._get_run(self.run_id)
+        with self.backend._lock:
+            now = time.monotonic()
+            if run.status(now) == "RUNNING":
+                run.final_status = "ABORTED"
+                run.finished = now
+                self.backend.stats["aborted_runs"] += 1
+        return run.as_dict(now)
+
+
+class _FakeDatasetClient:
+    """Dataset endpoints of the fake client."""
+
+    def __init__(self, backend: FakeApifyClient, dataset_id: str):
+        self.backend = backend
+        self.dataset_id = dataset_id
+
+    def list_items(self, *, offset: int = None, limit: int = None, **kwargs) -> ListPage:
+        """Return one page of the items written so far."""
+        run = self.backend._datasets.get(self.dataset_id)
+        if run is None:
+            raise FakeApifyError(f"Dataset {self.dataset_id} was not found", status_code=404)
+        if self.backend.page_latency:
+            time.sleep(self.backend.page_latency)
+
+        offset = offset or 0
+        visible = run.visible_items(time.monotonic())
+        end = visible if limit is None else min(visible, offset + limit)
+        items = run.items[offset:end] if end > offset else []
+        with self.backend._lock:
+            self.backend.stats["pages"] += 1
+            self.backend.stats["items"] += len(items)
+        return ListPage({"items": items, "offset": offset, "limit": limit or 0, "total": visible})
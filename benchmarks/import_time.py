@@ -0,0 +1,70 @@
+import argparse
+import os
+import subprocess
+import sys
+from typing import Dict, List, Optional, Tuple
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SRC_DIR = os.path.join(ROOT, "src")
+
+# Libraries the app only needs once a chart, map or Excel export is drawn. streamlit itself
+# imports the lazy plotly.graph_objects stub; the first figure built loads plotly.offline.
+DEFERRED_MODULES = ("plotly.express", "plotly.offline", "folium", "branca", "streamlit_folium", "openpyxl")
+
+
+def measure_imports(module: str = "main", cwd: str = SRC_DIR) -> Dict[str, Tuple[int, int]]:
+    """
+    Import a module in a fresh interpreter under ``python -X importtime``.
+
+    The app module is imported the way ``streamlit run src/main.py`` finds it,
+    from src/, without running its main().
+
+    Args:
+        module: Module to import
+        cwd: Directory the module is imported from
+
+    Returns:
+        Self and cumulative import time in microseconds of every module imported, by name
+    """
+    env = dict(os.environ)
+    # The app checks for a token when it runs, not when it is imported
+    env.setdefault("APIFY_API_TOKEN", "import-time")
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [ROOT, env.get("PYTHONPATH")]))
+    output = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                            cwd=cwd, env=env, capture_output=True, text=True, check=True)
+
+    times: Dict[str, Tuple[int, int]] = {}
+    for line in output.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        if self_us.strip().isdigit():
+            times[name.strip()] = (int(self_us), int(cumulative_us))
+    return times
+
+
+def slowest(times: Dict[str, Tuple[int, int]], count: int = 15) -> List[Tuple[str, int]]:
+    """Top-level packages with the largest cumulative import time, slowest first."""
+    packages = {name: cumulative for name, (_, cumulative) in times.items() if "." not in name}
+    return sorted(packages.items(), key=lambda item: item[1], reverse=True)[:count]
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Print the cold-start import time of the app and its slowest dependencies."""
+    parser = argparse.ArgumentParser(description="Measure the app's cold-start import time")
+    parser.add_argument("--module", default="main", help="Module imported from src/ (default: main)")
+    parser.add_argument("--top", type=int, default=15, help="Number of packages listed")
+    args = parser.parse_args(argv)
+
+    times = measure_imports(args.module)
+    print(f"{args.module}: {times[args.module][1] / 1000:.0f} ms cumulative")
+    for name, cumulative in slowest(times, args.top):
+        print(f"  {name:<24} {cumulative / 1000:8.1f} ms")
+    loaded = [name for name in DEFERRED_MODULES if name in times]
+    if loaded:
+        print(f"Imported at startup although deferred: {', '.join(loaded)}")
+    return 1 if loaded else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,149 @@
+import argparse
+import json
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from benchmarks.fake_apify import FakeApifyClient, load_dataset
+from src.governor import RunGovernor
+from src.scraper import AirbnbScraper
+
+
+def scrape_market(scraper: AirbnbScraper, location: str, max_results: int, stream: bool = False) -> Dict:
+    """Scrape and convert one market, recording the scraper's run metrics and the total time."""
+    start = time.perf_counter()
+    metrics: Dict = {}
+    record = {"location": location, "listings": 0, "rows": 0, "first_item": None, "run_complete": None,
+              "polls": 0, "seconds": None, "error": None}
+    try:
+        listings = scraper.iter_listings(location, max_results=max_results, metrics=metrics, stream=stream)
+        record["rows"] = len(scraper.convert_to_dataframe(listings))
+    except Exception as e:
+        record["error"] = str(e)
+    record["listings"] = metrics.get("items") or 0
+    record["first_item"] = metrics.get("time_to_first_item")
+    record["run_complete"] = metrics.get("time_to_complete")
+    record["polls"] = metrics.get("polls", 0)
+    record["seconds"] = time.perf_counter() - start
+    return record
+
+
+def _percentiles(values: List[float]) -> Dict[str, Optional[float]]:
+    """Summarize a latency sample."""
+    if not values:
+        return {"p50": None, "p95": None, "max": None}
+    return {
+        "p50": float(np.percentile(values, 50)),
+        "p95": float(np.percentile(values, 95)),
+        "max": float(max(values)),
+    }
+
+
+def run_load_test(client: FakeApifyClient, markets: int, listings: int, concurrency: int,
+                  stream: bool = False, governor: Optional[RunGovernor] = None) -> Dict:
+    """
+    Run concurrent searches against a fake Apify backend.
+
+    Args:
+        client: Configured fake backend
+        markets: Number of distinct markets searched
+        listings: Listings requested per market
+        concurrency: Searches in flight at the same time
+        stream: Read listings while the actor runs are in progress
+        governor: Run governor of the searches (default: one without limits)
+
+    Returns:
+        Summary with per-market records, latency percentiles and throughput
+    """
+    governor = governor or RunGovernor(max_concurrent=None, starts_per_minute=None)
+    scraper = AirbnbScraper(client=client, governor=governor)
+    locations = [f"Market {index}" for index in range(markets)]
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        records = list(executor.map(lambda location: scrape_market(scraper, location, listings, stream), locations))
+    wall = time.perf_counter() - start
+
+    succeeded = [r for r in records if r["error"] is None]
+    total_listings = sum(r["listings"] for r in succeeded)
+    return {
+        "markets": markets,
+        "concurrency": concurrency,
+        "failed": len(records) - len(succeeded),
+        "wall_seconds": wall,
+        "listings_per_second": total_listings / wall if wall else None,
+        "latency": _percentiles([r["seconds"] for r in succeeded]),
+        "time_to_complete": _percentiles([r["run_complete"] for r in succeeded if r["run_complete"] is not None]),
+        "time_to_first_item": _percentiles([r["first_item"] for r in succeeded if r["first_item"] is not None]),
+        "backend": dict(client.stats),
+        "governor": governor.stats(),
+        "records": records,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Run a load test from the command line."""
+    parser = argparse.ArgumentParser(description="Load-test concurrent scrapes against a local fake Apify backend")
+    parser.add_argument("--markets", type=int, default=20, help="Number of markets searched")
+    parser.add_argument("--listings", type=int, default=300, help="Listings per market")
+    parser.add_argument("--concurrency", type=int, default=4, help="Searches in flight at the same time")
+    parser.add_argument("--run-seconds", type=float, default=1.0, help="Duration of each actor run")
+    parser.add_argument("--page-latency", type=float, default=0.02, help="Delay of each dataset page request")
+    parser.add_argument("--ready-delay", type=float, default=0.0,
+                        help="Seconds after a run starts during which its dataset reads as empty")
+    parser.add_argument("--stream-items", action="store_true", help="Make items readable while runs are in progress")
+    parser.add_argument("--stream", action="store_true",
+                        help="Read listings while runs are in progress (implies --stream-items)")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="Probability that a run fails")
+    parser.add_argument("--failure-mode", choices=["error", "failed"], default="error",
+                        help="Fail when starting the run, or finish the run with status FAILED")
+    parser.add_argument("--dataset", metavar="FILE",
+                        help="Recorded dataset (.json, .jsonl or .jsonl.gz) replayed for every market")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for synthetic datasets and failures")
+    parser.add_argument("--account-runs", type=int, default=None,
+                        help="Runs the fake account allows at once; further starts are refused")
+    parser.add_argument("--max-runs", type=int, default=None, help="Governor limit on runs in flight")
+    parser.add_argument("--starts-per-minute", type=float, default=None, help="Governor limit on run starts")
+    parser.add_argument("--burst", type=int, default=1, help="Run starts the governor admits back to back")
+    parser.add_argument("--output", metavar="FILE", help="Write the full summary as JSON")
+    args = parser.parse_args(argv)
+
+    datasets = None
+    if args.dataset:
+        recorded = load_dataset(args.dataset)
+        datasets = {f"Market {index}": recorded for index in range(args.markets)}
+
+    client = FakeApifyClient(
+        datasets=datasets,
+        run_seconds=args.run_seconds,
+        page_latency=args.page_latency,
+        ready_delay=args.ready_delay,
+        stream_items=args.stream_items or args.stream,
+        failure_rate=args.failure_rate,
+        failure_mode=args.failure_mode,
+        seed=args.seed,
+        max_concurrent_runs=args.account_runs,
+    )
+    governor = RunGovernor(args.max_runs, args.starts_per_minute, args.burst)
+    summary = run_load_test(client, args.markets, args.listings, args.concurrency, args.stream, governor)
+
+    print(f"{args.markets} markets, concurrency {args.concurrency}: {summary['wall_seconds']:.2f}s wall, "
+          f"{summary['listings_per_second']:.0f} listings/s, {summary['failed']} failed")
+    for name in ("latency", "time_to_complete", "time_to_first_item"):
+        stats = summary[name]
+        if stats["p50"] is not None:
+            print(f"{name:<20} p50 {stats['p50']:.3f}s  p95 {stats['p95']:.3f}s  max {stats['max']:.3f}s")
+    print(f"backend: {summary['backend']}")
+    print(f"governor: {summary['governor']}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as fh:
+            json.dump(summary, fh, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,154 @@
+import random
+from typing import Dict, Iterator, List
+
+ROOM_TYPES = ["Entire home/apt", "Private room", "Shared room", "Hotel room"]
+ROOM_TYPE_WEIGHTS = [0.6, 0.3, 0.04, 0.06]
+
+AMENITY_CATEGORIES = {
+    "Bathroom": ["Hair dryer", "Shampoo", "Hot water", "Bathtub"],
+    "Kitchen and dining": ["Kitchen", "Microwave", "Coffee maker", "Dishwasher", "Oven"],
+    "Internet and office": ["Wifi", "Dedicated workspace"],
+    "Heating and cooling": ["Air conditioning", "Heating", "Ceiling fan"],
+    "Home safety": ["Smoke alarm", "Carbon monoxide alarm", "Fire extinguisher", "First aid kit"],
+    "Parking and facilities": ["Free parking on premises", "Elevator", "Pool", "Gym"],
+}
+
+# City centres the coordinates are scattered around
+CITIES = [
+    (51.5074, -0.1278),
+    (48.8566, 2.3522),
+    (40.7128, -74.0060),
+    (41.3874, 2.1686),
+]
+
+
+def _price(rng: random.Random) -> Dict:
+    """Build a price block in one of the shapes the actor returns."""
+    amount = round(rng.lognormvariate(4.8, 0.6))
+    shape = rng.random()
+    if shape < 0.6:
+        return {"label": f"${amount:,} per night", "qualifier": "night"}
+    if shape < 0.8:
+        return {
+            "price": f"${amount:,}",
+            "qualifier": "night",
+            "breakDown": {
+                "basePrice": {"price": f"${amount * 5:,}"},
+                "serviceFee": {"price": f"${round(amount * 0.14):,}"},
+            },
+        }
+    if shape < 0.95:
+        return {"label": f"${amount:,} night", "originalPrice": f"${round(amount * 1.2):,}"}
+    return {"price": float(amount), "qualifier": "night"}
+
+
+def _rating(rng: random.Random) -> Dict:
+    """Build a rating block with category scores around the overall score."""
+    overall = round(min(5.0, max(3.0, rng.gauss(4.7, 0.25))), 2)
+
+    def near() -> float:
+        return round(min(5.0, max(1.0, overall + rng.gauss(0, 0.15))), 2)
+
+    return {
+        "guestSatisfaction": overall,
+        "reviewsCount": int(rng.paretovariate(1.2) * 5),
+        "accuracy": near(),
+        "checking": near(),
+        "cleanliness": near(),
+        "communication": near(),
+        "location": near(),
+        "value": near(),
+    }
+
+
+def _amenities(rng: random.Random) -> List[Dict]:
+    """Build an amenities block grouped by category."""
+    return [
+        {
+            "title": category,
+            "values": [{"title": name, "available": rng.random() < 0.7} for name in names],
+        }
+        for category, names in AMENITY_CATEGORIES.items()
+    ]
+
+
+def _make_invalid(listing: Dict, rng: random.Random) -> None:
+    """Damage a listing the way real payloads occasionally are."""
+    fault = rng.randrange(7)
+    if fault == 0:
+        listing["price"] = {"label": "Price unavailable"}
+    elif fault == 1:
+        del listing["price"]
+    elif fault == 2:
+        del listing["coordinates"]
+    elif fault == 3:
+        listing["rating"] = None
+    elif fault == 4:
+        # Numeric strings instead of numbers
+        listing["rating"]["reviewsCount"] = str(listing["rating"]["reviewsCount"])
+        listing["rating"]["guestSatisfaction"] = str(listing["rating"]["guestSatisfaction"])
+    elif fault == 5:
+        listing["subDescription"] = {"items": ["Studio", "1 bed"]}
+    else:
+        listing["price"] = {"price": "", "qualifier": "night"}
+
+
+def generate_listing(rng: random.Random, index: int, invalid_rate: float = 0.05,
+                     amenities: bool = True) -> Dict:
+    """
+    Generate one raw listing as returned by the Apify Airbnb actor.
+
+    Args:
+        rng: Random source; a seeded instance makes the output reproducible
+        index: Position of the listing, used for its ID and title
+        invalid_rate: Share of listings with a missing or malformed field
+        amenities: Include the amenities block, which dominates payload size
+
+    Returns:
+        Raw listing dict
+    """
+    lat, lon = rng.choice(CITIES)
+    guests = rng.choices([1, 2, 3, 4, 5, 6, 8, 10, 16], [5, 30, 10, 25, 5, 12, 6, 4, 3])[0]
+    listing_id = str(10_000_000 + index)
+    listing = {
+        "id": listing_id,
+        "url": f"https://www.airbnb.com/rooms/{listing_id}",
+        "title": f"{rng.choice(['Cosy', 'Bright', 'Modern', 'Quiet', 'Spacious'])} "
+                 f"{rng.choice(['flat', 'loft', 'studio', 'house', 'room'])} #{index}",
+        "description": "Lovely place close to transport and shops. " * rng.randint(1, 4),
+        "thumbnail": f"https://a0.muscache.com/im/pictures/{listing_id}.jpg",
+        "roomType": rng.choices(ROOM_TYPES, ROOM_TYPE_WEIGHTS)[0],
+        "isSuperHost": rng.random() < 0.3,
+        "coordinates": {
+            "latitude": lat + rng.gauss(0, 0.03),
+            "longitude": lon + rng.gauss(0, 0.05),
+        },
+        "price": _price(rng),
+        "rating": _rating(rng),
+        "subDescription": {
+            "title": "Entire rental unit",
+            "items": [f"{guests} guests", f"{max(1, guests // 2)} bedrooms", f"{max(1, guests // 2)} beds"],
+        },
+    }
+    if amenities:
+        listing["amenities"] = _amenities(rng)
+    if rng.random() < 0.2:
+        # Some payloads carry the capacity directly
+        listing["personCapacity"] = guests
+    if rng.random() < invalid_rate:
+        _make_invalid(listing, rng)
+    return listing
+
+
+def iter_listings(count: int, seed: int = 0, invalid_rate: float = 0.05,
+                  amenities: bool = True) -> Iterator[Dict]:
+    """Yield count synthetic listings. The same seed always yields the same payloads."""
+    rng = random.Random(seed)
+    for index in range(count):
+        yield generate_listing(rng, index, invalid_rate, amenities)
+
+
+def generate_listings(count: int, seed: int = 0, invalid_rate: float = 0.05,
+                      amenities: bool = True) -> List[Dict]:
+    """Return count synthetic listings as a list."""
+    return list(iter_listings(count, seed, invalid_rate, amenities))
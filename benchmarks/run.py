@@ -0,0 +1,308 @@
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.payloads import generate_listings
+from src.scraper import AirbnbScraper
+from src.utils import calculate_market_metrics, prepare_amenities_analysis, filter_listings
+from src.filters import FilterIndex
+from src.amenities import AmenityMatrix
+from src.spatial import SpatialIndex
+from src.dataset import ListingDataset, write_listings
+from src.metrics import compute_aggregates
+from src.maps import build_listings_map
+from src.exports import EXPORT_FORMATS
+
+DEFAULT_SIZES = [1_000, 10_000, 100_000]
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_BASELINE = os.path.join(BENCHMARK_DIR, "baseline.json")
+DEFAULT_OUTPUT = os.path.join(BENCHMARK_DIR, "results.json")
+
+# Allowed slowdown against the baseline before a result counts as a regression
+DEFAULT_TOLERANCE = 1.5
+# Differences below this many seconds are treated as timer noise
+NOISE_FLOOR_SECONDS = 0.005
+
+# A typical sidebar state: most of the price range, decent rating, all room types
+FILTER_QUERY = {"min_rating": 4.5, "superhost_only": False, "min_guests": 2}
+# A 2 km circle around the first synthetic city centre
+NEAR_QUERY = (51.5074, -0.1278, 2.0)
+# A typical Required Amenities selection
+AMENITY_QUERY = {"all_of": ["Wifi", "Kitchen"], "none_of": ["Pool"]}
+
+
+class BenchmarkContext:
+    """Inputs shared by the benchmarks of one size, built lazily and reused."""
+
+    def __init__(self, size: int, seed: int = 0):
+        """Prepare a context for size synthetic listings."""
+        self.size = size
+        self.seed = seed
+        self.scraper = AirbnbScraper(api_token="benchmark")
+        self._cache = {}
+
+    def _get(self, name: str, build: Callable):
+        """Build an input on first use."""
+        if name not in self._cache:
+            self._cache[name] = build()
+        return self._cache[name]
+
+    @property
+    def payload(self) -> List[Dict]:
+        """Raw listings without amenities, the input of convert_to_dataframe."""
+        return self._get("payload", lambda: generate_listings(self.size, self.seed, amenities=False))
+
+    @property
+    def amenities(self) -> List[List[Dict]]:
+        """Amenities blocks of the listings."""
+        return self._get("amenities", lambda: [
+            listing["amenities"] for listing in generate_listings(self.size, self.seed)
+        ])
+
+    @property
+    def amenity_matrix(self) -> AmenityMatrix:
+        """Sparse amenity matrix of the listings, with its query bitsets built."""
+        def build():
+            matrix = AmenityMatrix.from_amenities(self.amenities)
+            matrix.mask(AMENITY_QUERY["all_of"])
+            return matrix
+        return self._get("amenity_matrix", build)
+
+    @property
+    def spatial_index(self) -> SpatialIndex:
+        """Spatial index over the listing coordinates."""
+        return self._get("spatial_index", lambda: SpatialIndex.from_frame(self.frame))
+
+    @property
+    def dataset(self) -> ListingDataset:
+        """The listings streamed to a Parquet file in a temporary directory."""
+        def build():
+            directory = self._get("dataset_dir", tempfile.TemporaryDirectory)
+            return write_listings(self.scraper, self.payload, os.path.join(directory.name, "listings.parquet"))
+        return self._get("dataset", build)
+
+    @property
+    def frame(self) -> pd.DataFrame:
+        """Converted listings DataFrame."""
+        return self._get("frame", lambda: self.scraper.convert_to_dataframe(self.payload))
+
+    @property
+    def filter_args(self) -> tuple:
+        """Arguments of the benchmark filter query."""
+        def build():
+            prices = self.frame['Price per Night']
+            return (
+                (float(prices.quantile(0.05)), float(prices.quantile(0.95))),
+                FILTER_QUERY["min_rating"],
+                self.frame['Room Type'].unique().tolist(),
+                FILTER_QUERY["superhost_only"],
+                FILTER_QUERY["min_guests"],
+            )
+        return self._get("filter_args", build)
+
+    @property
+    def filter_index(self) -> FilterIndex:
+        """Filter index over the listings."""
+        return self._get("filter_index", lambda: FilterIndex(self.frame))
+
+
+def _slider_step(ctx: BenchmarkContext) -> np.ndarray:
+    """Query the filter index after moving the upper price bound, as one slider step does."""
+    (low, high), *rest = ctx.filter_args
+    ctx.slider_moved = not getattr(ctx, "slider_moved", False)
+    return ctx.filter_index.query((low, high * 0.9 if ctx.slider_moved else high), *rest)
+
+
+def _render_map(df: pd.DataFrame) -> str:
+    """Build the listings map and render it to HTML, as folium_static does."""
+    return build_listings_map(df).get_root().render()
+
+
+def _export(fmt: str) -> Callable[[BenchmarkContext], object]:
+    """Benchmark body serializing the listings in one export format."""
+    return lambda ctx: EXPORT_FORMATS[fmt][3](ctx.frame)
+
+
+# Benchmark name -> (body, largest size it runs at or None for no limit)
+BENCHMARKS: Dict[str, tuple] = {
+    "convert_to_dataframe": (lambda ctx: ctx.scraper.convert_to_dataframe(ctx.payload), None),
+    "calculate_market_metrics": (lambda ctx: calculate_market_metrics(ctx.frame), None),
+    "compute_aggregates_grouped": (lambda ctx: compute_aggregates(ctx.frame, ["room_type", "superhost"]), None),
+    "prepare_amenities_analysis": (lambda ctx: prepare_amenities_analysis(ctx.amenities), 100_000),
+    "amenity_matrix_build": (lambda ctx: AmenityMatrix.from_amenities(ctx.amenities), 100_000),
+    "amenity_query": (lambda ctx: ctx.amenity_matrix.mask(**AMENITY_QUERY), 100_000),
+    "dataset_aggregates": (lambda ctx: ctx.dataset.aggregates(), None),
+    "dataset_filter": (lambda ctx: filter_listings(ctx.dataset, *ctx.filter_args), None),
+    "filter_listings": (lambda ctx: filter_listings(ctx.frame, *ctx.filter_args), None),
+    "filter_index_build": (lambda ctx: FilterIndex(ctx.frame), None),
+    "filter_index_query": (_slider_step, None),
+    "spatial_index_build": (lambda ctx: SpatialIndex.from_frame(ctx.frame), None),
+    "spatial_radius_query": (lambda ctx: ctx.spatial_index.radius(*NEAR_QUERY), None),
+    "spatial_nearest_query": (lambda ctx: ctx.spatial_index.nearest(NEAR_QUERY[0], NEAR_QUERY[1], 20), None),
+    "build_listings_map": (lambda ctx: _render_map(ctx.frame), None),
+    "export_csv": (_export("csv"), None),
+    "export_json": (_export("json"), None),
+    "export_parquet": (_export("parquet"), None),
+    # Excel is both slow and limited to about a million rows per sheet
+    "export_excel": (_export("excel"), 100_000),
+}
+
+
+def _repeats(size: int) -> int:
+    """Number of timed runs for a size; the fastest run is reported."""
+    if size <= 10_000:
+        return 5
+    if size <= 100_000:
+        return 3
+    return 1
+
+
+def time_call(func: Callable[[], object], repeats: int) -> float:
+    """Return the fastest wall-clock time of repeated calls, in seconds."""
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run_benchmarks(sizes: List[int], names: Optional[List[str]] = None, seed: int = 0,
+                   verbose: bool = True) -> Dict:
+    """
+    Run benchmarks at each size.
+
+    Args:
+        sizes: Listing counts to run at
+        names: Benchmarks to run (default: all)
+        seed: Seed of the synthetic payload generator
+        verbose: Print each timing as it completes
+
+    Returns:
+        Results document with run metadata and seconds per benchmark and size
+    """
+    names = names or list(BENCHMARKS)
+    unknown = set(names) - set(BENCHMARKS)
+    if unknown:
+        raise ValueError(f"Unknown benchmarks: {', '.join(sorted(unknown))}")
+
+    results: Dict[str, Dict[str, float]] = {name: {} for name in names}
+    for size in sizes:
+        ctx = BenchmarkContext(size, seed)
+        for name in names:
+            body, max_size = BENCHMARKS[name]
+            if max_size is not None and size > max_size:
+                continue
+            # Build shared inputs outside the timed region
+            body(ctx)
+            seconds = time_call(lambda: body(ctx), _repeats(size))
+            results[name][str(size)] = seconds
+            if verbose:
+                print(f"{name:<28} {size:>9,} {seconds * 1000:>12.2f} ms")
+
+    return {
+        "meta": {
+            "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "pandas": pd.__version__,
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "seed": seed,
+            "sizes": sizes,
+        },
+        "results": results,
+    }
+
+
+def compare_results(current: Dict, baseline: Dict, tolerance: float = DEFAULT_TOLERANCE,
+                    noise_floor: float = NOISE_FLOOR_SECONDS) -> List[Dict]:
+    """
+    Find benchmarks that got slower than the baseline.
+
+    Only benchmark and size pairs present in both documents are compared.
+
+    Returns:
+        One entry per regression with the baseline and current seconds and their ratio
+    """
+    regressions = []
+    for name, timings in current["results"].items():
+        baseline_timings = baseline.get("results", {}).get(name, {})
+        for size, seconds in timings.items():
+            reference = baseline_timings.get(size)
+            if reference is None:
+                continue
+            if seconds > reference * tolerance and seconds - reference > noise_floor:
+                regressions.append({
+                    "benchmark": name,
+                    "size": int(size),
+                    "baseline": reference,
+                    "current": seconds,
+                    "ratio": seconds / reference if reference else float("inf"),
+                })
+    return regressions
+
+
+def load_results(path: str) -> Optional[Dict]:
+    """Read a results document, or None if the file does not exist."""
+    if not os.path.exists(path):
+        return None
+    with open(path, "r", encoding="utf-8") as fh:
+        return json.load(fh)
+
+
+def save_results(results: Dict, path: str) -> None:
+    """Write a results document as JSON."""
+    with open(path, "w", encoding="utf-8") as fh:
+        json.dump(results, fh, indent=2, sort_keys=True)
+        fh.write("\n")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Run the suite from the command line. Returns 1 when a regression is found."""
+    parser = argparse.ArgumentParser(description="Benchmark the listing pipeline on synthetic Apify payloads")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES,
+                        help="Listing counts to run at (default: 1000 10000 100000)")
+    parser.add_argument("--only", nargs="+", choices=list(BENCHMARKS), help="Benchmarks to run")
+    parser.add_argument("--seed", type=int, default=0, help="Payload generator seed")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT, help="Where to write the results JSON")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="Baseline results JSON to compare against")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help="Allowed slowdown factor before reporting a regression")
+    parser.add_argument("--update-baseline", action="store_true",
+                        help="Store these results as the new baseline")
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(args.sizes, args.only, args.seed)
+    save_results(results, args.output)
+    print(f"Results written to {args.output}")
+
+    if args.update_baseline:
+        save_results(results, args.baseline)
+        print(f"Baseline updated at {args.baseline}")
+        return 0
+
+    baseline = load_results(args.baseline)
+    if baseline is None:
+        print(f"No baseline at {args.baseline}; run with --update-baseline to create one")
+        return 0
+
+    regressions = compare_results(results, baseline, args.tolerance)
+    for r in regressions:
+        print(f"REGRESSION {r['benchmark']} at {r['size']:,}: "
+              f"{r['baseline'] * 1000:.2f} ms -> {r['current'] * 1000:.2f} ms ({r['ratio']:.2f}x)")
+    if not regressions:
+        print(f"No regressions against {args.baseline} (tolerance {args.tolerance}x)")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -31,6 +31,7 @@ setup(
     entry_points={
         "console_scripts": [
             "airbnb-analyzer=src.main:main",
+            "airbnb-sweep=src.cli:main",
         ],
     },
 )
\ No newline at end of file
@@ -0,0 +1,196 @@
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence
+import numpy as np
+import pandas as pd
+
+
+class AmenityMatrix:
+    """Sparse listing x amenity matrix over an interned amenity vocabulary.
+
+    Rows are stored in CSR form: the available amenities of row ``i`` are
+    ``vocabulary[indices[indptr[i]:indptr[i + 1]]]``. Frequencies are a
+    bincount over ``indices``. Filter queries use one packed bitset per
+    amenity, built on the first query, so "has Wifi AND Kitchen AND NOT
+    Shared bathroom" costs a few bitwise operations over n/8 bytes.
+    """
+
+    def __init__(self, ids: Sequence[str], vocabulary: List[str], indptr: np.ndarray, indices: np.ndarray):
+        """
+        Wrap prebuilt CSR arrays; use from_listings or from_amenities to encode payloads.
+
+        Args:
+            ids: Listing ID of each row
+            vocabulary: Amenity names, indexed by the codes in indices
+            indptr: Row start offsets into indices, of length rows + 1
+            indices: Amenity codes of all rows, concatenated
+        """
+        self.ids = np.asarray(ids, dtype=object)
+        self.vocabulary = list(vocabulary)
+        self.lookup: Dict[str, int] = {name: code for code, name in enumerate(self.vocabulary)}
+        self.indptr = np.asarray(indptr, dtype=np.int64)
+        # Amenity codes fit in 16 bits for any realistic vocabulary
+        self.indices = np.asarray(indices, dtype=np.int16 if len(self.vocabulary) <= 2 ** 15 else np.int32)
+        self._bits: Optional[np.ndarray] = None
+
+    @classmethod
+    def from_amenities(cls, amenities_data: Iterable[List[Dict]],
+                       ids: Optional[Sequence[str]] = None) -> "AmenityMatrix":
+        """
+        Encode amenities blocks, one per listing, keeping only available amenities.
+
+        Args:
+            amenities_data: Each listing's list of amenity categories with their values
+            ids: Listing IDs of the rows (default: row numbers)
+        """
+        encoder = AmenityEncoder()
+        for position, block in enumerate(amenities_data):
+            encoder.add(str(position), block)
+        matrix = encoder.build()
+        if ids is not None:
+            matrix.ids = np.asarray(ids, dtype=object)
+        return matrix
+
+    @classmethod
+    def from_listings(cls, listings: Iterable[Dict]) -> "AmenityMatrix":
+        """Encode the amenities of raw Apify listings, one row per listing in payload order."""
+        encoder = AmenityEncoder()
+        for _ in encoder.tap(listings):
+            pass
+        return encoder.build()
+
+    def save(self, path: str) -> None:
+        """Write the matrix to an .npz file."""
+        np.savez(path, ids=self.ids.astype(str), vocabulary=np.array(self.vocabulary, dtype=str),
+                 indptr=self.indptr, indices=self.indices)
+
+    @classmethod
+    def load(cls, path: str) -> "AmenityMatrix":
+        """Read a matrix written by save."""
+        with np.load(path) as data:
+            return cls(data["ids"].astype(object), data["vocabulary"].tolist(), data["indptr"], data["indices"])
+
+    def __len__(self) -> int:
+        """Number of listings."""
+        return len(self.indptr) - 1
+
+    def counts(self) -> np.ndarray:
+        """Number of listings having each vocabulary amenity."""
+        return np.bincount(self.indices, minlength=len(self.vocabulary))
+
+    def frequency(self) -> pd.DataFrame:
+        """Amenity frequencies, most common first, as returned by utils.prepare_amenities_analysis."""
+        return pd.DataFrame({
+            "Amenity": self.vocabulary,
+            "Count": self.counts()
+        }).sort_values("Count", ascending=False)
+
+    def amenities_of(self, position: int) -> List[str]:
+        """Names of the amenities of one row."""
+        codes = self.indices[self.indptr[position]:self.indptr[position + 1]]
+        return [self.vocabulary[code] for code in codes]
+
+    def _row_numbers(self) -> np.ndarray:
+        """Row number of every entry in indices."""
+        return np.repeat(np.arange(len(self), dtype=np.int64), np.diff(self.indptr))
+
+    def _bitsets(self) -> np.ndarray:
+        """Packed bitset of rows per amenity, built once."""
+        if self._bits is None:
+            dense = np.zeros((len(self.vocabulary), len(self)), dtype=bool)
+            dense[self.indices, self._row_numbers()] = True
+            self._bits = np.packbits(dense, axis=1)
+        return self._bits
+
+    def mask(self, all_of: Sequence[str] = (), none_of: Sequence[str] = (),
+             any_of: Sequence[str] = ()) -> np.ndarray:
+        """
+        Return a boolean row mask of the listings matching an amenity query.
+
+        Args:
+            all_of: Amenities every matching listing has
+            none_of: Amenities no matching listing has
+            any_of: Amenities of which a matching listing has at least one (ignored if empty)
+        """
+        if any(name not in self.lookup for name in all_of):
+            return np.zeros(len(self), dtype=bool)
+
+        bits = self._bitsets()
+        result = np.full(bits.shape[1], 0xFF, dtype=np.uint8)
+        for name in all_of:
+            result &= bits[self.lookup[name]]
+        for name in none_of:
+            if name in self.lookup:
+                result &= ~bits[self.lookup[name]]
+        if any_of:
+            either = np.zeros_like(result)
+            for name in any_of:
+                if name in self.lookup:
+                    either |= bits[self.lookup[name]]
+            result &= either
+        return np.unpackbits(result, count=len(self)).view(bool)
+
+    def take(self, positions: np.ndarray) -> "AmenityMatrix":
+        """Return the matrix of the given rows, in that order; -1 gives a row without amenities."""
+        positions = np.asarray(positions, dtype=np.int64)
+        present = positions >= 0
+        starts = np.where(present, self.indptr[positions], 0)
+        lengths = np.where(present, self.indptr[positions + 1] - starts, 0)
+        indptr = np.concatenate(([0], np.cumsum(lengths)))
+        # Gather every selected row's slice of indices in one vectorized step
+        offsets = np.arange(indptr[-1]) - np.repeat(indptr[:-1], lengths) + np.repeat(starts, lengths)
+        ids = np.full(len(positions), None, dtype=object)
+        ids[present] = self.ids[positions[present]]
+        return AmenityMatrix(ids, self.vocabulary, indptr, self.indices[offsets])
+
+    def align(self, ids: Iterable[str]) -> "AmenityMatrix":
+        """
+        Reorder rows to match a sequence of listing IDs, such as a converted frame's ID column.
+
+        IDs repeated in the payload resolve to their last occurrence, and unknown
+        IDs get rows without amenities.
+        """
+        ids = pd.Index(list(ids), dtype=object)
+        reversed_ids = pd.Index(self.ids[::-1])
+        last = ~reversed_ids.duplicated()
+        rows = len(self) - 1 - np.flatnonzero(last)
+        positions = reversed_ids[last].get_indexer(ids)
+        found = positions >= 0
+        source = np.full(len(positions), -1, dtype=np.int64)
+        source[found] = rows[positions[found]]
+        matrix = self.take(source)
+        matrix.ids = ids.to_numpy()
+        return matrix
+
+
+class AmenityEncoder:
+    """Incremental encoder building an AmenityMatrix one listing at a time."""
+
+    def __init__(self):
+        self.lookup: Dict[str, int] = {}
+        self.ids: List[str] = []
+        self.indptr = [0]
+        self.indices: List[int] = []
+
+    def add(self, listing_id: str, amenities: Optional[List[Dict]]) -> None:
+        """Append one listing's available amenities as a new row, skipping malformed entries."""
+        lookup, indices = self.lookup, self.indices
+        for category in amenities if isinstance(amenities, list) else ():
+            values = category.get("values") if isinstance(category, dict) else None
+            for amenity in values if isinstance(values, list) else ():
+                if isinstance(amenity, dict) and amenity.get("available") and amenity.get("title") is not None:
+                    name = str(amenity["title"])
+                    code = lookup.get(name)
+                    if code is None:
+                        code = lookup[name] = len(lookup)
+                    indices.append(code)
+        self.ids.append(listing_id)
+        self.indptr.append(len(indices))
+
+    def tap(self, listings: Iterable[Dict]) -> Iterator[Dict]:
+        """Pass raw listings through while encoding their amenities."""
+        for listing in listings:
+            self.add(str(listing.get('id', '')), listing.get('amenities'))
+            yield listing
+
+    def build(self) -> AmenityMatrix:
+        """Return the matrix of the listings added so far."""
+        return AmenityMatrix(self.ids, list(self.lookup), np.array(self.indptr), np.array(self.indices))
@@ -0,0 +1,282 @@
+import gzip
+import hashlib
+import json
+import os
+import tempfile
+import time
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+import pandas as pd
+
+try:
+    from .config import CACHE_DIR, CACHE_TTL_SECONDS, CACHE_MAX_BYTES
+    from .scraper import apply_listing_schema
+    from .amenities import AmenityEncoder, AmenityMatrix
+    from .telemetry import span
+except ImportError:  # Running as a script from src/ (streamlit run src/main.py)
+    from config import CACHE_DIR, CACHE_TTL_SECONDS, CACHE_MAX_BYTES
+    from scraper import apply_listing_schema
+    from amenities import AmenityEncoder, AmenityMatrix
+    from telemetry import span
+
+# Files every complete cache entry has; the amenity matrix is optional
+_REQUIRED_FILES = ("meta", "frame", "raw")
+
+
+class ScrapeCache:
+    """Persistent on-disk cache of scrape results keyed by search parameters.
+
+    Each entry is stored as files sharing a key: the converted DataFrame as
+    Parquet, the raw listing payload as gzipped JSON lines, the encoded
+    amenity matrix and a small metadata file. The metadata file's
+    modification time doubles as the entry's last access time for LRU
+    eviction.
+    """
+
+    def __init__(self, scraper, cache_dir: str = CACHE_DIR, ttl_seconds: int = CACHE_TTL_SECONDS,
+                 max_bytes: int = CACHE_MAX_BYTES):
+        """Initialize the cache around an AirbnbScraper instance."""
+        self.scraper = scraper
+        self.cache_dir = cache_dir
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    @staticmethod
+    def make_key(location: str, currency: str, max_results: Optional[int]) -> str:
+        """Build a stable file-name-safe key for a search."""
+        payload = json.dumps([location.strip().lower(), currency.upper(), max_results])
+        return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+    def _paths(self, key: str) -> Dict[str, str]:
+        """Return the file paths making up a cache entry."""
+        base = os.path.join(self.cache_dir, key)
+        return {
+            "meta": f"{base}.meta.json",
+            "frame": f"{base}.parquet",
+            "raw": f"{base}.jsonl.gz",
+            "amenities": f"{base}.amenities.npz",
+        }
+
+    def _temp_path(self, key: str, suffix: str) -> str:
+        """Create an empty temporary file next to a cache entry and return its path."""
+        fd, path = tempfile.mkstemp(dir=self.cache_dir, prefix=f"{key}.", suffix=suffix)
+        os.close(fd)
+        return path
+
+    def _is_fresh(self, meta: Dict[str, Any]) -> bool:
+        """Check whether an entry is still within its TTL."""
+        return time.time() - meta.get("created_at", 0) <= self.ttl_seconds
+
+    def _read_meta(self, key: str) -> Optional[Dict[str, Any]]:
+        """Read an entry's metadata, or None if the entry is missing or incomplete."""
+        paths = self._paths(key)
+        if not all(os.path.exists(paths[name]) for name in _REQUIRED_FILES):
+            return None
+        try:
+            with open(paths["meta"], "r", encoding="utf-8") as fh:
+                return json.load(fh)
+        except (OSError, ValueError):
+            return None
+
+    def get(self, location: str, currency: str = "USD", max_results: int = None) -> Optional[pd.DataFrame]:
+        """Return the cached DataFrame for a search, or None on a miss or expired entry."""
+        key = self.make_key(location, currency, max_results)
+        meta = self._read_meta(key)
+        if meta is None or not self._is_fresh(meta):
+            return None
+
+        paths = self._paths(key)
+        try:
+            # Parquet does not round-trip every pandas dtype, so restore the listing schema
+            with span("cache_read", bytes=os.path.getsize(paths["frame"])) as read:
+                df = apply_listing_schema(pd.read_parquet(paths["frame"]))
+                read.rows = len(df)
+        except Exception as e:
+            print(f"Error reading cache entry {key}: {str(e)}")
+            return None
+
+        # Mark as recently used for LRU eviction
+        os.utime(paths["meta"])
+        return df
+
+    def load_raw(self, location: str, currency: str = "USD", max_results: int = None) -> Optional[List[Dict]]:
+        """Return the cached raw listing payload for a search, or None if not cached."""
+        key = self.make_key(location, currency, max_results)
+        meta = self._read_meta(key)
+        if meta is None or not self._is_fresh(meta):
+            return None
+
+        try:
+            with gzip.open(self._paths(key)["raw"], "rt", encoding="utf-8") as fh:
+                return [json.loads(line) for line in fh]
+        except FileNotFoundError:
+            # Evicted since its metadata was read
+            return None
+
+    def get_amenities(self, location: str, currency: str = "USD",
+                      max_results: int = None) -> Optional[AmenityMatrix]:
+        """
+        Return the amenity matrix of a cached search, or None if the search is not cached.
+
+        Rows follow the raw payload order; use AmenityMatrix.align to match a
+        DataFrame. Entries written before amenities were encoded get their matrix
+        built from the stored payload once.
+        """
+        key = self.make_key(location, currency, max_results)
+        meta = self._read_meta(key)
+        if meta is None or not self._is_fresh(meta):
+            return None
+
+        path = self._paths(key)["amenities"]
+        if os.path.exists(path):
+            try:
+                return AmenityMatrix.load(path)
+            except Exception as e:
+                print(f"Error reading cached amenities {key}: {str(e)}")
+
+        listings = self.load_raw(location, currency, max_results)
+        if listings is None:
+            # The entry expired or was evicted since its metadata was read
+            return None
+        matrix = AmenityMatrix.from_listings(listings)
+        matrix.save(path)
+        return matrix
+
+    def _record_raw(self, listings: Iterable[Dict], path: str) -> Iterator[Dict]:
+        """Pass listings through while writing each one to the raw payload file."""
+        with gzip.open(path, "wt", encoding="utf-8") as fh:
+            for listing in listings:
+                fh.write(json.dumps(listing) + "\n")
+                yield listing
+
+    def get_dataframe(self, location: str, currency: str = "USD", max_results: int = None,
+                      force_refresh: bool = False,
+                      on_progress: Optional[Callable[[pd.DataFrame, int], None]] = None,
+                      on_queue: Optional[Callable[[int, float], None]] = None) -> pd.DataFrame:
+        """
+        Return listings for a search, scraping only on a cache miss.
+
+        Args:
+            location: City or area to search
+            currency: Currency for prices (default: USD)
+            max_results: Maximum number of listings to fetch (default: None = all)
+            force_refresh: Ignore any cached entry and scrape again
+            on_progress: Optional callback for a scrape; the listings are then read
+                while the actor runs, and after every dataset page it receives the
+                listings converted so far and the number of raw listings read
+            on_queue: Optional callback receiving the queue position and estimated
+                wait while the scrape waits for an actor run slot, and 0 and 0.0
+                once the run is admitted
+
+        Returns:
+            DataFrame as produced by AirbnbScraper.convert_to_dataframe
+        """
+        if not force_refresh:
+            cached = self.get(location, currency, max_results)
+            if cached is not None:
+                return cached
+
+        key = self.make_key(location, currency, max_results)
+        paths = self._paths(key)
+        # Concurrent misses for the same key each write their own temporary files
+        tmp_raw = self._temp_path(key, ".jsonl.gz.tmp")
+
+        # Stream raw listings to disk and encode their amenities while they are being converted
+        encoder = AmenityEncoder()
+        try:
+            if on_progress is None:
+                listings = self.scraper.iter_listings(location, currency, max_results=max_results,
+                                                      on_queue=on_queue)
+                df = self.scraper.convert_to_dataframe(encoder.tap(self._record_raw(listings, tmp_raw)))
+            else:
+                listings = self.scraper.iter_listings(location, currency, max_results=max_results, stream=True,
+                                                      on_queue=on_queue)
+                for df, read in self.scraper.iter_dataframes(encoder.tap(self._record_raw(listings, tmp_raw))):
+                    on_progress(df, read)
+        except Exception:
+            if os.path.exists(tmp_raw):
+                os.remove(tmp_raw)
+            raise
+
+        # Empty results are usually transient, so they are not cached
+        if df.empty:
+            os.remove(tmp_raw)
+            return df
+
+        # Files are replaced whole, so a reader never sees a partly written frame; meta is written last
+        tmp_frame = self._temp_path(key, ".parquet.tmp")
+        try:
+            df.to_parquet(tmp_frame, index=False)
+            os.replace(tmp_frame, paths["frame"])
+            encoder.build().save(paths["amenities"])
+            os.replace(tmp_raw, paths["raw"])
+        except Exception:
+            for path in (tmp_frame, tmp_raw):
+                if os.path.exists(path):
+                    os.remove(path)
+            raise
+        with open(paths["meta"], "w", encoding="utf-8") as fh:
+            json.dump({
+                "location": location,
+                "currency": currency,
+                "max_results": max_results,
+                "created_at": time.time(),
+                "rows": len(df)
+            }, fh)
+
+        self.evict()
+        return df
+
+    def _entries(self) -> List[Dict[str, Any]]:
+        """List cache entries with their size and last access time."""
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith(".meta.json"):
+                continue
+            key = name[:-len(".meta.json")]
+            paths = self._paths(key)
+            size = sum(os.path.getsize(p) for p in paths.values() if os.path.exists(p))
+            entries.append({
+                "key": key,
+                "size": size,
+                "last_used": os.path.getmtime(paths["meta"])
+            })
+        return entries
+
+    def _remove(self, key: str) -> None:
+        """Delete all files of a cache entry."""
+        for path in self._paths(key).values():
+            if os.path.exists(path):
+                os.remove(path)
+
+    def evict(self) -> int:
+        """
+        Drop expired entries, then least recently used ones until under max_bytes.
+
+        Returns:
+            Number of entries removed
+        """
+        removed = 0
+        entries = []
+        for entry in self._entries():
+            meta = self._read_meta(entry["key"])
+            if meta is None or not self._is_fresh(meta):
+                self._remove(entry["key"])
+                removed += 1
+            else:
+                entries.append(entry)
+
+        total = sum(entry["size"] for entry in entries)
+        for entry in sorted(entries, key=lambda e: e["last_used"]):
+            if total <= self.max_bytes:
+                break
+            self._remove(entry["key"])
+            total -= entry["size"]
+            removed += 1
+
+        return removed
+
+    def clear(self) -> None:
+        """Remove every cache entry."""
+        for entry in self._entries():
+            self._remove(entry["key"])
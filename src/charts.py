@@ -0,0 +1,101 @@
+import math
+from typing import Sequence
+import numpy as np
+import plotly.graph_objects as go
+
+# Multiples of a power of ten used as bin widths, as plotly's own autobinning does
+NICE_STEPS = (1, 2, 2.5, 5, 10)
+# Fraction of each bin width drawn, matching the charts' bargap of 0.1
+BAR_FILL = 0.9
+
+
+def _nice_step(span: float, bins: int) -> float:
+    """Return the smallest round bin width splitting span into at most bins bins."""
+    raw = span / bins
+    magnitude = 10 ** math.floor(math.log10(raw))
+    for multiple in NICE_STEPS:
+        if raw <= multiple * magnitude:
+            return multiple * magnitude
+    return 10 * magnitude
+
+
+def bin_edges(values: np.ndarray, bins: int = 30, method: str = "fixed") -> np.ndarray:
+    """
+    Compute histogram bin edges for the finite values of one or more columns.
+
+    Args:
+        values: Values to bin; NaN is ignored
+        bins: Approximate number of bins
+        method: "fixed" for equal round-width bins like plotly's nbinsx, or
+            "quantile" for bins holding about the same number of values
+
+    Returns:
+        Increasing array of edges, empty if there are no finite values
+    """
+    values = np.asarray(values, dtype=np.float64)
+    values = values[np.isfinite(values)]
+    if not len(values):
+        return np.empty(0)
+    low, high = float(values.min()), float(values.max())
+
+    if method == "quantile":
+        edges = np.unique(np.quantile(values, np.linspace(0, 1, bins + 1)))
+        return edges if len(edges) > 1 else np.array([low - 0.5, high + 0.5])
+    if method != "fixed":
+        raise ValueError(f"Unknown binning method: {method}")
+
+    if high == low:
+        return np.array([low - 0.5, high + 0.5])
+    step = _nice_step(high - low, bins)
+    start = math.floor(low / step) * step
+    count = max(int(math.floor((high - start) / step)) + 1, 1)
+    return start + step * np.arange(count + 1)
+
+
+def histogram_counts(values: np.ndarray, edges: np.ndarray) -> np.ndarray:
+    """Count the finite values falling in each bin; the last bin includes its right edge."""
+    values = np.asarray(values, dtype=np.float64)
+    if len(edges) < 2:
+        return np.zeros(0, dtype=np.int64)
+    counts, _ = np.histogram(values[np.isfinite(values)], bins=edges)
+    return counts
+
+
+def histogram_trace(values: np.ndarray, edges: np.ndarray, name: str, color: str,
+                    hover_label: str, value_format: str = ".0f", prefix: str = "") -> go.Bar:
+    """
+    Build a bar trace drawing a histogram from server-side bin counts.
+
+    The trace carries one bar per bin instead of every value, so its size does
+    not depend on the number of listings.
+
+    Args:
+        values: Values to bin
+        edges: Bin edges from bin_edges
+        name: Trace name
+        color: Bar color
+        hover_label: Label of the value in the hover text, e.g. "Price"
+        value_format: d3 format of the bin bounds in the hover text
+        prefix: Text before each bin bound, e.g. "$"
+    """
+    counts = histogram_counts(values, edges)
+    widths = np.diff(edges)
+    bounds = np.column_stack([edges[:-1], edges[1:]])
+    return go.Bar(
+        x=(edges[:-1] + edges[1:]) / 2,
+        y=counts,
+        width=widths * BAR_FILL,
+        customdata=bounds,
+        name=name,
+        marker_color=color,
+        hovertemplate=(
+            f"{hover_label}: {prefix}%{{customdata[0]:{value_format}}} - {prefix}%{{customdata[1]:{value_format}}}"
+            "<br>Count: %{y}<extra></extra>"
+        )
+    )
+
+
+def shared_edges(columns: Sequence[np.ndarray], bins: int, method: str = "fixed") -> np.ndarray:
+    """Bin edges covering several columns, so overlaid histograms line up."""
+    return bin_edges(np.concatenate([np.asarray(c, dtype=np.float64) for c in columns]) if columns
+                     else np.empty(0), bins, method)
@@ -0,0 +1,294 @@
+import argparse
+import json
+import math
+import os
+import re
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+import numpy as np
+import pandas as pd
+
+# Keep this module free of Streamlit, plotly and folium so it starts fast on batch workers
+try:
+    from .scraper import AirbnbScraper, DEFAULT_CONCURRENCY
+    from .governor import PRIORITY_BATCH
+    from .cache import ScrapeCache
+    from .snapshots import SnapshotStore
+    from .utils import calculate_market_metrics
+    from .dataset import write_listings
+    from .telemetry import configure_json_log, span, trace, write_prometheus
+    from .config import DEFAULT_CURRENCY, SNAPSHOT_DB, PERF_LOG_FILE, METRICS_FILE
+except ImportError:  # Running as a script from src/
+    from scraper import AirbnbScraper, DEFAULT_CONCURRENCY
+    from governor import PRIORITY_BATCH
+    from cache import ScrapeCache
+    from snapshots import SnapshotStore
+    from utils import calculate_market_metrics
+    from dataset import write_listings
+    from telemetry import configure_json_log, span, trace, write_prometheus
+    from config import DEFAULT_CURRENCY, SNAPSHOT_DB, PERF_LOG_FILE, METRICS_FILE
+
+
+def read_locations(path: str) -> List[str]:
+    """Read one location per line, skipping blank lines and # comments."""
+    with open(path, "r", encoding="utf-8") as fh:
+        lines = [line.split("#", 1)[0].strip() for line in fh]
+    return [line for line in lines if line]
+
+
+def market_slug(location: str) -> str:
+    """Build a file-name-safe name for a location."""
+    return re.sub(r"[^a-z0-9]+", "-", location.lower()).strip("-") or "market"
+
+
+def _finite_json(value: Any) -> Any:
+    """Replace NaN and infinite floats, e.g. the averages of a market without prices, with None."""
+    if isinstance(value, dict):
+        return {key: _finite_json(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_finite_json(item) for item in value]
+    if isinstance(value, (float, np.floating)) and not math.isfinite(value):
+        return None
+    return value
+
+
+def _json_default(value: Any) -> Any:
+    """Serialize numpy scalars in metrics."""
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def sweep_market(scraper: AirbnbScraper, location: str, out_dir: str, currency: str = DEFAULT_CURRENCY,
+                 max_results: int = None, min_reviews: int = 0, cache: Optional[ScrapeCache] = None,
+                 snapshots: Optional[SnapshotStore] = None, convert_workers: int = 1,
+                 out_of_core: bool = False) -> Dict[str, Any]:
+    """
+    Scrape one market and write its listings as Parquet.
+
+    Args:
+        scraper: Scraper used for the actor run
+        location: City or area to search
+        out_dir: Directory receiving <slug>.parquet
+        currency: Currency for prices
+        max_results: Maximum number of listings to fetch (default: None = all)
+        min_reviews: Drop listings with fewer reviews
+        cache: Optional scrape cache consulted before running the actor
+        snapshots: Optional snapshot store recording the scrape; only changed listings are converted
+        convert_workers: Processes converting a freshly scraped payload; above 1 the
+            raw listings are collected first and converted with convert_parallel
+        out_of_core: Stream the payload batch by batch into the Parquet file and compute
+            the metrics from the file, so memory does not grow with the market size
+
+    Returns:
+        Status record with the market's file, row count, rejected listings, metrics, error
+        and the time spent in each pipeline stage
+    """
+    start = time.perf_counter()
+    record: Dict[str, Any] = {"location": location, "status": "ok", "rows": 0, "rejected": None,
+                              "file": None, "metrics": None, "error": None, "stages": []}
+    with trace(location) as market:
+        _sweep_into(record, scraper, location, out_dir, currency, max_results, min_reviews, cache,
+                    snapshots, convert_workers, out_of_core)
+    record["stages"] = market.breakdown()
+    record["seconds"] = round(time.perf_counter() - start, 3)
+    return record
+
+
+def _sweep_into(record: Dict[str, Any], scraper: AirbnbScraper, location: str, out_dir: str, currency: str,
+                max_results: Optional[int], min_reviews: int, cache: Optional[ScrapeCache],
+                snapshots: Optional[SnapshotStore], convert_workers: int, out_of_core: bool) -> None:
+    """Scrape and write one market, filling in its status record; see sweep_market."""
+    try:
+        if out_of_core:
+            _stream_market(scraper, location, out_dir, currency, max_results, min_reviews, record)
+        else:
+            if snapshots is not None:
+                df = snapshots.refresh(location, scraper.iter_listings(location, currency, max_results=max_results),
+                                       currency)
+            elif cache is not None:
+                df = cache.get_dataframe(location, currency, max_results=max_results)
+            else:
+                listings = scraper.iter_listings(location, currency, max_results=max_results)
+                conversion: Dict[str, int] = {}
+                if convert_workers > 1:
+                    df = scraper.convert_parallel(list(listings), convert_workers, stats=conversion)
+                else:
+                    df = scraper.convert_to_dataframe(listings, stats=conversion)
+                record["rejected"] = conversion.get("rejected", 0)
+            if not df.empty:
+                df = df[df['Reviews Count'] >= min_reviews]
+
+            record["rows"] = len(df)
+            if df.empty:
+                record["status"] = "empty"
+            else:
+                path = os.path.join(out_dir, f"{market_slug(location)}.parquet")
+                with span("write_parquet", rows=len(df)) as written:
+                    df.to_parquet(path, index=False)
+                    written.bytes = os.path.getsize(path)
+                record["file"] = path
+                record["metrics"] = calculate_market_metrics(df)
+    except Exception as e:
+        record["status"] = "error"
+        record["error"] = str(e)
+
+
+def _stream_market(scraper: AirbnbScraper, location: str, out_dir: str, currency: str,
+                   max_results: Optional[int], min_reviews: int, record: Dict[str, Any]) -> None:
+    """Write one market straight from the listing stream to Parquet and fill in its status record."""
+    path = os.path.join(out_dir, f"{market_slug(location)}.parquet")
+    conversion: Dict[str, int] = {}
+    dataset = write_listings(scraper, scraper.iter_listings(location, currency, max_results=max_results), path,
+                             min_reviews=min_reviews, stats=conversion)
+    record["rows"] = len(dataset)
+    record["rejected"] = conversion["rejected"]
+    if len(dataset):
+        record["file"] = path
+        record["metrics"] = calculate_market_metrics(dataset)
+    else:
+        os.remove(path)
+        record["status"] = "empty"
+
+
+def sweep(locations: List[str], out_dir: str, currency: str = DEFAULT_CURRENCY, max_results: int = None,
+          min_reviews: int = 0, workers: int = DEFAULT_CONCURRENCY, scraper: AirbnbScraper = None,
+          use_cache: bool = False, snapshot_db: str = None, convert_workers: int = 1,
+          out_of_core: bool = False) -> List[Dict[str, Any]]:
+    """
+    Scrape several markets in parallel and write one Parquet file per market plus summary.json.
+
+    Each market is converted and written as soon as its actor run finishes, so
+    only the markets currently in flight are held in memory.
+
+    Returns:
+        Status records in input order
+    """
+    if workers < 1:
+        raise ValueError("workers must be at least 1")
+
+    # Sweeps queue behind interactive searches sharing the process-wide run governor
+    scraper = scraper or AirbnbScraper(priority=PRIORITY_BATCH)
+    cache = ScrapeCache(scraper) if use_cache else None
+    snapshots = SnapshotStore(scraper, snapshot_db) if snapshot_db else None
+    os.makedirs(out_dir, exist_ok=True)
+
+    unique_locations = list(dict.fromkeys(locations))
+    with ThreadPoolExecutor(max_workers=min(workers, len(unique_locations) or 1)) as executor:
+        futures = [
+            executor.submit(sweep_market, scraper, location, out_dir, currency, max_results, min_reviews,
+                            cache, snapshots, convert_workers, out_of_core)
+            for location in unique_locations
+        ]
+        records = [future.result() for future in futures]
+
+    with open(os.path.join(out_dir, "summary.json"), "w", encoding="utf-8") as fh:
+        # Strict JSON: a non-finite value that slips through fails here instead of writing a bare NaN
+        json.dump(_finite_json({"currency": currency, "max_results": max_results, "markets": records}),
+                  fh, indent=2, default=_json_default, allow_nan=False)
+    return records
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Build the command line parser."""
+    parser = argparse.ArgumentParser(prog="python -m src.cli", description="Headless Airbnb market tools")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    sweep_parser = commands.add_parser("sweep", help="Scrape a list of markets into Parquet files")
+    sweep_parser.add_argument("--locations", metavar="FILE", help="File with one location per line")
+    sweep_parser.add_argument("--location", action="append", default=[], metavar="NAME",
+                              help="Location to sweep; can be repeated")
+    sweep_parser.add_argument("--out", required=True, metavar="DIR", help="Output directory")
+    sweep_parser.add_argument("--currency", default=DEFAULT_CURRENCY, help="Currency for prices")
+    sweep_parser.add_argument("--max-results", type=int, default=None, help="Maximum listings per market")
+    sweep_parser.add_argument("--min-reviews", type=int, default=0, help="Minimum number of reviews")
+    sweep_parser.add_argument("--workers", type=int, default=DEFAULT_CONCURRENCY,
+                              help="Markets scraped in parallel")
+    sweep_parser.add_argument("--convert-workers", type=int, default=1,
+                              help="Processes converting each scraped payload (0: one per CPU)")
+    sources = sweep_parser.add_mutually_exclusive_group()
+    sources.add_argument("--use-cache", action="store_true", help="Reuse fresh results from the scrape cache")
+    sources.add_argument("--snapshot-db", nargs="?", const=SNAPSHOT_DB, metavar="PATH",
+                         help=f"Record listing history in a snapshot store (default path: {SNAPSHOT_DB})")
+    sources.add_argument("--out-of-core", action="store_true",
+                         help="Stream each market to Parquet batch by batch instead of converting it in memory")
+    sweep_parser.add_argument("--perf-log", default=PERF_LOG_FILE or None, metavar="FILE",
+                              help="Append one JSON line per timed pipeline stage to FILE")
+    sweep_parser.add_argument("--metrics-file", default=METRICS_FILE or None, metavar="FILE",
+                              help="Write per-stage totals to FILE in the Prometheus text format")
+
+    trend_parser = commands.add_parser("trend", help="Print a market's price trend from the snapshot store")
+    trend_parser.add_argument("--location", required=True, metavar="NAME", help="Market to report")
+    trend_parser.add_argument("--currency", default=DEFAULT_CURRENCY, help="Currency for prices")
+    trend_parser.add_argument("--snapshot-db", default=SNAPSHOT_DB, metavar="PATH", help="Snapshot store path")
+    trend_parser.add_argument("--days", type=float, default=None, help="Only include the last N days")
+    return parser
+
+
+def trend(args: argparse.Namespace) -> int:
+    """Print the per-scrape price trend of a market as CSV."""
+    if not os.path.exists(args.snapshot_db):
+        print(f"Error: no snapshot store at {args.snapshot_db}", file=sys.stderr)
+        return 2
+
+    start = time.time() - args.days * 86400 if args.days is not None else None
+    # The trend query never converts listings, so no API token is needed
+    df = SnapshotStore(None, args.snapshot_db).price_trend(args.location, args.currency, start=start)
+    if df.empty:
+        print(f"No snapshots of {args.location} in {args.currency}", file=sys.stderr)
+        return 1
+
+    df['scraped_at'] = pd.to_datetime(df['scraped_at'], unit='s', utc=True)
+    print(df.to_csv(index=False), end="")
+    return 0
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Run the CLI.
+
+    Returns:
+        0 on success, 1 if any market failed or has no snapshots, 2 on invalid arguments
+    """
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.command == "trend":
+        return trend(args)
+
+    locations = list(args.location)
+    if args.locations:
+        locations += read_locations(args.locations)
+    if not locations:
+        parser.error("no locations given; use --locations FILE or --location NAME")
+    if args.workers < 1:
+        parser.error("--workers must be at least 1")
+    if args.convert_workers < 0:
+        parser.error("--convert-workers must not be negative")
+
+    try:
+        scraper = AirbnbScraper(priority=PRIORITY_BATCH)
+    except ValueError as e:
+        print(f"Error: {str(e)}", file=sys.stderr)
+        return 2
+
+    if args.perf_log:
+        configure_json_log(args.perf_log)
+    records = sweep(locations, args.out, args.currency, args.max_results, args.min_reviews,
+                    args.workers, scraper, args.use_cache, args.snapshot_db,
+                    args.convert_workers or os.cpu_count() or 1, args.out_of_core)
+    if args.metrics_file:
+        write_prometheus(args.metrics_file)
+
+    for record in records:
+        detail = record["error"] or f"{record['rows']} listings"
+        print(f"{record['status'].upper():<6} {record['location']}: {detail} ({record['seconds']:.1f}s)")
+
+    failed = sum(record["status"] == "error" for record in records)
+    print(f"{len(records) - failed}/{len(records)} markets succeeded; summary in {os.path.join(args.out, 'summary.json')}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,7 +2,13 @@ import os
 from typing import Dict, List
 
 # Apify configuration
-APIFY_ACTOR_ID = "GsNzxEKzE2vQ5d9HN"
+APIFY_ACTOR_ID = os.getenv("APIFY_ACTOR_ID", "GsNzxEKzE2vQ5d9HN")
+# Longest time a search waits for its actor run to finish
+RUN_TIMEOUT_SECONDS = float(os.getenv("RUN_TIMEOUT_SECONDS", 15 * 60))
+# Process-wide limits on actor runs: runs in flight at once, and starts per minute with their burst size
+APIFY_MAX_CONCURRENT_RUNS = int(os.getenv("APIFY_MAX_CONCURRENT_RUNS", 8))
+APIFY_RUN_STARTS_PER_MINUTE = float(os.getenv("APIFY_RUN_STARTS_PER_MINUTE", 120))
+APIFY_RUN_START_BURST = int(os.getenv("APIFY_RUN_START_BURST", 30))
 
 # Supported currencies
 SUPPORTED_CURRENCIES: Dict[str, str] = {
@@ -28,9 +34,35 @@ ROOM_TYPES: List[str] = [
 # Price range steps (in percentage)
 PRICE_RANGE_STEPS = 5
 
+# Scrape result cache configuration
+CACHE_DIR = os.getenv("CACHE_DIR", ".cache/scrapes")
+CACHE_TTL_SECONDS = int(os.getenv("CACHE_TTL_SECONDS", 6 * 60 * 60))
+CACHE_MAX_BYTES = int(os.getenv("CACHE_MAX_BYTES", 512 * 1024 * 1024))
+
+# Listing snapshot history
+SNAPSHOT_DB = os.getenv("SNAPSHOT_DB", ".cache/snapshots.sqlite")
+
 # Map configuration
 DEFAULT_MAP_ZOOM = 13
 MAP_STYLE = "OpenStreetMap"
+# Above this many listings the map shows a binned density layer instead of markers
+MAP_DENSITY_THRESHOLD = int(os.getenv("MAP_DENSITY_THRESHOLD", 5000))
+MAP_DENSITY_BINS = 120
+
+# Minimum seconds between redraws of partial results while a search is streaming
+PROGRESSIVE_REFRESH_SECONDS = 1.0
+
+# Searches run at the same time in the app's background worker pool
+SEARCH_WORKERS = int(os.getenv("SEARCH_WORKERS", 4))
+
+# Number of serialized exports kept in memory per session
+EXPORT_CACHE_SIZE = 8
+
+# Stage timing output: JSON lines per stage run and a Prometheus text file of totals (empty = off)
+PERF_LOG_FILE = os.getenv("PERF_LOG_FILE", "")
+METRICS_FILE = os.getenv("METRICS_FILE", "")
+# Show the collapsible per-rerun timing breakdown in the app
+SHOW_PERFORMANCE_PANEL = os.getenv("SHOW_PERFORMANCE_PANEL", "True").lower() == "true"
 
 # Data columns configuration
 DISPLAY_COLUMNS = [
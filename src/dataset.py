@@ -0,0 +1,366 @@
+import os
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+try:
+    from .scraper import AirbnbScraper, CONVERT_CHUNK_SIZE, apply_listing_schema
+except ImportError:  # Running as a script from src/ (streamlit run src/main.py)
+    from scraper import AirbnbScraper, CONVERT_CHUNK_SIZE, apply_listing_schema
+
+# Column types of listings stored on disk; Room Type is read back as a category
+LISTING_ARROW_SCHEMA = pa.schema([
+    ('ID', pa.string()),
+    ('Title', pa.string()),
+    ('Description', pa.string()),
+    ('Room Type', pa.string()),
+    ('URL', pa.string()),
+    ('Thumbnail', pa.string()),
+    ('Latitude', pa.float64()),
+    ('Longitude', pa.float64()),
+    ('Price per Night', pa.float64()),
+    ('Capacity', pa.int16()),
+    ('Superhost', pa.bool_()),
+    ('Overall Rating', pa.float32()),
+    ('Reviews Count', pa.int32()),
+    ('Location Rating', pa.float32()),
+    ('Cleanliness Rating', pa.float32()),
+    ('Value Rating', pa.float32()),
+    ('Accuracy Rating', pa.float32()),
+    ('Communication Rating', pa.float32()),
+])
+
+# Rows per batch when iterating a dataset
+READ_BATCH_SIZE = 65536
+# Histogram bins per pass of the streaming median
+SELECT_BINS = 4096
+# Values below which the streaming median loads its remaining candidates and selects in memory
+SELECT_EXACT_LIMIT = 262144
+
+
+def _to_table(frame: pd.DataFrame) -> pa.Table:
+    """Convert a converted listings frame to a table of LISTING_ARROW_SCHEMA."""
+    frame = apply_listing_schema(frame)[LISTING_ARROW_SCHEMA.names]
+    return pa.Table.from_pandas(frame, schema=LISTING_ARROW_SCHEMA, preserve_index=False)
+
+
+def _to_frame(table: pa.Table) -> pd.DataFrame:
+    """Convert a table of listings to a DataFrame of the listing schema without copying strings into Python objects."""
+    if 'Room Type' in table.column_names and pa.types.is_string(table.schema.field('Room Type').type):
+        index = table.column_names.index('Room Type')
+        table = table.set_column(index, 'Room Type', pc.dictionary_encode(table.column(index)))
+    df = table.to_pandas(types_mapper={pa.string(): pd.StringDtype("pyarrow")}.get)
+    if 'Room Type' in df.columns:
+        # Dictionary encoding keeps first-seen order; pandas categories of strings are sorted
+        df['Room Type'] = df['Room Type'].cat.reorder_categories(sorted(df['Room Type'].cat.categories))
+    return apply_listing_schema(df)
+
+
+def write_listings(scraper: AirbnbScraper, listings: Iterable[Dict], path: str,
+                   batch_size: int = CONVERT_CHUNK_SIZE, min_reviews: int = 0,
+                   stats: Optional[Dict[str, int]] = None) -> "ListingDataset":
+    """
+    Stream raw listings into a Parquet file, one converted batch at a time.
+
+    Only one batch of raw listings and its converted rows are in memory at
+    any time, so the file can be far larger than RAM. Each batch becomes one
+    row group, whose statistics let ListingDataset.filter skip row groups.
+    Rows keep their payload order rather than being sorted by price.
+
+    Args:
+        scraper: Scraper whose conversion is used
+        listings: Raw listings, e.g. the generator from iter_listings
+        path: Parquet file to write
+        batch_size: Listings converted and written per row group
+        min_reviews: Drop listings with fewer reviews
+        stats: Optional dict filled with the read, converted and rejected listing
+            counts, and the number of rows written
+
+    Returns:
+        The written dataset
+    """
+    read = converted = written = 0
+    iterator = iter(listings)
+    # Written under a temporary name so a failed stream never leaves a truncated file behind
+    tmp_path = f"{path}.tmp"
+    try:
+        with pq.ParquetWriter(tmp_path, LISTING_ARROW_SCHEMA) as writer:
+            while True:
+                chunk = list(islice(iterator, batch_size))
+                if not chunk:
+                    break
+                read += len(chunk)
+                frame = scraper._convert_chunk(chunk)
+                converted += len(frame)
+                if len(frame) and min_reviews:
+                    frame = frame[frame['Reviews Count'] >= min_reviews]
+                if len(frame):
+                    writer.write_table(_to_table(frame))
+                    written += len(frame)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+    if stats is not None:
+        stats.update({'read': read, 'converted': converted, 'rejected': read - converted, 'written': written})
+    return ListingDataset(path)
+
+
+class _Moments:
+    """Running count, mean and squared deviations of a column, merged batch by batch."""
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = np.inf
+        self.max = -np.inf
+
+    def add(self, values: np.ndarray) -> None:
+        """Merge the finite values of one batch (Chan et al.'s parallel update)."""
+        values = values[np.isfinite(values)]
+        if not len(values):
+            return
+        count, mean = len(values), float(values.mean())
+        deviations = values - mean
+        m2 = float(np.dot(deviations, deviations))
+        total = self.count + count
+        delta = mean - self.mean
+        self.mean += delta * count / total
+        self.m2 += m2 + delta * delta * self.count * count / total
+        self.count = total
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+
+
+class ListingDataset:
+    """Listings stored in a Parquet file and analyzed batch by batch.
+
+    The file is memory-mapped and read one column subset and one batch at a
+    time, so aggregates and filters need memory proportional to the
+    batch size rather than to the number of listings.
+    """
+
+    def __init__(self, path: str):
+        """Open a Parquet file written by write_listings or DataFrame.to_parquet of converted listings."""
+        self.path = path
+        self._file = pq.ParquetFile(path, memory_map=True)
+
+    def __len__(self) -> int:
+        """Number of listings."""
+        return self._file.metadata.num_rows
+
+    @property
+    def columns(self) -> List[str]:
+        """Column names."""
+        return self._file.schema_arrow.names
+
+    def iter_batches(self, columns: Optional[Sequence[str]] = None, batch_size: int = READ_BATCH_SIZE,
+                     row_groups: Optional[Sequence[int]] = None) -> Iterator[pa.RecordBatch]:
+        """Yield the listings as Arrow record batches, in file order."""
+        if row_groups is None:
+            row_groups = range(self._file.num_row_groups)
+        columns = [c for c in columns if c in self.columns] if columns is not None else None
+        for row_group in row_groups:
+            yield from self._file.iter_batches(batch_size, row_groups=[row_group], columns=columns)
+
+    def iter_frames(self, columns: Optional[Sequence[str]] = None,
+                    batch_size: int = READ_BATCH_SIZE) -> Iterator[pd.DataFrame]:
+        """Yield the listings as DataFrames of the listing schema, in file order."""
+        for batch in self.iter_batches(columns, batch_size):
+            yield _to_frame(pa.Table.from_batches([batch]))
+
+    def to_dataframe(self, columns: Optional[Sequence[str]] = None) -> pd.DataFrame:
+        """Load the listings, or some of their columns, into memory."""
+        columns = [c for c in columns if c in self.columns] if columns is not None else None
+        return _to_frame(self._file.read(columns=columns))
+
+    def _column(self, name: str, batch: pa.RecordBatch, dtype=np.float64) -> np.ndarray:
+        """Read one column of a batch as a numpy array, with nulls as NaN."""
+        values = batch.column(batch.schema.get_field_index(name))
+        if dtype is np.float64:
+            return values.to_numpy(zero_copy_only=False).astype(np.float64, copy=False)
+        return values.fill_null(False).to_numpy(zero_copy_only=False).astype(dtype, copy=False)
+
+    def aggregates(self, batch_size: int = READ_BATCH_SIZE) -> Dict:
+        """
+        Compute the market statistics of metrics.aggregate_arrays in streaming passes.
+
+        Sums, means and the standard deviation are merged batch by batch; the
+        median is selected exactly in a few more passes over the price column
+        only, see _select.
+        """
+        wanted = ['Price per Night', 'Overall Rating', 'Superhost', 'Reviews Count', 'Capacity', 'Room Type']
+        present = set(self.columns)
+        price, rating = _Moments(), _Moments()
+        count = superhosts = 0
+        reviews = capacity = 0.0
+        room_counts: Dict[str, int] = {}
+
+        for batch in self.iter_batches(wanted, batch_size):
+            count += batch.num_rows
+            price.add(self._column('Price per Night', batch))
+            rating.add(self._column('Overall Rating', batch))
+            if 'Superhost' in present:
+                superhosts += int(np.count_nonzero(self._column('Superhost', batch, bool)))
+            if 'Reviews Count' in present:
+                reviews += float(np.nansum(self._column('Reviews Count', batch)))
+            if 'Capacity' in present:
+                capacity += float(np.nansum(self._column('Capacity', batch)))
+            if 'Room Type' in present:
+                counted = pc.value_counts(batch.column(batch.schema.get_field_index('Room Type')))
+                for value, n in zip(counted.field('values').to_pylist(), counted.field('counts').to_pylist()):
+                    if value is not None:
+                        room_counts[value] = room_counts.get(value, 0) + n
+
+        median_price = np.nan
+        if price.count:
+            middle = [(price.count - 1) // 2, price.count // 2]
+            median_price = float(np.mean([self._select('Price per Night', rank, price, batch_size)
+                                          for rank in middle]))
+
+        def mean(total: float) -> float:
+            return total / count if count else np.nan
+
+        most_common_type = None
+        if room_counts:
+            # Ties go to the first type in sorted order, like the category codes of compute_aggregates
+            most_common_type = min(room_counts, key=lambda name: (-room_counts[name], name))
+
+        return {
+            "count": count,
+            "avg_price": price.mean if price.count else np.nan,
+            "std_price": float(np.sqrt(price.m2 / (price.count - 1))) if price.count > 1 else np.nan,
+            "median_price": median_price,
+            "min_price": price.min if price.count else np.nan,
+            "max_price": price.max if price.count else np.nan,
+            "avg_rating": rating.mean if rating.count else np.nan,
+            "superhost_ratio": mean(superhosts) * 100 if 'Superhost' in present else None,
+            "avg_reviews": mean(reviews) if 'Reviews Count' in present else None,
+            "avg_capacity": mean(capacity) if 'Capacity' in present else None,
+            "most_common_type": most_common_type,
+        }
+
+    def _select(self, column: str, rank: int, moments: _Moments, batch_size: int) -> float:
+        """
+        Return the value of a given rank among a column's finite values, reading it in batches.
+
+        Each pass histograms the values in the current range and narrows the
+        range to the actual minimum and maximum of the bin holding the rank.
+        Once few enough values remain they are loaded and partitioned in memory.
+        """
+        low, high, inside, offset = moments.min, moments.max, moments.count, 0
+        while low < high and inside > SELECT_EXACT_LIMIT:
+            counts = np.zeros(SELECT_BINS, dtype=np.int64)
+            lows = np.full(SELECT_BINS, np.inf)
+            highs = np.full(SELECT_BINS, -np.inf)
+            scale = SELECT_BINS / (high - low)
+            for batch in self.iter_batches([column], batch_size):
+                values = self._column(column, batch)
+                values = values[(values >= low) & (values <= high)]
+                bins = np.minimum(((values - low) * scale).astype(np.int64), SELECT_BINS - 1)
+                counts += np.bincount(bins, minlength=SELECT_BINS)
+                np.minimum.at(lows, bins, values)
+                np.maximum.at(highs, bins, values)
+            below = np.cumsum(counts) - counts
+            target = int(np.searchsorted(np.cumsum(counts), rank - offset, side="right"))
+            offset += int(below[target])
+            low, high, inside = lows[target], highs[target], int(counts[target])
+
+        if low == high:
+            return float(low)
+        candidates = [
+            values[(values >= low) & (values <= high)]
+            for values in (self._column(column, batch) for batch in self.iter_batches([column], batch_size))
+        ]
+        candidates = np.concatenate(candidates)
+        return float(np.partition(candidates, rank - offset)[rank - offset])
+
+    def _row_groups(self, price_range: Tuple[float, float], min_rating: float, min_guests: int) -> List[int]:
+        """Return the row groups whose column statistics allow a match."""
+        metadata = self._file.metadata
+        names = self.columns
+        selected = []
+        for row_group in range(metadata.num_row_groups):
+            group = metadata.row_group(row_group)
+
+            def bounds(name: str):
+                if name not in names:
+                    return None
+                statistics = group.column(names.index(name)).statistics
+                return (statistics.min, statistics.max) if statistics is not None and statistics.has_min_max else None
+
+            price, rating, capacity = bounds('Price per Night'), bounds('Overall Rating'), bounds('Capacity')
+            if price and (price[1] < price_range[0] or price[0] > price_range[1]):
+                continue
+            if rating and rating[1] < np.float32(min_rating):
+                continue
+            if capacity and capacity[1] < min_guests:
+                continue
+            selected.append(row_group)
+        return selected
+
+    def filter(self, price_range: Tuple[float, float], min_rating: float, room_types: Sequence[str],
+               superhost_only: bool = False, min_guests: int = 1, path: Optional[str] = None,
+               batch_size: int = READ_BATCH_SIZE) -> Union[pd.DataFrame, "ListingDataset"]:
+        """
+        Return the listings matching the sidebar filters, as utils.filter_listings does.
+
+        Row groups whose statistics rule out a match are skipped unread.
+
+        Args:
+            price_range, min_rating, room_types, superhost_only, min_guests: As for utils.filter_listings
+            path: Write the matches to this Parquet file, batch by batch, instead of returning them
+            batch_size: Rows read per batch
+
+        Returns:
+            The matching listings as a DataFrame, or as a ListingDataset when path is given
+        """
+        room_types = pa.array(list(room_types), type=pa.string())
+        tmp_path = f"{path}.tmp" if path else None
+        matches = []
+        try:
+            writer = pq.ParquetWriter(tmp_path, self._file.schema_arrow) if path else None
+            try:
+                for batch in self.iter_batches(None, batch_size, self._row_groups(price_range, min_rating, min_guests)):
+                    def column(name: str) -> pa.Array:
+                        return batch.column(batch.schema.get_field_index(name))
+
+                    price = column('Price per Night')
+                    mask = pc.and_(pc.greater_equal(price, price_range[0]), pc.less_equal(price, price_range[1]))
+                    # Compare in the column's own precision, as filter_listings does
+                    rating = column('Overall Rating')
+                    mask = pc.and_(mask, pc.greater_equal(rating, pa.scalar(min_rating, type=rating.type)))
+                    mask = pc.and_(mask, pc.is_in(column('Room Type'), value_set=room_types))
+                    if 'Capacity' in self.columns:
+                        mask = pc.and_(mask, pc.greater_equal(column('Capacity'), min_guests))
+                    if superhost_only and 'Superhost' in self.columns:
+                        mask = pc.and_(mask, column('Superhost'))
+                    matched = batch.filter(pc.fill_null(mask, False))
+                    if not matched.num_rows:
+                        continue
+                    if writer is not None:
+                        writer.write_batch(matched)
+                    else:
+                        matches.append(matched)
+            finally:
+                if writer is not None:
+                    writer.close()
+        except Exception:
+            # Do not leave a partial file behind
+            if tmp_path is not None and os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+        if path:
+            os.replace(tmp_path, path)
+            return ListingDataset(path)
+        if not matches:
+            return _to_frame(self._file.schema_arrow.empty_table())
+        return _to_frame(pa.Table.from_batches(matches))
@@ -0,0 +1,120 @@
+import hashlib
+import io
+from collections import OrderedDict
+from typing import Callable, Dict, Tuple
+import numpy as np
+import pandas as pd
+
+try:
+    from .config import EXPORT_CACHE_SIZE
+    from .telemetry import span
+except ImportError:  # Running as a script from src/ (streamlit run src/main.py)
+    from config import EXPORT_CACHE_SIZE
+    from telemetry import span
+
+
+def frame_fingerprint(df: pd.DataFrame) -> str:
+    """Return a content hash of a DataFrame, covering its columns, dtypes and rows."""
+    digest = hashlib.sha1()
+    digest.update(repr(list(zip(df.columns, map(str, df.dtypes)))).encode("utf-8"))
+    digest.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+def to_csv(df: pd.DataFrame) -> bytes:
+    """Serialize a DataFrame to CSV."""
+    return df.to_csv(index=False).encode("utf-8")
+
+
+def to_json(df: pd.DataFrame) -> bytes:
+    """Serialize a DataFrame to a JSON array of records."""
+    return df.to_json(orient="records").encode("utf-8")
+
+
+def to_parquet(df: pd.DataFrame) -> bytes:
+    """Serialize a DataFrame to Parquet."""
+    output = io.BytesIO()
+    df.to_parquet(output, index=False)
+    return output.getvalue()
+
+
+def _excel_value(value):
+    """Convert a cell value to something openpyxl can write."""
+    if value is None or value is pd.NA or (isinstance(value, float) and value != value):
+        return None
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+def to_excel(df: pd.DataFrame) -> bytes:
+    """
+    Serialize a DataFrame to an Excel workbook.
+
+    Uses openpyxl's write-only mode, which streams rows to the file instead of
+    building a cell object for every value in memory.
+    """
+    # openpyxl is only imported when an Excel export is prepared
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet("Sheet1")
+    sheet.append([str(column) for column in df.columns])
+    columns = [df[column].astype(object).tolist() for column in df.columns]
+    for row in zip(*columns):
+        sheet.append([_excel_value(value) for value in row])
+
+    output = io.BytesIO()
+    workbook.save(output)
+    return output.getvalue()
+
+
+# Export format -> (label, file extension, MIME type, serializer)
+EXPORT_FORMATS: Dict[str, Tuple[str, str, str, Callable[[pd.DataFrame], bytes]]] = {
+    "csv": ("CSV", "csv", "text/csv", to_csv),
+    "excel": ("Excel", "xlsx", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet", to_excel),
+    "json": ("JSON", "json", "application/json", to_json),
+    "parquet": ("Parquet", "parquet", "application/vnd.apache.parquet", to_parquet),
+}
+
+
+class ExportCache:
+    """Small LRU cache of serialized exports keyed by frame fingerprint and format."""
+
+    def __init__(self, max_entries: int = EXPORT_CACHE_SIZE):
+        """Initialize an empty cache holding at most max_entries exports."""
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[str, str], bytes]" = OrderedDict()
+
+    def get(self, fingerprint: str, fmt: str):
+        """Return a cached export, or None if it has not been built."""
+        key = (fingerprint, fmt)
+        if key not in self._entries:
+            return None
+        self._entries.move_to_end(key)
+        return self._entries[key]
+
+    def build(self, df: pd.DataFrame, fmt: str, fingerprint: str = None) -> bytes:
+        """
+        Return the export of a DataFrame in a format, serializing only on a miss.
+
+        Args:
+            df: DataFrame to export
+            fmt: Key of EXPORT_FORMATS
+            fingerprint: Precomputed frame_fingerprint(df), if available
+
+        Returns:
+            Serialized file contents
+        """
+        if fmt not in EXPORT_FORMATS:
+            raise ValueError(f"Unknown export format: {fmt}")
+        fingerprint = fingerprint or frame_fingerprint(df)
+        data = self.get(fingerprint, fmt)
+        if data is None:
+            with span("export", rows=len(df), format=fmt) as exported:
+                data = EXPORT_FORMATS[fmt][3](df)
+                exported.bytes = len(data)
+            self._entries[(fingerprint, fmt)] = data
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return data
@@ -0,0 +1,196 @@
+import hashlib
+from typing import Dict, Optional, Sequence, Tuple
+import numpy as np
+import pandas as pd
+
+try:
+    from .metrics import aggregate_arrays
+    from .amenities import AmenityMatrix
+    from .spatial import SpatialIndex
+except ImportError:  # Running as a script from src/ (streamlit run src/main.py)
+    from metrics import aggregate_arrays
+    from amenities import AmenityMatrix
+    from spatial import SpatialIndex
+
+
+class _RangeFilter:
+    """Range lookups on one numeric column through a presorted order.
+
+    The current selection is kept as a boolean mask over the original rows.
+    Moving a bound only flips the rows between the old and new bound positions
+    in sorted order, so a slider step costs time proportional to the rows it
+    adds or removes rather than to the size of the frame.
+    """
+
+    def __init__(self, values: np.ndarray):
+        """Sort a column once and start with every row selected."""
+        self.values = values
+        self.order = np.argsort(values, kind="stable")
+        self.sorted = values[self.order]
+        self.start = 0
+        # NaN sorts last and never satisfies a range comparison
+        self.stop = int(np.searchsorted(self.sorted, np.inf, side="right")) if values.dtype.kind == "f" else len(values)
+        self.mask = np.zeros(len(values), dtype=bool)
+        self.mask[self.order[self.start:self.stop]] = True
+
+    def _bounds(self, low: Optional[float], high: Optional[float]) -> Tuple[int, int]:
+        """Return the slice of the sorted order holding low <= value <= high."""
+        dtype = self.sorted.dtype.type
+        start = 0 if low is None else int(np.searchsorted(self.sorted, dtype(low), side="left"))
+        if high is None:
+            high = np.inf if self.sorted.dtype.kind == "f" else np.iinfo(self.sorted.dtype).max
+        stop = int(np.searchsorted(self.sorted, dtype(high), side="right"))
+        return start, max(start, stop)
+
+    def update(self, low: Optional[float], high: Optional[float]) -> np.ndarray:
+        """Move the selection to [low, high] and return the row mask."""
+        start, stop = self._bounds(low, high)
+        old_start, old_stop = self.start, self.stop
+        if stop <= old_start or start >= old_stop:
+            # No overlap with the previous selection
+            self.mask[self.order[old_start:old_stop]] = False
+            self.mask[self.order[start:stop]] = True
+        else:
+            if start < old_start:
+                self.mask[self.order[start:old_start]] = True
+            elif start > old_start:
+                self.mask[self.order[old_start:start]] = False
+            if stop > old_stop:
+                self.mask[self.order[old_stop:stop]] = True
+            elif stop < old_stop:
+                self.mask[self.order[stop:old_stop]] = False
+        self.start, self.stop = start, stop
+        return self.mask
+
+
+class FilterIndex:
+    """Reusable index over a listings DataFrame for the sidebar filters.
+
+    Built once per search. Price, rating and capacity are answered from
+    presorted arrays with searchsorted, room type and superhost from
+    precomputed bitmaps, required amenities from the amenity matrix's
+    bitsets and the distance to a point from a spatial grid index. The
+    result of each dimension is kept between queries so that moving one
+    widget only recomputes that dimension.
+    """
+
+    def __init__(self, df: pd.DataFrame, fingerprint: str = "", amenities: Optional[AmenityMatrix] = None):
+        """
+        Build the index.
+
+        Args:
+            df: Listings DataFrame as produced by AirbnbScraper.convert_to_dataframe
+            fingerprint: Fingerprint of df, used to derive fingerprints of filtered frames
+            amenities: Amenity matrix aligned with the rows of df
+        """
+        self.fingerprint = fingerprint
+        self.amenities = amenities
+        self._amenity_key = None
+        self._amenity_mask = None
+        self.size = len(df)
+        self.price = df['Price per Night'].to_numpy()
+        self.rating = df['Overall Rating'].to_numpy()
+        self.capacity = df['Capacity'].to_numpy() if 'Capacity' in df.columns else None
+        self.superhost = (
+            df['Superhost'].to_numpy(dtype=bool, na_value=False) if 'Superhost' in df.columns else None
+        )
+        self.reviews = df['Reviews Count'].to_numpy() if 'Reviews Count' in df.columns else None
+        self._coordinates = (
+            (df['Latitude'], df['Longitude']) if {'Latitude', 'Longitude'} <= set(df.columns) else None
+        )
+        self._spatial: Optional[SpatialIndex] = None
+        self._near_key = None
+        self._near_mask = None
+
+        self._ranges = {
+            'price': _RangeFilter(self.price),
+            'rating': _RangeFilter(self.rating),
+        }
+        if self.capacity is not None:
+            self._ranges['capacity'] = _RangeFilter(self.capacity)
+
+        room_types = df['Room Type'].astype('category')
+        codes = room_types.cat.codes.to_numpy()
+        self.room_codes = codes
+        self.room_types = list(room_types.cat.categories)
+        self.room_type_bitmaps: Dict[str, np.ndarray] = {
+            room_type: codes == code for code, room_type in enumerate(room_types.cat.categories)
+        }
+        self._room_key = None
+        self._room_mask = None
+
+    def _room_type_mask(self, room_types: Sequence[str]) -> np.ndarray:
+        """Return the union of the bitmaps of the selected room types."""
+        key = frozenset(room_types)
+        if key != self._room_key:
+            mask = np.zeros(self.size, dtype=bool)
+            for room_type in key:
+                bitmap = self.room_type_bitmaps.get(room_type)
+                if bitmap is not None:
+                    mask |= bitmap
+            self._room_key, self._room_mask = key, mask
+        return self._room_mask
+
+    def _required_amenities_mask(self, amenities: Sequence[str]) -> np.ndarray:
+        """Return the rows having every required amenity."""
+        key = frozenset(amenities)
+        if key != self._amenity_key:
+            self._amenity_key, self._amenity_mask = key, self.amenities.mask(all_of=list(key))
+        return self._amenity_mask
+
+    @property
+    def spatial(self) -> Optional[SpatialIndex]:
+        """Spatial index over the listing coordinates, built on first use; None without coordinates."""
+        if self._spatial is None and self._coordinates is not None:
+            latitudes, longitudes = self._coordinates
+            self._spatial = SpatialIndex(latitudes.to_numpy(dtype=np.float64, na_value=np.nan),
+                                         longitudes.to_numpy(dtype=np.float64, na_value=np.nan))
+        return self._spatial
+
+    def _near_mask_for(self, near: Tuple[float, float, float]) -> np.ndarray:
+        """Return the rows within radius_km of a point, given as (latitude, longitude, radius_km)."""
+        key = tuple(near)
+        if key != self._near_key:
+            mask = np.zeros(self.size, dtype=bool)
+            mask[self.spatial.radius(*key)] = True
+            self._near_key, self._near_mask = key, mask
+        return self._near_mask
+
+    def query(self, price_range: Tuple[float, float], min_rating: float, room_types: Sequence[str],
+              superhost_only: bool = False, min_guests: int = 1, amenities: Sequence[str] = (),
+              near: Optional[Tuple[float, float, float]] = None) -> np.ndarray:
+        """
+        Return the positions of the rows matching the filters, in frame order.
+
+        Matches utils.filter_listings for the same arguments. Required amenities
+        are ignored when the index has no amenity matrix, and near, a
+        (latitude, longitude, radius_km) circle, when the frame has no coordinates.
+        """
+        mask = self._ranges['price'].update(price_range[0], price_range[1])
+        mask = mask & self._ranges['rating'].update(min_rating, None)
+        mask &= self._room_type_mask(room_types)
+        if 'capacity' in self._ranges:
+            mask &= self._ranges['capacity'].update(min_guests, None)
+        if superhost_only and self.superhost is not None:
+            mask &= self.superhost
+        if amenities and self.amenities is not None:
+            mask &= self._required_amenities_mask(amenities)
+        if near is not None and self.spatial is not None:
+            mask &= self._near_mask_for(near)
+        return np.flatnonzero(mask)
+
+    def filtered_fingerprint(self, positions: np.ndarray) -> str:
+        """Derive the fingerprint of the frame holding the given rows of the indexed frame."""
+        digest = hashlib.sha1(self.fingerprint.encode("utf-8"))
+        digest.update(positions.astype(np.int64, copy=False).tobytes())
+        return digest.hexdigest()
+
+    def summarize(self, positions: np.ndarray) -> Dict:
+        """Compute the market statistics of the given rows from the indexed arrays, see metrics.aggregate_arrays."""
+        def take(values: Optional[np.ndarray]) -> Optional[np.ndarray]:
+            return values[positions] if values is not None else None
+
+        return aggregate_arrays(
+            self.price[positions], self.rating[positions], take(self.superhost), take(self.reviews),
+            take(self.capacity), self.room_codes[positions], self.room_types
+        )
@@ -0,0 +1,232 @@
+import heapq
+import itertools
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+try:
+    from .config import APIFY_MAX_CONCURRENT_RUNS, APIFY_RUN_STARTS_PER_MINUTE, APIFY_RUN_START_BURST
+except ImportError:  # Running as a script from src/ (streamlit run src/main.py)
+    from config import APIFY_MAX_CONCURRENT_RUNS, APIFY_RUN_STARTS_PER_MINUTE, APIFY_RUN_START_BURST
+
+# Queue priorities; lower values start first, equal priorities start in arrival order
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BATCH = 10
+# Assumed actor run duration for wait estimates until runs have been observed
+ESTIMATED_RUN_SECONDS = 60.0
+# Weight of the latest run in the moving average of run durations
+RUN_SECONDS_SMOOTHING = 0.2
+# Longest pause between queue position reports to a waiting caller
+QUEUE_REPORT_SECONDS = 1.0
+
+
+class RunTicket:
+    """A caller's place in the governor's queue, and then its running slot."""
+
+    def __init__(self, priority: int, sequence: int, enqueued: float):
+        self.priority = priority
+        self.sequence = sequence
+        self.enqueued = enqueued
+        self.granted: Optional[float] = None
+        self.released = False
+
+    def __lt__(self, other: "RunTicket") -> bool:
+        return (self.priority, self.sequence) < (other.priority, other.sequence)
+
+    @property
+    def waited(self) -> Optional[float]:
+        """Seconds spent queued, or None while still queued."""
+        return self.granted - self.enqueued if self.granted is not None else None
+
+
+class RunGovernor:
+    """Process-wide admission control for actor runs.
+
+    Callers queue in priority order, first in first out within a priority,
+    and a run may start once its caller is at the head of the queue, fewer
+    than ``max_concurrent`` runs hold a slot, and the token bucket refilled
+    at ``starts_per_minute`` holds a token. Up to ``burst`` starts go out at
+    once after a quiet period. Only the head of the queue is ever admitted,
+    so a burst of searches is spread out instead of exceeding the account's
+    concurrency or memory quota and failing on the Apify side.
+    """
+
+    def __init__(self, max_concurrent: Optional[int] = APIFY_MAX_CONCURRENT_RUNS,
+                 starts_per_minute: Optional[float] = APIFY_RUN_STARTS_PER_MINUTE,
+                 burst: int = APIFY_RUN_START_BURST, clock: Callable[[], float] = time.monotonic):
+        """
+        Create a governor.
+
+        Args:
+            max_concurrent: Most runs holding a slot at once (None = no limit)
+            starts_per_minute: Token bucket refill rate for run starts (None = no limit)
+            burst: Token bucket capacity, the most starts admitted back to back
+            clock: Monotonic clock, replaceable in tests
+        """
+        if max_concurrent is not None and max_concurrent < 1:
+            raise ValueError("max_concurrent must be at least 1")
+        if starts_per_minute is not None and starts_per_minute <= 0:
+            raise ValueError("starts_per_minute must be positive")
+        self.max_concurrent = max_concurrent
+        self.rate = starts_per_minute / 60 if starts_per_minute is not None else None
+        self.burst = max(int(burst), 1)
+        self._clock = clock
+        self._cond = threading.Condition()
+        self._queue: List[RunTicket] = []
+        self._sequence = itertools.count()
+        self._running = 0
+        self._tokens = float(self.burst)
+        self._refilled = clock()
+        self._run_seconds = ESTIMATED_RUN_SECONDS
+        self._stats = {"started": 0, "abandoned": 0, "peak_running": 0, "peak_queued": 0, "wait_seconds": 0.0}
+
+    def acquire(self, priority: int = PRIORITY_INTERACTIVE, timeout: Optional[float] = None,
+                on_wait: Optional[Callable[[int, float], None]] = None) -> RunTicket:
+        """
+        Wait for permission to start a run.
+
+        Args:
+            priority: Queue priority, e.g. PRIORITY_INTERACTIVE or PRIORITY_BATCH
+            timeout: Seconds to wait for a slot (None = no limit)
+            on_wait: Called while queued, at least every QUEUE_REPORT_SECONDS,
+                with the number of callers ahead and the estimated wait in seconds
+
+        Returns:
+            Ticket holding a running slot until passed to release
+
+        Raises:
+            TimeoutError: If no slot was granted within timeout seconds
+        """
+        with self._cond:
+            ticket = RunTicket(priority, next(self._sequence), self._clock())
+            heapq.heappush(self._queue, ticket)
+            self._stats["peak_queued"] = max(self._stats["peak_queued"], len(self._queue))
+        deadline = ticket.enqueued + timeout if timeout is not None else None
+        reported = None
+
+        try:
+            while True:
+                with self._cond:
+                    delay = self._grant_delay(ticket)
+                    if delay == 0:
+                        self._grant(ticket)
+                        return ticket
+                    now = self._clock()
+                    if deadline is not None and now >= deadline:
+                        raise TimeoutError(f"No actor run slot became free within {timeout:g}s")
+                    if on_wait is None or (reported is not None and now - reported < QUEUE_REPORT_SECONDS):
+                        limits = [limit for limit in (
+                            delay,
+                            deadline - now if deadline is not None else None,
+                            reported + QUEUE_REPORT_SECONDS - now if on_wait is not None else None,
+                        ) if limit is not None]
+                        self._cond.wait(min(limits) if limits else None)
+                        continue
+                    reported = now
+                    position, estimate = self._position(ticket), self._estimate(ticket)
+                # Report outside the lock, so a slow callback does not hold up other callers
+                on_wait(position, estimate)
+        except BaseException:
+            with self._cond:
+                if ticket.granted is None:
+                    self._abandon(ticket)
+            raise
+
+    def release(self, ticket: RunTicket) -> None:
+        """Free a ticket's running slot once its run has finished. Releasing twice has no effect."""
+        with self._cond:
+            if ticket.granted is None or ticket.released:
+                return
+            ticket.released = True
+            self._running -= 1
+            seconds = self._clock() - ticket.granted
+            self._run_seconds += RUN_SECONDS_SMOOTHING * (seconds - self._run_seconds)
+            self._cond.notify_all()
+
+    def position(self, ticket: RunTicket) -> int:
+        """Number of queued callers that will start before a ticket, or 0 once it holds a slot."""
+        with self._cond:
+            return self._position(ticket)
+
+    def estimated_wait(self, ticket: RunTicket) -> float:
+        """Estimated seconds until a queued ticket is granted a slot."""
+        with self._cond:
+            return self._estimate(ticket)
+
+    def stats(self) -> Dict[str, Any]:
+        """Current queue length and running runs, plus counters since the governor was created."""
+        with self._cond:
+            return {"queued": len(self._queue), "running": self._running, **self._stats}
+
+    def _refill(self) -> None:
+        """Add the tokens earned since the last refill."""
+        now = self._clock()
+        if self.rate is not None:
+            self._tokens = min(self.burst, self._tokens + (now - self._refilled) * self.rate)
+        self._refilled = now
+
+    def _grant_delay(self, ticket: RunTicket) -> Optional[float]:
+        """Seconds until a ticket can be granted: 0 now, None until another run finishes or starts."""
+        if not self._queue or self._queue[0] is not ticket:
+            return None
+        if self.max_concurrent is not None and self._running >= self.max_concurrent:
+            return None
+        if self.rate is None:
+            return 0.0
+        self._refill()
+        return 0.0 if self._tokens >= 1 else (1 - self._tokens) / self.rate
+
+    def _grant(self, ticket: RunTicket) -> None:
+        """Move the head of the queue into a running slot."""
+        heapq.heappop(self._queue)
+        if self.rate is not None:
+            self._tokens -= 1
+        ticket.granted = self._clock()
+        self._running += 1
+        self._stats["started"] += 1
+        self._stats["peak_running"] = max(self._stats["peak_running"], self._running)
+        self._stats["wait_seconds"] += ticket.waited
+        # The next caller may be admissible right away
+        self._cond.notify_all()
+
+    def _abandon(self, ticket: RunTicket) -> None:
+        """Drop a ticket that gave up waiting."""
+        self._queue.remove(ticket)
+        heapq.heapify(self._queue)
+        self._stats["abandoned"] += 1
+        self._cond.notify_all()
+
+    def _position(self, ticket: RunTicket) -> int:
+        """Number of queued tickets ahead of a ticket."""
+        if ticket.granted is not None:
+            return 0
+        return sum(other < ticket for other in self._queue)
+
+    def _estimate(self, ticket: RunTicket) -> float:
+        """Estimate a queued ticket's wait from the free slots, the run duration average and the bucket."""
+        if ticket.granted is not None:
+            return 0.0
+        ahead = self._position(ticket)
+        slot_wait = 0.0
+        if self.max_concurrent is not None:
+            free = self.max_concurrent - self._running
+            if ahead >= free:
+                slot_wait = ((ahead - free) // self.max_concurrent + 1) * self._run_seconds
+        token_wait = 0.0
+        if self.rate is not None:
+            self._refill()
+            token_wait = max(ahead + 1 - self._tokens, 0.0) / self.rate
+        return max(slot_wait, token_wait)
+
+
+_default_governor: Optional[RunGovernor] = None
+_default_lock = threading.Lock()
+
+
+def default_governor() -> RunGovernor:
+    """Return the governor shared by every scraper in this process."""
+    global _default_governor
+    with _default_lock:
+        if _default_governor is None:
+            _default_governor = RunGovernor()
+        return _default_governor
@@ -0,0 +1,159 @@
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Dict, Optional, Tuple
+import pandas as pd
+
+try:
+    from .config import SEARCH_WORKERS
+    from .telemetry import Trace, trace
+except ImportError:  # Running as a script from src/ (streamlit run src/main.py)
+    from config import SEARCH_WORKERS
+    from telemetry import Trace, trace
+
+
+class SearchJob:
+    """Handle on a search running in the background, shared by every caller that asked for it.
+
+    The latest partial results and queue report are updated by the worker
+    while the search runs, so callers can poll them without blocking.
+    """
+
+    def __init__(self, key: str, location: str, currency: str, max_results: Optional[int],
+                 progressive: bool = True):
+        self.key = key
+        self.location = location
+        self.currency = currency
+        self.max_results = max_results
+        self.progressive = progressive
+        self.submitted = time.monotonic()
+        self.subscribers = 1
+        self.future: "Future[pd.DataFrame]" = Future()
+        self.trace: Optional[Trace] = None
+        self._lock = threading.Lock()
+        self._partial: Tuple[Optional[pd.DataFrame], int] = (None, 0)
+        self._queue: Optional[Tuple[int, float]] = None
+
+    def done(self) -> bool:
+        """Whether the search has finished, successfully or not."""
+        return self.future.done()
+
+    def result(self, timeout: Optional[float] = None) -> pd.DataFrame:
+        """Return the listings, waiting up to timeout seconds; raises the search's error if it failed."""
+        return self.future.result(timeout)
+
+    def elapsed(self) -> float:
+        """Seconds since the search was submitted."""
+        return time.monotonic() - self.submitted
+
+    def partial(self) -> Tuple[Optional[pd.DataFrame], int]:
+        """Return the listings converted so far (None before the first page) and the raw listings read."""
+        with self._lock:
+            return self._partial
+
+    def queue(self) -> Optional[Tuple[int, float]]:
+        """Return the runs queued ahead and the estimated wait while the actor run is queued, else None."""
+        with self._lock:
+            return self._queue
+
+    def _progress(self, df: pd.DataFrame, read: int) -> None:
+        """Record the listings converted so far; the run has left the queue by then."""
+        with self._lock:
+            self._partial = (df, read)
+            self._queue = None
+
+    def _queued(self, ahead: int, estimated_wait: float) -> None:
+        """Record the latest queue report of the actor run; 0 runs ahead and no wait means it was admitted."""
+        with self._lock:
+            self._queue = (ahead, estimated_wait) if ahead or estimated_wait else None
+
+
+class SearchRunner:
+    """Runs searches on a pool of background threads, coalescing identical searches.
+
+    Searches are identified by the scrape cache key of their location,
+    currency and result limit. While a search is in flight, submitting the
+    same search again returns the existing job instead of starting a second
+    actor run, and every caller holding the job sees the same result. A
+    finished job is forgotten, so later searches go through the scrape cache.
+    """
+
+    def __init__(self, cache, workers: int = SEARCH_WORKERS):
+        """
+        Create the runner.
+
+        Args:
+            cache: ScrapeCache used to fetch listings
+            workers: Searches run at the same time; further searches wait for a thread
+        """
+        if workers < 1:
+            raise ValueError("workers must be at least 1")
+        self.cache = cache
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="search")
+        self._lock = threading.Lock()
+        self._in_flight: Dict[str, SearchJob] = {}
+
+    def submit(self, location: str, currency: str = "USD", max_results: int = None,
+               force_refresh: bool = False, progressive: bool = True) -> SearchJob:
+        """
+        Start a search in the background, or join the identical search already in flight.
+
+        Args:
+            location: City or area to search
+            currency: Currency for prices
+            max_results: Maximum number of listings to fetch (default: None = all)
+            force_refresh: Ignore cached results; an in-flight search is joined
+                anyway, since its results are fresh
+            progressive: Stream the actor's items and keep partial results up to
+                date; a joined search keeps the mode it was started with
+
+        Returns:
+            Job handle to poll for progress and the result
+        """
+        key = self.cache.make_key(location, currency, max_results)
+        with self._lock:
+            job = self._in_flight.get(key)
+            if job is not None:
+                job.subscribers += 1
+                return job
+            job = SearchJob(key, location, currency, max_results, progressive)
+            self._in_flight[key] = job
+        self._executor.submit(self._run, job, force_refresh)
+        return job
+
+    def in_flight(self) -> int:
+        """Number of distinct searches queued or running."""
+        with self._lock:
+            return len(self._in_flight)
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop accepting searches, optionally waiting for the running ones."""
+        self._executor.shutdown(wait=wait)
+
+    def _run(self, job: SearchJob, force_refresh: bool) -> None:
+        """Fetch a job's listings and settle its future, then forget the job."""
+        try:
+            with trace(f"search {job.location}") as job.trace:
+                # Partial frames cost a conversion pass per page, so only progressive searches build them
+                df = self.cache.get_dataframe(job.location, job.currency, max_results=job.max_results,
+                                              force_refresh=force_refresh,
+                                              on_progress=job._progress if job.progressive else None,
+                                              on_queue=job._queued)
+        except BaseException as e:
+            self._finish(job)
+            job.future.set_exception(e)
+        else:
+            self._finish(job)
+            job.future.set_result(df)
+
+    def _finish(self, job: SearchJob) -> None:
+        """Stop coalescing new searches onto a job before its result is published."""
+        with self._lock:
+            if self._in_flight.get(job.key) is job:
+                del self._in_flight[job.key]
+
+    def stats(self) -> Dict[str, Any]:
+        """Searches in flight and the callers waiting on them."""
+        with self._lock:
+            return {"in_flight": len(self._in_flight),
+                    "subscribers": sum(job.subscribers for job in self._in_flight.values())}
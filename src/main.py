@@ -1,16 +1,27 @@
+from concurrent.futures import wait
 import streamlit as st
+import numpy as np
 import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
 from dotenv import load_dotenv
-import folium
-from streamlit_folium import folium_static
-import io
 from scraper import AirbnbScraper
+from cache import ScrapeCache
+from utils import format_bytes, dataframe_memory
+from filters import FilterIndex
+from metrics import compute_aggregates
+from maps import densest_point
+from spatial import radius_bbox
+from exports import EXPORT_FORMATS, ExportCache, frame_fingerprint
+from telemetry import Trace, configure_json_log, current_trace, span, trace, write_prometheus
+from jobs import SearchRunner
+from config import (MAP_DENSITY_THRESHOLD, CACHE_TTL_SECONDS, PROGRESSIVE_REFRESH_SECONDS, PERF_LOG_FILE,
+                    METRICS_FILE, SHOW_PERFORMANCE_PANEL)
 
 # Load environment variables
 load_dotenv()
 
+if PERF_LOG_FILE:
+    configure_json_log(PERF_LOG_FILE)
+
 # Initialize session state variables
 if 'full_df' not in st.session_state:
     st.session_state.full_df = None
@@ -18,6 +29,12 @@ if 'location' not in st.session_state:
     st.session_state.location = None
 if 'search_performed' not in st.session_state:
     st.session_state.search_performed = False
+if 'full_fingerprint' not in st.session_state:
+    st.session_state.full_fingerprint = None
+if 'refresh_token' not in st.session_state:
+    st.session_state.refresh_token = 0
+if 'search' not in st.session_state:
+    st.session_state.search = None
 
 # Page config
 st.set_page_config(
@@ -27,22 +44,33 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-def create_price_distribution_plot(df):
-    """Create a price distribution plot with enhanced styling."""
+def create_price_distribution_plot(df, stats=None):
+    """Create a price distribution plot with enhanced styling.
+
+    Args:
+        df: Listings to plot
+        stats: Precomputed aggregates of df (default: computed here)
+    """
+    import plotly.graph_objects as go
+    from charts import bin_edges, histogram_trace
+
     fig = go.Figure()
     
-    # Add histogram
-    fig.add_trace(go.Histogram(
-        x=df["Price per Night"],
-        nbinsx=30,
+    # Add histogram, binned here so the chart carries counts rather than every price
+    prices = df["Price per Night"].to_numpy(dtype='float64', na_value=np.nan)
+    fig.add_trace(histogram_trace(
+        prices,
+        bin_edges(prices, bins=30),
         name="Properties",
-        marker_color='#FF385C',
-        hovertemplate="Price: $%{x}<br>Count: %{y}<extra></extra>"
+        color='#FF385C',
+        hover_label="Price",
+        prefix="$"
     ))
     
-    # Calculate statistics
-    mean_price = df["Price per Night"].mean()
-    median_price = df["Price per Night"].median()
+    # Mean and median come from the shared aggregates
+    stats = stats or compute_aggregates(df)
+    mean_price = stats["avg_price"]
+    median_price = stats["median_price"]
     
     # Add mean and median lines
     fig.add_vline(x=mean_price, line_dash="dash", line_color="#484848",
@@ -72,6 +100,9 @@ def create_price_distribution_plot(df):
 
 def create_rating_histogram(df):
     """Create a histogram of ratings distribution with enhanced styling."""
+    import plotly.graph_objects as go
+    from charts import histogram_trace, shared_edges
+
     fig = go.Figure()
     
     # Custom colors for better visibility
@@ -82,16 +113,21 @@ def create_rating_histogram(df):
         'Value Rating': '#484848'        # Dark gray
     }
     
-    # Add each rating type histogram
-    for rating_type, color in colors.items():
-        if rating_type in df.columns:  # Check if column exists
-            fig.add_trace(go.Histogram(
-                x=df[rating_type],
-                name=rating_type.replace(' Rating', ''),
-                nbinsx=20,
-                marker_color=color,
-                hovertemplate="Rating: %{x}<br>Count: %{y}<extra></extra>"
-            ))
+    # Add each rating type histogram over shared bins so the overlaid bars line up
+    ratings = {
+        rating_type: df[rating_type].to_numpy(dtype='float64', na_value=np.nan)
+        for rating_type in colors if rating_type in df.columns  # Check if column exists
+    }
+    edges = shared_edges(list(ratings.values()), bins=20)
+    for rating_type, values in ratings.items():
+        fig.add_trace(histogram_trace(
+            values,
+            edges,
+            name=rating_type.replace(' Rating', ''),
+            color=colors[rating_type],
+            hover_label="Rating",
+            value_format=".1f"
+        ))
     
     # Update layout with better styling
     fig.update_layout(
@@ -125,10 +161,169 @@ def create_rating_histogram(df):
     
     return fig
 
-def filter_dataframe(df: pd.DataFrame) -> pd.DataFrame:
-    """Apply filters from sidebar to the dataframe."""
+# Pipeline stages are memoized by content: frames are keyed by their fingerprint, and
+# arguments starting with an underscore are excluded from Streamlit's cache key.
+@st.cache_resource(show_spinner=False)
+def get_scraper() -> AirbnbScraper:
+    """Return the process-wide scraper so the Apify client is created once."""
+    return AirbnbScraper()
+
+@st.cache_resource(show_spinner=False)
+def get_scrape_cache() -> ScrapeCache:
+    """Return the process-wide on-disk scrape cache."""
+    return ScrapeCache(get_scraper())
+
+@st.cache_resource(show_spinner=False)
+def get_search_runner() -> SearchRunner:
+    """Return the process-wide background search pool, shared by every session."""
+    return SearchRunner(get_scrape_cache())
+
+def render_map(df: pd.DataFrame, viewport=None, height: int = 600):
+    """Draw the listings map; folium and streamlit_folium are imported on the first map drawn."""
+    from maps import build_listings_map
+    from streamlit_folium import folium_static
+
+    folium_static(build_listings_map(df, viewport=viewport), width=1400, height=height)
+
+def render_partial_results(df: pd.DataFrame, read: int, expected: int, slots: dict):
+    """Redraw the progress, metrics, price histogram and map placeholders of a running search."""
+    slots["progress"].progress(
+        min(read / expected, 1.0) if expected else 0.0,
+        text=f"Fetched {read} of up to {expected} listings..."
+    )
+    if df.empty:
+        return
+
+    stats = compute_aggregates(df)
+    with slots["metrics"].container():
+        col1, col2, col3, col4 = st.columns(4)
+        col1.metric("Listings So Far", str(stats['count']))
+        col2.metric("Average Price", f"${stats['avg_price']:.2f}")
+        col3.metric("Average Rating", f"{stats['avg_rating']:.1f}/5")
+        col4.metric("Superhost Ratio", f"{stats['superhost_ratio']:.1f}%")
+    with span("chart", rows=len(df), figure="price_distribution"):
+        slots["chart"].plotly_chart(
+            create_price_distribution_plot(df, stats),
+            use_container_width=True,
+            config={'displayModeBar': False}
+        )
+    with slots["map"].container(), span("map", rows=len(df)):
+        render_map(df, height=400)
+
+def follow_search(search: dict):
+    """
+    Show the progress of this session's background search until it finishes.
+
+    The search runs on the background pool, so interacting with the app only
+    interrupts this display; the next rerun picks the search up again. Partial
+    results are redrawn in place when new listings arrived, at most every
+    PROGRESSIVE_REFRESH_SECONDS, and cleared once the search completes.
+    """
+    job = search["job"]
+    live = st.empty()
+    with live.container():
+        st.subheader("⏳ Live Results")
+        slots = {
+            "progress": st.progress(0.0, text="Starting search..."),
+            "metrics": st.empty(),
+            "chart": st.empty(),
+            "map": st.empty(),
+        }
+    shown = None
+    try:
+        while not job.done():
+            df, read = job.partial()
+            queue = job.queue()
+            if queue is not None:
+                ahead, estimated_wait = queue
+                waiting = f"{ahead} search{'es' if ahead != 1 else ''} ahead" if ahead else "next in line"
+                slots["progress"].progress(
+                    0.0, text=f"Waiting for a scraper slot ({waiting}, about {estimated_wait:.0f}s)..."
+                )
+            elif df is not None and read != shown:
+                shown = read
+                if not search["progressive"]:
+                    df = pd.DataFrame()
+                elif not df.empty:
+                    df = df[df['Reviews Count'] >= search["min_reviews"]]
+                render_partial_results(df, read, search["max_results"], slots)
+            wait([job.future], timeout=PROGRESSIVE_REFRESH_SECONDS)
+    finally:
+        live.empty()
+
+def collect_search_result(search: dict) -> bool:
+    """Store the listings of this session's finished search in the session state. Returns False on failure."""
+    job = search["job"]
+    try:
+        df = job.result()
+    except Exception as e:
+        st.error(f"Error analyzing market data: {str(e)}")
+        return False
+
+    # Show the background search's stages in this rerun's performance breakdown
+    rerun = current_trace()
+    if rerun is not None and job.trace is not None:
+        for finished in job.trace.spans:
+            rerun.add(finished)
+
+    if df.empty:
+        st.warning(f"No listings found for {search['location']}. Try another location.")
+        return False
+
+    df, fingerprint = apply_min_reviews(df, frame_fingerprint(df), search["min_reviews"])
+    amenities = load_amenities(search["location"], search["currency"], search["max_results"],
+                               st.session_state.refresh_token)
+
+    st.session_state.amenities = amenities.align(df['ID']) if amenities is not None and len(df) else None
+    st.session_state.full_df = df
+    st.session_state.full_fingerprint = fingerprint
+    st.session_state.location = search["location"]
+    st.session_state.search_performed = True
+    return True
+
+@st.cache_data(ttl=CACHE_TTL_SECONDS, max_entries=16, show_spinner=False)
+def load_amenities(location: str, currency: str, max_results: int, refresh_token: int = 0):
+    """Load the amenity matrix encoded when a search was scraped, or None if unavailable."""
+    return get_scrape_cache().get_amenities(location, currency, max_results=max_results)
+
+@st.cache_data(max_entries=16, show_spinner=False)
+def apply_min_reviews(_df: pd.DataFrame, fingerprint: str, min_reviews: int):
+    """Drop listings with too few reviews. Returns the frame and its fingerprint."""
+    df = _df[_df['Reviews Count'] >= min_reviews]
+    return df, frame_fingerprint(df)
+
+def get_filter_index(df: pd.DataFrame, fingerprint: str) -> FilterIndex:
+    """Return this session's filter index for a frame, building it once per search."""
+    index = st.session_state.get('filter_index')
+    if index is None or index.fingerprint != fingerprint:
+        index = FilterIndex(df, fingerprint, st.session_state.get('amenities'))
+        st.session_state.filter_index = index
+    return index
+
+@st.cache_data(max_entries=64, show_spinner=False)
+def summarize_listings(_df: pd.DataFrame, fingerprint: str) -> dict:
+    """Compute the market aggregates shown in the sidebar and overview."""
+    return compute_aggregates(_df)
+
+@st.cache_data(max_entries=64, show_spinner=False)
+def frame_memory(_df: pd.DataFrame, fingerprint: str) -> int:
+    """Memory used by a frame, including string contents."""
+    return dataframe_memory(_df)
+
+@st.cache_data(max_entries=64, show_spinner=False)
+def price_distribution_figure(_df: pd.DataFrame, fingerprint: str, _stats: dict = None):
+    """Cached create_price_distribution_plot for a filtered frame."""
+    return create_price_distribution_plot(_df, _stats)
+
+@st.cache_data(max_entries=64, show_spinner=False)
+def rating_histogram_figure(_df: pd.DataFrame, fingerprint: str):
+    """Cached create_rating_histogram for a filtered frame."""
+    return create_rating_histogram(_df)
+
+def filter_dataframe(df: pd.DataFrame, fingerprint: str):
+    """Apply filters from sidebar to the dataframe. Returns the filtered frame, its fingerprint and aggregates."""
     if df is None or len(df) == 0:
-        return None
+        return None, None, None
         
     st.sidebar.header("🔍 Filters")
     
@@ -182,35 +377,61 @@ def filter_dataframe(df: pd.DataFrame) -> pd.DataFrame:
     else:
         min_guests = 1
     
-    # Apply filters
-    mask = (
-        (df['Price per Night'] >= price_range[0]) &
-        (df['Price per Night'] <= price_range[1]) &
-        (df['Overall Rating'] >= min_rating) &
-        (df['Room Type'].isin(selected_room_types))
-    )
-    
-    # Add capacity filter if available
-    if 'Capacity' in df.columns:
-        mask &= (df['Capacity'] >= min_guests)
+    # Amenity Filter if the search's amenities were encoded
+    index = get_filter_index(df, fingerprint)
+    required_amenities = []
+    if index.amenities is not None and index.amenities.vocabulary:
+        by_frequency = index.amenities.frequency()['Amenity'].tolist()
+        required_amenities = st.sidebar.multiselect(
+            "Required Amenities",
+            options=by_frequency,
+            key='amenity_filter'
+        )
     
-    # Add superhost filter if available
-    if superhost_only and 'Superhost' in df.columns:
-        mask &= df['Superhost']
+    # Distance Filter if the listings have coordinates
+    near = None
+    if index.spatial is not None and len(index.spatial):
+        if st.sidebar.checkbox("Only Listings Near a Point", key='near_filter'):
+            center_lat, center_lon = densest_point(df)
+            near_lat = st.sidebar.number_input(
+                "Latitude", min_value=-90.0, max_value=90.0, value=center_lat, format="%.5f", key='near_lat'
+            )
+            near_lon = st.sidebar.number_input(
+                "Longitude", min_value=-180.0, max_value=180.0, value=center_lon, format="%.5f", key='near_lon'
+            )
+            radius_km = st.sidebar.slider(
+                "Radius (km)", min_value=0.1, max_value=25.0, value=2.0, step=0.1, key='near_radius'
+            )
+            near = (near_lat, near_lon, radius_km)
+    # The map zooms to the selected circle and only renders the listings inside it
+    st.session_state.map_viewport = radius_bbox(*near) if near is not None else None
     
-    filtered_df = df[mask]
+    # Apply filters
+    with span("filter", rows=len(df)) as filtered:
+        positions = index.query(
+            price_range, min_rating, selected_room_types, superhost_only, min_guests, required_amenities, near
+        )
+        filtered_df = df.take(positions)
+        filtered_fingerprint = index.filtered_fingerprint(positions)
+        stats = index.summarize(positions)
+        filtered.rows = len(positions)
     
     # Additional Stats in Sidebar
     st.sidebar.header("📊 Stats")
-    st.sidebar.metric("Listings Found", f"{len(filtered_df)}")
-    st.sidebar.metric("Average Price", f"${filtered_df['Price per Night'].mean():.2f}")
-    st.sidebar.metric("Average Rating", f"{filtered_df['Overall Rating'].mean():.1f}/5")
+    st.sidebar.metric("Listings Found", f"{stats['count']}")
+    st.sidebar.metric("Average Price", f"${stats['avg_price']:.2f}")
+    st.sidebar.metric("Average Rating", f"{stats['avg_rating']:.1f}/5")
     
     # Show capacity stats if available
-    if 'Capacity' in filtered_df.columns:
-        st.sidebar.metric("Average Capacity", f"{filtered_df['Capacity'].mean():.1f} guests")
+    if stats['avg_capacity'] is not None:
+        st.sidebar.metric("Average Capacity", f"{stats['avg_capacity']:.1f} guests")
     
-    return filtered_df
+    st.sidebar.caption(
+        f"Memory: {format_bytes(frame_memory(df, fingerprint))} loaded, "
+        f"{format_bytes(frame_memory(filtered_df, filtered_fingerprint))} filtered"
+    )
+    
+    return filtered_df, filtered_fingerprint, stats
     if df is None or len(df) == 0:
         return None
         
@@ -282,12 +503,15 @@ def filter_dataframe(df: pd.DataFrame) -> pd.DataFrame:
     
     return filtered_df
 
-def display_results(df, location):
+def display_results(df, location, fingerprint=None, stats=None):
     """Display all visualizations and data for the filtered results."""
     if df is None or len(df) == 0:
         st.warning("No listings match your filters. Try adjusting the filter criteria.")
         return
     
+    fingerprint = fingerprint or frame_fingerprint(df)
+    stats = stats or summarize_listings(df, fingerprint)
+    
     with st.container():
         # Summary metrics
         st.subheader("📊 Market Overview")
@@ -296,80 +520,49 @@ def display_results(df, location):
         with col1:
             st.metric(
                 "Average Price", 
-                f"${df['Price per Night'].mean():.2f}",
-                delta=f"${df['Price per Night'].std():.2f} std"
+                f"${stats['avg_price']:.2f}",
+                delta=f"${stats['std_price']:.2f} std"
             )
         with col2:
             st.metric(
                 "Average Rating", 
-                f"{df['Overall Rating'].mean():.1f}/5",
-                delta=f"{(df['Overall Rating'].mean() - 4.5):.2f} from baseline"
+                f"{stats['avg_rating']:.1f}/5",
+                delta=f"{(stats['avg_rating'] - 4.5):.2f} from baseline"
             )
         with col3:
-            st.metric("Total Listings", str(len(df)))
+            st.metric("Total Listings", str(stats['count']))
         with col4:
             st.metric(
                 "Superhost Ratio", 
-                f"{(df['Superhost'].mean() * 100):.1f}%"
+                f"{stats['superhost_ratio']:.1f}%"
             )
 
         # Visualizations
         st.subheader("📈 Price and Rating Analysis")
         viz_col1, viz_col2 = st.columns([1, 1])
         
-        with viz_col1:
+        with viz_col1, span("chart", rows=len(df), figure="price_distribution"):
             st.plotly_chart(
-                create_price_distribution_plot(df), 
+                price_distribution_figure(df, fingerprint, stats), 
                 use_container_width=True,
                 config={'displayModeBar': False}
             )
         
-        with viz_col2:
+        with viz_col2, span("chart", rows=len(df), figure="rating_histogram"):
             st.plotly_chart(
-                create_rating_histogram(df), 
+                rating_histogram_figure(df, fingerprint), 
                 use_container_width=True,
                 config={'displayModeBar': False}
             )
 
         # Map
         st.subheader("📍 Property Locations")
-        m = folium.Map(
-            location=[df['Latitude'].mean(), df['Longitude'].mean()],
-            zoom_start=13,
-            width='100%',
-            height='600px'
-        )
-        
-        for _, row in df.iterrows():
-            popup_html = f"""
-                <div style="width: 300px;">
-                    <h4 style="color: #FF385C; margin-bottom: 10px;">{row['Title']}</h4>
-                    <p><strong>Price:</strong> ${row['Price per Night']:.2f}/night</p>
-                    <p><strong>Rating:</strong> {row['Overall Rating']:.1f}/5 ({row['Reviews Count']} reviews)</p>
-                    <p><strong>Type:</strong> {row['Room Type']}</p>
-                    <p><strong>Capacity:</strong> {row['Capacity']} guests</p>
-                    <a href="{row['URL']}" target="_blank" 
-                       style="background-color: #FF385C; color: white; 
-                              padding: 5px 10px; text-decoration: none; 
-                              border-radius: 4px; display: inline-block;
-                              margin-top: 10px;">
-                        View on Airbnb
-                    </a>
-                </div>
-            """
+        viewport = st.session_state.get('map_viewport')
+        with span("map", rows=len(df)):
+            if len(df) > MAP_DENSITY_THRESHOLD and viewport is None:
+                st.caption(f"Showing listing density for {len(df)} listings. Narrow the filters to see individual properties.")
             
-            folium.Marker(
-                [row['Latitude'], row['Longitude']],
-                popup=folium.Popup(popup_html, max_width=350),
-                tooltip=f"${row['Price per Night']:.0f}/night - {row['Room Type']}",
-                icon=folium.Icon(
-                    color='red' if row['Superhost'] else 'blue',
-                    icon='home' if row['Room Type'] == 'Entire home/apt' else 'bed',
-                    prefix='fa'
-                )
-            ).add_to(m)
-        
-        folium_static(m, width=1400, height=600)
+            render_map(df, viewport, height=600)
 
         # Listings Table
         st.subheader("📋 Detailed Listings")
@@ -384,37 +577,35 @@ def display_results(df, location):
 
         # Downloads
         st.subheader("⬇️ Export Data")
+        if 'export_cache' not in st.session_state:
+            st.session_state.export_cache = ExportCache()
+        export_cache = st.session_state.export_cache
+
+        # Exports are only serialized on request and reused while the filtered data is unchanged
         dl_col1, dl_col2, dl_col3 = st.columns([1, 1, 1])
-        
+
         with dl_col1:
-            st.download_button(
-                "📥 Download CSV",
-                data=df.to_csv(index=False),
-                file_name=f"airbnb_{location.lower()}.csv",
-                mime="text/csv",
-                use_container_width=True,
-            )
-        
+            formats_by_label = {spec[0]: key for key, spec in EXPORT_FORMATS.items()}
+            fmt = formats_by_label[st.selectbox(
+                "Format",
+                options=list(formats_by_label),
+                label_visibility="collapsed"
+            )]
+        label, extension, mime, _ = EXPORT_FORMATS[fmt]
+
         with dl_col2:
-            output = io.BytesIO()
-            with pd.ExcelWriter(output, engine='openpyxl') as writer:
-                df.to_excel(writer, index=False)
-            excel_data = output.getvalue()
-            
-            st.download_button(
-                "📊 Download Excel",
-                data=excel_data,
-                file_name=f"airbnb_{location.lower()}.xlsx",
-                mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-                use_container_width=True,
-            )
-        
+            if st.button(f"⚙️ Prepare {label}", use_container_width=True):
+                with st.spinner(f"Preparing {label} export..."):
+                    export_cache.build(df, fmt, fingerprint)
+
         with dl_col3:
+            data = export_cache.get(fingerprint, fmt)
             st.download_button(
-                "🔍 Download JSON",
-                data=df.to_json(orient='records'),
-                file_name=f"airbnb_{location.lower()}.json",
-                mime="application/json",
+                f"📥 Download {label}",
+                data=data or b"",
+                file_name=f"airbnb_{location.lower()}.{extension}",
+                mime=mime,
+                disabled=data is None,
                 use_container_width=True,
             )
 
@@ -423,7 +614,7 @@ def main():
     st.write("Analyze Airbnb listings and market trends in your desired location")
     
     try:
-        scraper = AirbnbScraper()
+        get_scraper()
     except ValueError as e:
         st.error(f"Error: {str(e)}")
         st.stop()
@@ -463,6 +654,22 @@ def main():
                 help="Limit the number of listings to fetch (1-1000)"
             )
         
+        col5, col6 = st.columns(2)
+
+        with col5:
+            force_refresh = st.checkbox(
+                "Force refresh",
+                value=False,
+                help="Ignore cached results and fetch fresh listings"
+            )
+
+        with col6:
+            progressive = st.checkbox(
+                "Show results as they arrive",
+                value=True,
+                help="Display listings while the search is still running"
+            )
+        
         submitted = st.form_submit_button("🔍 Search Listings")
 
     if submitted:
@@ -470,23 +677,52 @@ def main():
             st.error("Please enter a location")
             return
         
-        with st.spinner('Fetching listings...'):
-            try:
-                listings = scraper.scrape_listings(location, currency, max_results=max_results)
-                df = scraper.convert_to_dataframe(listings)
-                df = df[df['Reviews Count'] >= min_reviews]
-                
-                st.session_state.full_df = df
-                st.session_state.location = location
-                st.session_state.search_performed = True
-                
-            except Exception as e:
-                st.error(f"Error analyzing market data: {str(e)}")
-                return
+        if force_refresh:
+            st.session_state.refresh_token += 1
+        # The search runs in the background, joining an identical search of another session if one
+        # is in flight, and keeps running when an interaction interrupts this script run
+        st.session_state.search = {
+            "job": get_search_runner().submit(location, currency, max_results, force_refresh, progressive),
+            "location": location,
+            "currency": currency,
+            "max_results": max_results,
+            "min_reviews": min_reviews,
+            "progressive": progressive,
+        }
+
+    search = st.session_state.search
+    if search is not None:
+        follow_search(search)
+        st.session_state.search = None
+        if not collect_search_result(search):
+            return
 
     if st.session_state.search_performed and st.session_state.full_df is not None:
-        filtered_df = filter_dataframe(st.session_state.full_df)
-        display_results(filtered_df, st.session_state.location)
+        filtered_df, filtered_fingerprint, stats = filter_dataframe(
+            st.session_state.full_df, st.session_state.full_fingerprint
+        )
+        display_results(filtered_df, st.session_state.location, filtered_fingerprint, stats)
+
+def render_performance_panel(rerun: Trace):
+    """Show the time spent in each pipeline stage during this rerun in a collapsed panel."""
+    stages = rerun.breakdown()
+    with st.expander("⏱️ Performance", expanded=False):
+        st.caption(f"This rerun took {rerun.elapsed():.2f}s.")
+        if not stages:
+            st.write("No pipeline stages ran in this rerun.")
+            return
+        breakdown = pd.DataFrame(stages).rename(columns={
+            'stage': 'Stage', 'calls': 'Calls', 'seconds': 'Seconds', 'rows': 'Rows', 'bytes': 'Bytes'
+        })
+        breakdown['Rows'] = breakdown['Rows'].astype('Int64')
+        breakdown['Bytes'] = [format_bytes(value) if pd.notna(value) else "" for value in breakdown['Bytes']]
+        st.dataframe(breakdown, use_container_width=True, hide_index=True,
+                     column_config={'Seconds': st.column_config.NumberColumn(format="%.3f")})
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    with trace("rerun") as rerun:
+        main()
+    if METRICS_FILE:
+        write_prometheus(METRICS_FILE)
+    if SHOW_PERFORMANCE_PANEL:
+        render_performance_panel(rerun)
\ No newline at end of file
@@ -0,0 +1,182 @@
+from typing import TYPE_CHECKING, Optional, Tuple
+import numpy as np
+import pandas as pd
+
+if TYPE_CHECKING:
+    import folium
+
+try:
+    from .config import DEFAULT_MAP_ZOOM, MAP_DENSITY_THRESHOLD, MAP_DENSITY_BINS
+    from .spatial import SpatialIndex
+except ImportError:  # Running as a script from src/ (streamlit run src/main.py)
+    from config import DEFAULT_MAP_ZOOM, MAP_DENSITY_THRESHOLD, MAP_DENSITY_BINS
+    from spatial import SpatialIndex
+
+# (south, west, north, east) in degrees
+Viewport = Tuple[float, float, float, float]
+
+# Builds each clustered marker in the browser from one compact data row:
+# [latitude, longitude, popup html, tooltip, marker color, icon name]
+MARKER_CALLBACK = """
+function (row) {
+    var icon = L.AwesomeMarkers.icon({icon: row[5], prefix: 'fa', markerColor: row[4]});
+    var marker = L.marker(new L.LatLng(row[0], row[1]), {icon: icon});
+    marker.bindPopup(row[2], {maxWidth: 350});
+    marker.bindTooltip(row[3]);
+    return marker;
+};
+"""
+
+
+def _escape(values: pd.Series) -> pd.Series:
+    """HTML-escape a text column."""
+    return (
+        values.astype(str)
+        .str.replace('&', '&amp;', regex=False)
+        .str.replace('<', '&lt;', regex=False)
+        .str.replace('>', '&gt;', regex=False)
+        .str.replace('"', '&quot;', regex=False)
+    )
+
+
+def _format(template: str, values: pd.Series) -> pd.Series:
+    """Format a numeric column with a printf-style template in one vectorized call."""
+    return pd.Series(np.char.mod(template, values.to_numpy()), index=values.index, dtype=object)
+
+
+def build_popup_html(df: pd.DataFrame) -> pd.Series:
+    """Build the popup HTML for every listing with column-wise string operations."""
+    return (
+        '<div style="width: 300px;">'
+        '<h4 style="color: #FF385C; margin-bottom: 10px;">' + _escape(df['Title']) + '</h4>'
+        '<p><strong>Price:</strong> $' + _format('%.2f', df['Price per Night']) + '/night</p>'
+        '<p><strong>Rating:</strong> ' + _format('%.1f', df['Overall Rating'])
+        + '/5 (' + df['Reviews Count'].astype(str) + ' reviews)</p>'
+        '<p><strong>Type:</strong> ' + _escape(df['Room Type']) + '</p>'
+        '<p><strong>Capacity:</strong> ' + df['Capacity'].astype(str) + ' guests</p>'
+        '<a href="' + _escape(df['URL']) + '" target="_blank" '
+        'style="background-color: #FF385C; color: white; padding: 5px 10px; text-decoration: none; '
+        'border-radius: 4px; display: inline-block; margin-top: 10px;">View on Airbnb</a>'
+        '</div>'
+    )
+
+
+def build_marker_rows(df: pd.DataFrame) -> list:
+    """Build the compact per-listing rows consumed by MARKER_CALLBACK."""
+    tooltip = '$' + _format('%.0f', df['Price per Night']) + '/night - ' + _escape(df['Room Type'])
+    color = np.where(df['Superhost'].to_numpy(dtype=bool), 'red', 'blue')
+    icon = np.where((df['Room Type'] == 'Entire home/apt').to_numpy(dtype=bool), 'home', 'bed')
+    return pd.DataFrame({
+        'lat': df['Latitude'].to_numpy(dtype='float64'),
+        'lon': df['Longitude'].to_numpy(dtype='float64'),
+        'popup': build_popup_html(df).to_numpy(),
+        'tooltip': tooltip.to_numpy(),
+        'color': color,
+        'icon': icon
+    }).values.tolist()
+
+
+def bin_density(latitudes: np.ndarray, longitudes: np.ndarray,
+                bins: int = MAP_DENSITY_BINS) -> np.ndarray:
+    """
+    Bin coordinates on a regular grid and return the occupied cells.
+
+    Returns:
+        Array of [latitude, longitude, count] rows at cell centers, so the
+        payload is bounded by the number of bins rather than listings.
+    """
+    if len(latitudes) == 0:
+        return np.empty((0, 3))
+
+    counts, lat_edges, lon_edges = np.histogram2d(latitudes, longitudes, bins=bins)
+    lat_idx, lon_idx = np.nonzero(counts)
+    lat_centers = (lat_edges[:-1] + lat_edges[1:]) / 2
+    lon_centers = (lon_edges[:-1] + lon_edges[1:]) / 2
+    return np.column_stack([lat_centers[lat_idx], lon_centers[lon_idx], counts[lat_idx, lon_idx]])
+
+
+def map_center(df: pd.DataFrame) -> Tuple[float, float]:
+    """Return the mean coordinate of the listings."""
+    return float(df['Latitude'].mean()), float(df['Longitude'].mean())
+
+
+def in_viewport(df: pd.DataFrame, viewport: Viewport, spatial: Optional[SpatialIndex] = None) -> pd.DataFrame:
+    """
+    Return the listings inside a viewport.
+
+    Args:
+        df: Listings DataFrame
+        viewport: (south, west, north, east) box; west > east crosses the antimeridian
+        spatial: Spatial index built over the rows of df, used instead of a scan if given
+    """
+    if spatial is not None:
+        return df.take(spatial.bbox(*viewport))
+    south, west, north, east = viewport
+    lat = df['Latitude'].to_numpy(dtype='float64')
+    lon = df['Longitude'].to_numpy(dtype='float64')
+    inside_lon = (lon >= west) & (lon <= east) if west <= east else (lon >= west) | (lon <= east)
+    return df[(lat >= south) & (lat <= north) & inside_lon]
+
+
+def densest_point(df: pd.DataFrame, bins: int = MAP_DENSITY_BINS) -> Tuple[float, float]:
+    """Return the center of the most crowded density cell, a better focus than the mean for spread-out markets."""
+    lat = df['Latitude'].to_numpy(dtype='float64')
+    lon = df['Longitude'].to_numpy(dtype='float64')
+    finite = np.isfinite(lat) & np.isfinite(lon)
+    cells = bin_density(lat[finite], lon[finite], bins)
+    if not len(cells):
+        return map_center(df)
+    lat_center, lon_center, _ = cells[cells[:, 2].argmax()]
+    return float(lat_center), float(lon_center)
+
+
+def build_listings_map(df: pd.DataFrame, density_threshold: int = MAP_DENSITY_THRESHOLD,
+                       bins: int = MAP_DENSITY_BINS, viewport: Optional[Viewport] = None) -> "folium.Map":
+    """
+    Build the listings map.
+
+    Up to ``density_threshold`` listings are sent as one clustered marker
+    layer that is expanded in the browser. Larger result sets are shown as a
+    heat layer over pre-binned counts so the page size stays bounded. With a
+    viewport, only the listings inside it are rendered and the map is fitted
+    to it, so a zoomed-in area of a large market still gets markers. df is
+    usually a filtered frame, so the viewport is found by a scan of its rows
+    rather than from a spatial index built over the full search.
+    """
+    # folium is only imported once a map is drawn, keeping it off the app's startup path
+    import folium
+    from folium.plugins import FastMarkerCluster, HeatMap
+
+    if viewport is not None:
+        df = in_viewport(df, viewport)
+        center = [(viewport[0] + viewport[2]) / 2, (viewport[1] + viewport[3]) / 2]
+    else:
+        center = list(map_center(df))
+
+    m = folium.Map(
+        location=center,
+        zoom_start=DEFAULT_MAP_ZOOM,
+        width='100%',
+        height='600px'
+    )
+    if viewport is not None:
+        m.fit_bounds([[viewport[0], viewport[1]], [viewport[2], viewport[3]]])
+
+    if len(df) > density_threshold:
+        cells = bin_density(
+            df['Latitude'].to_numpy(dtype='float64'), df['Longitude'].to_numpy(dtype='float64'), bins
+        )
+        max_count = cells[:, 2].max() if len(cells) else 1
+        HeatMap(
+            [[lat, lon, count / max_count] for lat, lon, count in cells.tolist()],
+            name="Listing density",
+            radius=20
+        ).add_to(m)
+    else:
+        FastMarkerCluster(
+            build_marker_rows(df),
+            callback=MARKER_CALLBACK,
+            name="Listings"
+        ).add_to(m)
+
+    return m
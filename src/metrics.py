@@ -0,0 +1,186 @@
+from typing import Dict, List, Optional, Sequence
+import numpy as np
+import pandas as pd
+
+# Columns each group-by key is read from
+GROUP_COLUMNS = {
+    'room_type': 'Room Type',
+    'superhost': 'Superhost',
+}
+
+
+def _mean(total: float, count: int) -> float:
+    """Divide a sum by a count, giving NaN for empty input like pandas does."""
+    return total / count if count else np.nan
+
+
+def _present(values: np.ndarray) -> np.ndarray:
+    """Drop NaN values, without copying when there are none."""
+    missing = np.isnan(values)
+    return values[~missing] if missing.any() else values
+
+
+def aggregate_arrays(price: np.ndarray, rating: np.ndarray, superhost: Optional[np.ndarray] = None,
+                     reviews: Optional[np.ndarray] = None, capacity: Optional[np.ndarray] = None,
+                     room_codes: Optional[np.ndarray] = None,
+                     room_types: Optional[Sequence[str]] = None) -> Dict:
+    """
+    Compute the market statistics of a set of listings from their column arrays.
+
+    Each column is reduced with a handful of vectorized numpy calls; the median
+    comes from a partial sort. Missing prices and ratings are skipped like
+    pandas does.
+
+    Args:
+        price: Price per night
+        rating: Overall rating
+        superhost: Superhost flags
+        reviews: Reviews count
+        capacity: Guest capacity
+        room_codes: Room type codes indexing room_types (-1 for missing)
+        room_types: Room type names
+
+    Returns:
+        Dictionary of statistics; optional inputs that are not given yield None
+    """
+    count = len(price)
+    prices = _present(np.asarray(price, dtype=np.float64))
+    ratings = _present(np.asarray(rating, dtype=np.float64))
+    priced = len(prices)
+
+    avg_price = _mean(prices.sum(), priced)
+    median_price = std_price = np.nan
+    if priced:
+        middle = [(priced - 1) // 2, priced // 2]
+        median_price = float(np.partition(prices, middle)[middle].mean())
+    if priced > 1:
+        deviations = prices - avg_price
+        std_price = float(np.sqrt(np.dot(deviations, deviations) / (priced - 1)))
+
+    most_common_type = None
+    if room_codes is not None and room_types is not None and count:
+        counts = np.bincount(room_codes[room_codes >= 0], minlength=len(room_types))
+        if counts.any():
+            most_common_type = room_types[int(counts.argmax())]
+
+    return {
+        "count": count,
+        "avg_price": avg_price,
+        "std_price": std_price,
+        "median_price": median_price,
+        "min_price": float(prices.min()) if priced else np.nan,
+        "max_price": float(prices.max()) if priced else np.nan,
+        "avg_rating": _mean(ratings.sum(), len(ratings)),
+        "superhost_ratio": _mean(np.count_nonzero(superhost), count) * 100 if superhost is not None else None,
+        "avg_reviews": _mean(float(reviews.sum()), count) if reviews is not None else None,
+        "avg_capacity": _mean(float(capacity.sum()), count) if capacity is not None else None,
+        "most_common_type": most_common_type,
+    }
+
+
+def _group_table(arrays: Dict[str, np.ndarray], keys: List[np.ndarray], names: List[str],
+                 labels: List[Sequence]) -> pd.DataFrame:
+    """Aggregate per group with bincount over a combined group code."""
+    sizes = [len(values) for values in labels]
+    code = np.zeros(len(arrays['price']), dtype=np.int64)
+    for key, size in zip(keys, sizes):
+        code = code * size + key
+    valid = np.logical_and.reduce([key >= 0 for key in keys])
+    code = code[valid]
+    groups = int(np.prod(sizes))
+
+    price = arrays['price'][valid].astype(np.float64)
+    rating = arrays['rating'][valid].astype(np.float64)
+    rated = ~np.isnan(rating)
+    counts = np.bincount(code, minlength=groups)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        table = {
+            'count': counts,
+            'avg_price': np.bincount(code, price, groups) / counts,
+            'avg_rating': (np.bincount(code[rated], rating[rated], groups)
+                           / np.bincount(code[rated], minlength=groups)),
+        }
+        for column, name in (('superhost', 'superhost_ratio'), ('reviews', 'avg_reviews'),
+                             ('capacity', 'avg_capacity')):
+            if arrays.get(column) is not None:
+                weights = arrays[column][valid].astype(np.float64)
+                table[name] = np.bincount(code, weights, groups) / counts
+        if 'superhost_ratio' in table:
+            table['superhost_ratio'] = table['superhost_ratio'] * 100
+
+    # Medians: order rows by group then price, and pick the middle of each group's run.
+    # Sorting by price, then stably by the small group code (a radix sort) beats a lexsort.
+    order = np.argsort(price, kind='stable')
+    group_codes = code[order].astype(np.int16 if groups <= np.iinfo(np.int16).max else np.int64)
+    order = order[np.argsort(group_codes, kind='stable')]
+    sorted_prices = price[order]
+    starts = np.cumsum(counts) - counts
+    if len(order):
+        last = len(order) - 1
+        low = sorted_prices[np.minimum(starts + (counts - 1) // 2, last)]
+        high = sorted_prices[np.minimum(starts + counts // 2, last)]
+        table['median_price'] = np.where(counts > 0, (low + high) / 2, np.nan)
+    else:
+        table['median_price'] = np.full(groups, np.nan)
+
+    if len(names) > 1:
+        index = pd.MultiIndex.from_product(labels, names=names)
+    else:
+        index = pd.Index(labels[0], name=names[0])
+    result = pd.DataFrame(table, index=index)
+    return result[result['count'] > 0]
+
+
+def compute_aggregates(df: pd.DataFrame, group_by: Sequence[str] = ()) -> Dict:
+    """
+    Compute all market statistics of a listings frame in one pass over its columns.
+
+    The result is shared by the sidebar, the overview, the price chart and
+    calculate_market_metrics instead of each of them scanning the frame.
+
+    Args:
+        df: Listings DataFrame as produced by AirbnbScraper.convert_to_dataframe
+        group_by: Optional keys from GROUP_COLUMNS ("room_type", "superhost");
+            when given, a per-group table is added under "groups"
+
+    Returns:
+        Dictionary of statistics, see aggregate_arrays
+    """
+    unknown = set(group_by) - set(GROUP_COLUMNS)
+    if unknown:
+        raise ValueError(f"Unknown group_by keys: {', '.join(sorted(unknown))}")
+
+    room_types = df['Room Type'] if 'Room Type' in df.columns else None
+    if room_types is not None and not isinstance(room_types.dtype, pd.CategoricalDtype):
+        room_types = room_types.astype('category')
+
+    arrays = {
+        'price': df['Price per Night'].to_numpy(dtype=np.float64, na_value=np.nan),
+        'rating': df['Overall Rating'].to_numpy(dtype=np.float64, na_value=np.nan),
+        'superhost': (df['Superhost'].to_numpy(dtype=bool, na_value=False)
+                      if 'Superhost' in df.columns else None),
+        'reviews': df['Reviews Count'].to_numpy() if 'Reviews Count' in df.columns else None,
+        'capacity': df['Capacity'].to_numpy() if 'Capacity' in df.columns else None,
+    }
+    room_codes = room_types.cat.codes.to_numpy() if room_types is not None else None
+    categories = list(room_types.cat.categories) if room_types is not None else None
+
+    stats = aggregate_arrays(arrays['price'], arrays['rating'], arrays['superhost'], arrays['reviews'],
+                             arrays['capacity'], room_codes, categories)
+
+    if group_by:
+        keys, labels = [], []
+        for name in group_by:
+            if name == 'room_type':
+                if room_codes is None:
+                    raise ValueError("group_by 'room_type' needs a 'Room Type' column")
+                keys.append(room_codes.astype(np.int64))
+                labels.append(categories)
+            else:
+                if arrays['superhost'] is None:
+                    raise ValueError("group_by 'superhost' needs a 'Superhost' column")
+                keys.append(arrays['superhost'].astype(np.int64))
+                labels.append([False, True])
+        stats['groups'] = _group_table(arrays, keys, [GROUP_COLUMNS[name] for name in group_by], labels)
+
+    return stats
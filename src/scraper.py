@@ -1,18 +1,212 @@
+import gc
+import multiprocessing
 import os
+import random
+import threading
 import time
-from typing import Dict, List, Any, Optional
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from itertools import chain, islice
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
 from apify_client import ApifyClient
 
+try:
+    from .config import APIFY_ACTOR_ID, RUN_TIMEOUT_SECONDS
+    from .amenities import AmenityEncoder, AmenityMatrix
+    from .telemetry import record, span
+    from .governor import PRIORITY_INTERACTIVE, RunGovernor, default_governor
+except ImportError:  # Running as a script from src/ (streamlit run src/main.py)
+    from config import APIFY_ACTOR_ID, RUN_TIMEOUT_SECONDS
+    from amenities import AmenityEncoder, AmenityMatrix
+    from telemetry import record, span
+    from governor import PRIORITY_INTERACTIVE, RunGovernor, default_governor
+
+# Number of dataset items requested per page when streaming results
+DATASET_PAGE_SIZE = 100
+
+# Longest server-side wait of one run status request (the Apify API caps waitForFinish at 60s)
+LONG_POLL_SECONDS = 60
+# Backoff between status or dataset requests that return without waiting server-side
+POLL_INITIAL_DELAY = 0.5
+POLL_MAX_DELAY = 10.0
+# Consecutive failed status requests tolerated before the wait is abandoned
+POLL_MAX_ERRORS = 5
+# How long a finished run's dataset may read as empty before it is taken to be empty
+DATASET_SETTLE_SECONDS = 10.0
+# Longest pause between dataset reads while streaming items from a running actor
+STREAM_POLL_SECONDS = 2.0
+# HTTP statuses with which Apify refuses to start a run over a rate, concurrency or memory quota;
+# no run is created, so the start can be retried without duplicating it
+QUOTA_STATUS_CODES = (402, 429)
+TERMINAL_STATUSES = ("SUCCEEDED", "FAILED", "TIMED-OUT", "ABORTED")
+
+# Number of locations scraped in parallel by scrape_many
+DEFAULT_CONCURRENCY = 4
+
+# Number of listings converted per vectorized batch in convert_to_dataframe
+CONVERT_CHUNK_SIZE = 50000
+# Smaller batches for convert_parallel, so work spreads evenly over the pool
+PARALLEL_CHUNK_SIZE = 10000
+# Batches queued per worker process; bounds the raw listings held in flight
+PARALLEL_PREFETCH = 2
+# Allocations between young-generation collections in conversion workers (CPython default: 700)
+WORKER_GC_THRESHOLD = 100000
+
+# Compact column types of the converted listings DataFrame
+LISTING_SCHEMA = {
+    'ID': 'string[pyarrow]',
+    'Title': 'string[pyarrow]',
+    'Description': 'string[pyarrow]',
+    'Room Type': 'category',
+    'URL': 'string[pyarrow]',
+    'Thumbnail': 'string[pyarrow]',
+    'Price per Night': 'float64',
+    'Capacity': 'int16',
+    'Overall Rating': 'float32',
+    'Reviews Count': 'int32',
+    'Location Rating': 'float32',
+    'Cleanliness Rating': 'float32',
+    'Value Rating': 'float32',
+    'Accuracy Rating': 'float32',
+    'Communication Rating': 'float32'
+}
+NUMERIC_COLUMNS = [col for col, dtype in LISTING_SCHEMA.items() if dtype.startswith(('int', 'float'))]
+
+_TEXT_FIELDS = {
+    'ID': 'id',
+    'Title': 'title',
+    'Description': 'description',
+    'Room Type': 'roomType',
+    'URL': 'url',
+    'Thumbnail': 'thumbnail'
+}
+_RATING_FIELDS = [
+    'guestSatisfaction', 'reviewsCount', 'location', 'cleanliness', 'value', 'accuracy', 'communication'
+]
+_NUMBER_TYPES = (int, float)
+_NUMBER_PATTERN = r'[+-]?(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?'
+# Characters other than a plain space that str.split() treats as whitespace
+_OTHER_WHITESPACE = '\t\n\x0b\x0c\r\x1c-\x1f\x85\xa0\u1680\u2000-\u200a\u2028\u2029\u202f\u205f\u3000'
+_EMPTY: Dict = {}
+# Marks keys absent from a listing where None is a meaningful value
+_MISSING = object()
+
+
+def apply_listing_schema(df: pd.DataFrame) -> pd.DataFrame:
+    """Cast listing columns to the compact LISTING_SCHEMA, leaving other columns untouched."""
+    schema = {col: dtype for col, dtype in LISTING_SCHEMA.items() if col in df.columns}
+    numeric = [col for col in NUMERIC_COLUMNS if col in schema]
+    df = df.copy()
+    df[numeric] = df[numeric].fillna(0)
+    for col in numeric:
+        if schema[col].startswith('int'):
+            # Keep out-of-range values from wrapping around in the narrower type
+            bounds = np.iinfo(schema[col])
+            df[col] = df[col].clip(bounds.min, bounds.max)
+    return df.astype(schema)
+
+
+def _finite_or_zero(values: np.ndarray) -> np.ndarray:
+    """Replace NaN and infinite values with zero."""
+    return np.where(np.isfinite(values), values, 0)
+
+
+def _object_column(values: List[Any]) -> np.ndarray:
+    """Collect values into an object array without unpacking nested lists."""
+    return np.fromiter(values, dtype=object, count=len(values))
+
+
+def _number_mask(values: np.ndarray) -> np.ndarray:
+    """Mask of cells holding plain int/float values (bools and strings excluded)."""
+    if pd.api.types.infer_dtype(values, skipna=False) in ('integer', 'floating', 'mixed-integer-float'):
+        return np.ones(len(values), dtype=bool)
+    return np.array([type(value) in _NUMBER_TYPES for value in values], dtype=bool)
+
+
+def _text_mask(values: np.ndarray) -> np.ndarray:
+    """Mask of cells holding str values."""
+    if pd.api.types.infer_dtype(values, skipna=False) == 'string':
+        return np.ones(len(values), dtype=bool)
+    return np.array([type(value) is str for value in values], dtype=bool)
+
+
+def _float_column(values: np.ndarray, mask: np.ndarray, fill: float = 0.0) -> np.ndarray:
+    """Convert the masked numeric cells of an object array to float64."""
+    if mask.all():
+        return values.astype('float64')
+    result = np.full(len(values), fill)
+    result[mask] = values[mask].astype('float64')
+    return result
+
+
+def _numeric_fields(records: List[Dict], fields: List[str], irregular: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    Read numeric fields from a list of dicts, defaulting missing keys to zero.
+
+    Values that are not plain numbers are flagged in ``irregular``.
+    """
+    values = {}
+    for field in fields:
+        column = _object_column([record.get(field, 0) for record in records])
+        numbers = _number_mask(column)
+        irregular |= ~numbers
+        values[field] = _float_column(column, numbers)
+    return values
+
+
+# Converter of a conversion worker process, created once by _init_convert_worker
+_worker_scraper = None
+# Listings inherited by forked conversion workers; only set while a single-threaded process forks them
+_shared_listings: Optional[List[Dict]] = None
+
+
+def _init_convert_worker() -> None:
+    """Set up a conversion worker process."""
+    global _worker_scraper
+    # Unpickling a batch allocates millions of acyclic dicts and strings; collecting
+    # less often keeps the cycle collector from rescanning them on every allocation burst
+    gc.set_threshold(WORKER_GC_THRESHOLD, 50, 100)
+    # Conversion never calls the Apify API, so workers need neither a token nor a client
+    _worker_scraper = AirbnbScraper(client=object())
+
+
+def _convert_in_worker(listings: List[Dict]) -> pd.DataFrame:
+    """Convert one batch of raw listings sent to a conversion worker process."""
+    return _worker_scraper._convert_chunk(listings)
+
+
+def _convert_shared_range(start: int, stop: int) -> pd.DataFrame:
+    """Convert one slice of the listings a forked conversion worker inherited."""
+    return _worker_scraper._convert_chunk(_shared_listings[start:stop])
+
+
 class AirbnbScraper:
     """Handles Airbnb data scraping using Apify."""
     
-    def __init__(self, api_token: str = None):
-        """Initialize the scraper with API token."""
+    def __init__(self, api_token: str = None, client=None, actor_id: str = APIFY_ACTOR_ID,
+                 governor: Optional[RunGovernor] = None, priority: int = PRIORITY_INTERACTIVE):
+        """
+        Initialize the scraper with API token.
+
+        Args:
+            api_token: Apify API token (default: APIFY_API_TOKEN environment variable)
+            client: Client to use instead of an ApifyClient, e.g. an offline stand-in;
+                no token is needed when one is given
+            actor_id: Apify actor started for each search
+            governor: Admission control for actor runs (default: the process-wide governor)
+            priority: Queue priority of this scraper's runs
+        """
+        self.actor_id = actor_id
+        self.governor = governor if governor is not None else default_governor()
+        self.priority = priority
         self.api_token = api_token or os.getenv("APIFY_API_TOKEN")
-        if not self.api_token:
+        if client is None and not self.api_token:
             raise ValueError("Apify API token is required")
-        self.client = ApifyClient(self.api_token)
+        self.client = client if client is not None else ApifyClient(self.api_token)
 
     def extract_price(self, price_data: Dict) -> float:
         """Extract price from the price data."""
@@ -74,7 +268,253 @@ class AirbnbScraper:
             'communication': float(rating_data.get('communication', 0))
         }
 
-    def scrape_listings(self, location: str, currency: str = "USD", max_results: int = None) -> List[Dict]:
+    def _build_run_input(self, location: str, currency: str, max_results: Optional[int]) -> Dict[str, Any]:
+        """Build the actor input for a location search."""
+        return {
+            "locationQueries": [location],
+            "currency": currency,
+            "locale": "en-US",
+            "maxListings": max_results or 300,
+            "proxyConfiguration": {
+                "useApifyProxy": True
+            }
+        }
+
+    def iter_listings(self, location: str, currency: str = "USD", max_results: int = None,
+                      page_size: int = DATASET_PAGE_SIZE, timeout: float = RUN_TIMEOUT_SECONDS,
+                      metrics: Optional[Dict[str, Any]] = None, stream: bool = False,
+                      on_queue: Optional[Callable[[int, float], None]] = None) -> Iterator[Dict]:
+        """
+        Stream Airbnb listings for a given location page by page.
+
+        By default the actor run is awaited first, then the default dataset is
+        read with offset/limit so only one page of raw items is held at a time.
+        With ``stream`` the dataset is read while the run is still in progress,
+        so the first listings arrive long before the run finishes.
+
+        The run is only started once the governor admits it, and its slot is
+        freed as soon as the run finishes, before the dataset is read.
+
+        Args:
+            location: City or area to search
+            currency: Currency for prices (default: USD)
+            max_results: Maximum number of listings to yield (default: None = all)
+            page_size: Number of items requested per dataset page
+            timeout: Seconds to wait for the actor run to finish (None = no limit)
+            metrics: Optional dictionary filled with the run ID and status, status
+                request count, ``queue_seconds`` (waiting for the governor),
+                ``time_to_complete`` (run finished), ``time_to_first_item``,
+                ``total_seconds`` and ``items``
+            stream: Yield items as the actor writes them instead of after the run
+            on_queue: Called while the run waits for the governor with the number
+                of runs queued ahead and the estimated wait in seconds, and with
+                0 and 0.0 once the run is admitted
+
+        Yields:
+            Dictionaries containing listing data
+        """
+        start = time.monotonic()
+        metrics = metrics if metrics is not None else {}
+        metrics.update({"run_id": None, "status": None, "polls": 0, "queue_seconds": None,
+                        "time_to_complete": None, "time_to_first_item": None, "total_seconds": None,
+                        "items": 0})
+
+        run_input = self._build_run_input(location, currency, max_results)
+        # The actor's own timeout stops the run on the platform if we give up waiting
+        options = {"timeout_secs": int(timeout)} if timeout else {}
+        ticket = self.governor.acquire(self.priority, timeout, on_queue)
+        if on_queue is not None:
+            on_queue(0, 0.0)
+        metrics["queue_seconds"] = ticket.waited
+        record("actor_queue", ticket.waited, location=location)
+        # The run's timeout starts once it is admitted
+        deadline = time.monotonic() + timeout if timeout else None
+
+        fetched = 0
+        run = None
+        try:
+            with span("actor_start", location=location):
+                run = self._start_run(run_input, options, deadline)
+            metrics["run_id"] = run.get("id")
+            dataset = self.client.dataset(run["defaultDatasetId"])
+
+            while True:
+                if not stream:
+                    # Waits only for what is left of the timeout after queueing and start retries
+                    with span("actor_wait", run_id=run.get("id")):
+                        run = self._await_run(run, deadline, metrics)
+                    if run.get("status") not in TERMINAL_STATUSES:
+                        raise TimeoutError(f"Actor run {run['id']} did not finish within {timeout:g}s")
+                finished = run.get("status") in TERMINAL_STATUSES
+                if finished:
+                    self.governor.release(ticket)
+                    if metrics["time_to_complete"] is None:
+                        metrics["status"] = run["status"]
+                        metrics["time_to_complete"] = time.monotonic() - start
+                    if run["status"] != "SUCCEEDED":
+                        raise RuntimeError(f"Actor run {run.get('id')} finished with status {run['status']}")
+
+                limit = self._page_limit(page_size, max_results, fetched)
+                with span("dataset_read", offset=fetched) as read:
+                    if finished and fetched == 0:
+                        page = self._first_page(dataset, limit)
+                    else:
+                        page = dataset.list_items(offset=fetched, limit=limit)
+                    read.rows = len(page.items)
+
+                for item in page.items:
+                    if fetched == 0:
+                        metrics["time_to_first_item"] = time.monotonic() - start
+                    yield item
+                    fetched += 1
+                    if max_results and fetched >= max_results:
+                        return
+
+                # A full page means more items may be ready right away
+                if len(page.items) == limit:
+                    continue
+                # A short page of a finished run means the end of the dataset was reached
+                if finished:
+                    return
+
+                # Caught up with a running actor: wait briefly for more items or the end of the run
+                if deadline is not None and time.monotonic() >= deadline:
+                    raise TimeoutError(f"Actor run {run['id']} did not finish within {timeout:g}s")
+                poll_until = time.monotonic() + STREAM_POLL_SECONDS
+                with span("actor_wait", run_id=run.get("id")):
+                    run = self._await_run(run, poll_until if deadline is None else min(poll_until, deadline),
+                                          metrics)
+        finally:
+            # A consumer that stops early or gives up waiting leaves the run going; stop it
+            # before freeing its slot, so no more runs are active than the governor allows
+            if run is not None and run.get("status") not in TERMINAL_STATUSES:
+                self._abort_run(run)
+            self.governor.release(ticket)
+            metrics["items"] = fetched
+            metrics["total_seconds"] = time.monotonic() - start
+
+    def _abort_run(self, run: Dict[str, Any]) -> None:
+        """Ask Apify to stop a run that is still in progress."""
+        try:
+            self.client.run(run["id"]).abort()
+        except Exception as e:
+            print(f"Error aborting actor run {run.get('id')}: {str(e)}")
+
+    def _start_run(self, run_input: Dict[str, Any], options: Dict[str, Any],
+                   deadline: Optional[float]) -> Dict[str, Any]:
+        """
+        Start an actor run, retrying with backoff while Apify refuses it over a quota.
+
+        Only refusals with a QUOTA_STATUS_CODES status are retried, since no run
+        was created for them; any other error is raised at once.
+        """
+        delay = POLL_INITIAL_DELAY
+        while True:
+            try:
+                return self.client.actor(self.actor_id).start(run_input=run_input, **options)
+            except Exception as e:
+                if getattr(e, "status_code", None) not in QUOTA_STATUS_CODES:
+                    raise
+                if deadline is not None and time.monotonic() >= deadline:
+                    raise TimeoutError(f"Actor run could not be started within the timeout: {str(e)}") from e
+            time.sleep(self._backoff(delay, deadline))
+            delay = min(delay * 2, POLL_MAX_DELAY)
+
+    def wait_for_run(self, run: Dict[str, Any], timeout: Optional[float] = RUN_TIMEOUT_SECONDS,
+                     metrics: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Wait for an actor run to reach a terminal status.
+
+        Each status request asks the API to hold the response until the run
+        finishes (long polling, up to LONG_POLL_SECONDS). Requests that fail or
+        come back early with the run still in progress are retried after an
+        exponentially growing, jittered delay.
+
+        Args:
+            run: Run object returned when the run was started
+            timeout: Seconds to wait (None = no limit)
+            metrics: Optional dictionary whose ``polls`` and ``status`` are updated
+
+        Returns:
+            The finished run object
+
+        Raises:
+            TimeoutError: If the run is still in progress after timeout seconds
+        """
+        metrics = metrics if metrics is not None else {}
+        run = self._await_run(run, time.monotonic() + timeout if timeout else None, metrics)
+        if run.get("status") not in TERMINAL_STATUSES:
+            raise TimeoutError(f"Actor run {run['id']} did not finish within {timeout:g}s")
+        metrics["status"] = run.get("status")
+        return run
+
+    def _await_run(self, run: Dict[str, Any], deadline: Optional[float], metrics: Dict[str, Any]) -> Dict[str, Any]:
+        """Poll a run until it reaches a terminal status or the deadline passes, then return it."""
+        if run.get("status") in TERMINAL_STATUSES:
+            return run
+
+        run_client = self.client.run(run["id"])
+        delay = POLL_INITIAL_DELAY
+        errors = 0
+        while True:
+            remaining = deadline - time.monotonic() if deadline is not None else LONG_POLL_SECONDS
+            if remaining <= 0:
+                return run
+
+            wait_secs = max(1, int(min(remaining, LONG_POLL_SECONDS)))
+            requested = time.monotonic()
+            try:
+                run = run_client.wait_for_finish(wait_secs=wait_secs) or run
+                errors = 0
+            except Exception as e:
+                errors += 1
+                if errors > POLL_MAX_ERRORS:
+                    raise RuntimeError(f"Failed to get the status of actor run {run['id']}: {str(e)}") from e
+            metrics["polls"] = metrics.get("polls", 0) + 1
+
+            if run.get("status") in TERMINAL_STATUSES:
+                return run
+            if errors or time.monotonic() - requested < wait_secs:
+                # The request did not wait server-side; back off before asking again
+                time.sleep(self._backoff(delay, deadline))
+                delay = min(delay * 2, POLL_MAX_DELAY)
+            else:
+                delay = POLL_INITIAL_DELAY
+
+    @staticmethod
+    def _backoff(delay: float, deadline: Optional[float]) -> float:
+        """Jitter a backoff delay (full jitter) without sleeping past the deadline."""
+        delay = random.uniform(0, delay)
+        if deadline is not None:
+            delay = min(delay, max(0.0, deadline - time.monotonic()))
+        return delay
+
+    def _first_page(self, dataset, limit: int):
+        """
+        Read the first dataset page of a finished run.
+
+        Items can show up in the dataset shortly after the run reports success,
+        so an empty page is re-read with backoff for up to DATASET_SETTLE_SECONDS
+        before the dataset is taken to be empty.
+        """
+        deadline = time.monotonic() + DATASET_SETTLE_SECONDS
+        delay = POLL_INITIAL_DELAY
+        while True:
+            page = dataset.list_items(offset=0, limit=limit)
+            if page.items or time.monotonic() >= deadline:
+                return page
+            time.sleep(self._backoff(delay, deadline))
+            delay = min(delay * 2, POLL_MAX_DELAY)
+
+    @staticmethod
+    def _page_limit(page_size: int, max_results: Optional[int], fetched: int) -> int:
+        """Size the next dataset page so no more than max_results items are transferred."""
+        if max_results:
+            return min(page_size, max_results - fetched)
+        return page_size
+
+    def scrape_listings(self, location: str, currency: str = "USD", max_results: int = None,
+                        timeout: float = RUN_TIMEOUT_SECONDS, metrics: Optional[Dict[str, Any]] = None) -> List[Dict]:
         """
         Scrape Airbnb listings for a given location.
         
@@ -82,128 +522,436 @@ class AirbnbScraper:
             location: City or area to search
             currency: Currency for prices (default: USD)
             max_results: Maximum number of listings to return (default: None = all)
+            timeout: Seconds to wait for the actor run to finish (None = no limit)
+            metrics: Optional dictionary filled with run timings, see iter_listings
         
         Returns:
             List of dictionaries containing listing data
         """
-        # Prepare the actor input
-        run_input = {
-            "locationQueries": [location],
-            "currency": currency,
-            "locale": "en-US",
-            "maxListings": max_results or 300,
-            "proxyConfiguration": {
-                "useApifyProxy": True
+        return list(self.iter_listings(location, currency, max_results=max_results, timeout=timeout,
+                                       metrics=metrics))
+
+    def scrape_many(self, locations: List[str], currency: str = "USD", max_results: int = None,
+                    concurrency: int = DEFAULT_CONCURRENCY,
+                    timeout: float = RUN_TIMEOUT_SECONDS) -> Dict[str, Dict[str, Any]]:
+        """
+        Scrape several locations at once with a bounded number of parallel actor runs.
+
+        Args:
+            locations: Cities or areas to search
+            currency: Currency for prices (default: USD)
+            max_results: Maximum number of listings per location (default: None = all)
+            concurrency: Maximum number of locations scraped at the same time
+            timeout: Seconds to wait for each actor run to finish (None = no limit)
+
+        Returns:
+            Dictionary keyed by location, in input order, where each value holds
+            the scraped ``listings``, the ``error`` message (None on success) and
+            the run ``metrics``. A failing location does not affect the others.
+        """
+        if concurrency < 1:
+            raise ValueError("concurrency must be at least 1")
+
+        unique_locations = list(dict.fromkeys(locations))
+        metrics = {location: {} for location in unique_locations}
+        results: Dict[str, Dict[str, Any]] = {}
+
+        with ThreadPoolExecutor(max_workers=min(concurrency, len(unique_locations) or 1)) as executor:
+            futures = {
+                location: executor.submit(self.scrape_listings, location, currency, max_results,
+                                          timeout, metrics[location])
+                for location in unique_locations
             }
-        }
-        
-        # Start the actor and wait for it to finish
-        # Airbnb Scraper Actor > API > API Client
-        run = self.client.actor("your-actor-id").call(run_input=run_input)
+            for location, future in futures.items():
+                try:
+                    results[location] = {"listings": future.result(), "error": None,
+                                         "metrics": metrics[location]}
+                except Exception as e:
+                    results[location] = {"listings": [], "error": str(e), "metrics": metrics[location]}
 
-        # Wait for the dataset to be ready (with timeout)
-        max_wait_time = 180  # Maximum wait time in seconds
-        wait_start = time.time()
-        
-        while True:
-            try:
-                dataset = self.client.dataset(run["defaultDatasetId"])
-                items = list(dataset.iterate_items())
-                if items:
-                    break
-                
-                if time.time() - wait_start > max_wait_time:
-                    raise TimeoutError("Dataset retrieval timed out")
-                
-                time.sleep(5)
+        return results
+
+    def _process_listing(self, listing: Dict) -> Optional[Dict]:
+        """Convert a single raw listing, or return None if it is invalid."""
+        try:
+            # Extract basic listing information
+            price = self.extract_price(listing.get('price', {}))
+            ratings = self.extract_rating(listing.get('rating'))
+            coordinates = listing.get('coordinates', {})
+            
+            # Skip invalid listings
+            if price <= 0:
+                return None
+
+            processed_listing = {
+                'ID': str(listing.get('id', '')),
+                'Title': str(listing.get('title', '')),
+                'Description': str(listing.get('description', '')),
+                'Room Type': str(listing.get('roomType', '')),
+                'URL': str(listing.get('url', '')),
+                'Thumbnail': str(listing.get('thumbnail', '')),
+                'Latitude': float(coordinates.get('latitude', 0)),
+                'Longitude': float(coordinates.get('longitude', 0)),
+                'Price per Night': price,
+                'Capacity': self.extract_capacity(listing),
+                'Superhost': bool(listing.get('isSuperHost', False)),
                 
-            except Exception as e:
-                if time.time() - wait_start > max_wait_time:
-                    raise Exception(f"Failed to retrieve dataset: {str(e)}")
-                time.sleep(5)
-        
-        # Limit results if specified
-        if max_results and len(items) > max_results:
-            items = items[:max_results]
+                # Rating information
+                'Overall Rating': ratings['guestSatisfaction'],
+                'Reviews Count': ratings['reviewsCount'],
+                'Location Rating': ratings['location'],
+                'Cleanliness Rating': ratings['cleanliness'],
+                'Value Rating': ratings['value'],
+                'Accuracy Rating': ratings['accuracy'],
+                'Communication Rating': ratings['communication']
+            }
+            
+            # Only keep listings with valid coordinates
+            if processed_listing['Latitude'] != 0 and processed_listing['Longitude'] != 0:
+                return processed_listing
+            return None
             
-        return items
+        except Exception as e:
+            print(f"Error processing listing {listing.get('id', 'unknown')}: {str(e)}")
+            return None
+
+    def _convert_chunk(self, listings: List[Dict]) -> pd.DataFrame:
+        """
+        Convert a batch of raw listings column by column.
+
+        The nested JSON is normalized once into one raw column per field and
+        parsed with vectorized operations. Rows holding values of an unexpected
+        type (e.g. numeric strings in ratings or None prices) are converted
+        with ``_process_listing`` instead, so the result is identical to the
+        row-by-row conversion.
+        """
+        n = len(listings)
+        irregular = np.zeros(n, dtype=bool)
+
+        # Price: same lookup order as extract_price, non-dict data counts as no price
+        price_data = [listing.get('price', _EMPTY) for listing in listings]
+        raw_price = _object_column([
+            p.get('price', p.get('label', '0')) if isinstance(p, dict) else ('0' if not p else '')
+            for p in price_data
+        ])
+        is_text = _text_mask(raw_price)
+        number = np.zeros(n, dtype=bool) if is_text.all() else _number_mask(raw_price)
+        irregular |= ~(is_text | number)
+        price = _float_column(raw_price, number & ~is_text)
+        if is_text.any():
+            text = pa.array(raw_price[is_text].tolist(), type=pa.string())
+            text = pc.replace_substring(pc.replace_substring(text, '$', ''), ',', '')
+            tokens = pc.struct_field(pc.extract_regex(text, r'^ *(?P<token>[^ ]*)'), [0])
+            # Tokens float() may accept but the fast parser does not, and whitespace
+            # other than plain spaces, are left to the row path
+            parsed = pc.match_substring_regex(tokens, f'^{_NUMBER_PATTERN}$').to_numpy(zero_copy_only=False)
+            odd_space = pc.match_substring_regex(text, f'[{_OTHER_WHITESPACE}]').to_numpy(zero_copy_only=False)
+            empty = pc.equal(tokens, '').to_numpy(zero_copy_only=False)
+            irregular[is_text] |= (~parsed & ~empty) | odd_space
+            text_price = np.zeros(len(tokens))
+            text_price[parsed] = pc.cast(tokens.filter(pa.array(parsed)), pa.float64()).to_numpy()
+            price[is_text] = text_price
+
+        # Ratings: falsy rating data means all zeros, other non-dicts are irregular
+        rating_data = [listing.get('rating') or _EMPTY for listing in listings]
+        rating_is_dict = np.array([isinstance(r, dict) for r in rating_data], dtype=bool)
+        irregular |= ~rating_is_dict
+        if not rating_is_dict.all():
+            rating_data = [r if isinstance(r, dict) else _EMPTY for r in rating_data]
+        ratings = _numeric_fields(rating_data, _RATING_FIELDS, irregular)
+        # int() truncates and fails on non-finite review counts
+        irregular |= ~np.isfinite(ratings['reviewsCount'])
+        reviews = np.trunc(_finite_or_zero(ratings['reviewsCount'])).astype('int64')
+
+        # Coordinates must be a dict of numbers
+        coordinates = [listing.get('coordinates', _EMPTY) for listing in listings]
+        coords_is_dict = np.array([isinstance(c, dict) for c in coordinates], dtype=bool)
+        irregular |= ~coords_is_dict
+        if not coords_is_dict.all():
+            coordinates = [c if isinstance(c, dict) else _EMPTY for c in coordinates]
+        latlon = _numeric_fields(coordinates, ['latitude', 'longitude'], irregular)
+
+        # Capacity from personCapacity when present
+        raw_capacity = [listing.get('personCapacity', _MISSING) for listing in listings]
+        has_capacity = np.array([value is not _MISSING for value in raw_capacity], dtype=bool)
+        raw_capacity = _object_column(raw_capacity)
+        capacity_values = _float_column(raw_capacity, has_capacity & _number_mask(raw_capacity), np.nan)
+        irregular |= has_capacity & ~np.isfinite(capacity_values)
+        capacity = np.ones(n, dtype='int64')
+        capacity[has_capacity] = np.trunc(_finite_or_zero(capacity_values[has_capacity])).astype('int64')
+
+        # Otherwise the first subDescription item mentioning guests with a number
+        sub_desc = [listing.get('subDescription') for listing in listings]
+        sub_items = [
+            (d.get('items') if isinstance(d, dict) else _MISSING) if d else None for d in sub_desc
+        ]
+        irregular |= np.array(
+            [items is not None and type(items) is not list for items in sub_items], dtype=bool
+        )
+        sub_items = [
+            items if type(items) is list and not capacity_known else None
+            for items, capacity_known in zip(sub_items, has_capacity.tolist())
+        ]
+        counts = np.array([len(items) if items else 0 for items in sub_items], dtype='int64')
+        item_rows = np.repeat(np.arange(n), counts)
+        if len(item_rows):
+            items = list(chain.from_iterable(items for items in sub_items if items))
+            try:
+                texts = pa.array(items, type=pa.string())
+            except (pa.ArrowTypeError, pa.ArrowInvalid):
+                texts = None
+            if texts is not None and not texts.null_count:
+                rows = item_rows
+            else:
+                # Non-string items, None included, make the row fall back
+                item_is_text = _text_mask(_object_column(items))
+                np.logical_or.at(irregular, item_rows[~item_is_text], True)
+                texts = pa.array([item for item, ok in zip(items, item_is_text) if ok], type=pa.string())
+                rows = item_rows[item_is_text]
+            mentions_guest = pc.match_substring(pc.utf8_lower(texts), 'guest').to_numpy(zero_copy_only=False)
+            rows = rows[mentions_guest]
+            texts = texts.filter(pa.array(mentions_guest))
+            # Unicode digits parse differently, leave them to the row path
+            non_ascii = pc.invert(pc.string_is_ascii(texts)).to_numpy(zero_copy_only=False)
+            np.logical_or.at(irregular, rows[non_ascii], True)
+            digits = pc.replace_substring_regex(texts, '[^0-9]+', '')
+            found = pc.not_equal(digits, '').to_numpy(zero_copy_only=False)
+            # Rows are in ascending order, so the first index per row is its first match
+            found_rows, first = np.unique(rows[found], return_index=True)
+            numbers = pc.cast(digits.filter(pa.array(found)), pa.int64()).to_numpy()
+            capacity[found_rows] = numbers[first]
+
+        # Boolean masks for the validity rules of the row-by-row conversion
+        valid = (
+            ~irregular
+            & ~(price <= 0)
+            & (latlon['latitude'] != 0)
+            & (latlon['longitude'] != 0)
+        )
+        valid_rows = np.flatnonzero(valid)
+        kept = listings if valid.all() else [listings[row] for row in valid_rows.tolist()]
+
+        columns = {}
+        for column, key in _TEXT_FIELDS.items():
+            values = _object_column([listing.get(key, '') for listing in kept])
+            if not _text_mask(values).all():
+                values = pd.Series(values).astype(str).to_numpy(dtype=object)
+            columns[column] = values
+        columns.update({
+            'Latitude': latlon['latitude'][valid],
+            'Longitude': latlon['longitude'][valid],
+            'Price per Night': price[valid],
+            'Capacity': capacity[valid],
+            'Superhost': _object_column([listing.get('isSuperHost', False) for listing in kept]).astype(bool),
+            'Overall Rating': ratings['guestSatisfaction'][valid],
+            'Reviews Count': reviews[valid],
+            'Location Rating': ratings['location'][valid],
+            'Cleanliness Rating': ratings['cleanliness'][valid],
+            'Value Rating': ratings['value'][valid],
+            'Accuracy Rating': ratings['accuracy'][valid],
+            'Communication Rating': ratings['communication'][valid]
+        })
+        frame = pd.DataFrame(columns, index=valid_rows)
 
-    def convert_to_dataframe(self, listings: List[Dict]) -> pd.DataFrame:
-        """Convert listings data to a pandas DataFrame."""
+        # Irregular rows go through the row-by-row path and are merged back in order
+        fallback_rows = np.flatnonzero(irregular)
+        if len(fallback_rows):
+            processed = {row: self._process_listing(listings[row]) for row in fallback_rows}
+            processed = {row: data for row, data in processed.items() if data is not None}
+            if processed:
+                fallback = pd.DataFrame.from_dict(processed, orient='index')
+                frame = pd.concat([frame, fallback]).sort_index() if len(frame) else fallback
+
+        return frame
+
+    def convert_to_dataframe(self, listings: Iterable[Dict], chunk_size: int = CONVERT_CHUNK_SIZE,
+                             stats: Optional[Dict[str, int]] = None) -> pd.DataFrame:
+        """Convert listings data to a pandas DataFrame.
+
+        Accepts any iterable, so the generator from ``iter_listings`` can be
+        consumed directly without materialising the raw list first. Listings
+        are converted in vectorized batches of ``chunk_size``. If a ``stats``
+        dict is given, it is filled with the read, converted and rejected
+        listing counts.
+        """
         if not listings:
+            self._count_rows(stats, 0, [])
             return pd.DataFrame()
 
-        processed_data = []
-        
-        for listing in listings:
-            try:
-                # Extract basic listing information
-                price = self.extract_price(listing.get('price', {}))
-                ratings = self.extract_rating(listing.get('rating'))
-                coordinates = listing.get('coordinates', {})
-                
-                # Skip invalid listings
-                if price <= 0:
-                    continue
+        iterator = iter(listings)
+        frames = []
+        read = 0
+        while True:
+            chunk = list(islice(iterator, chunk_size))
+            if not chunk:
+                break
+            read += len(chunk)
+            # Timed per batch, so reading a streamed payload is not counted as conversion
+            with span("convert", listings=len(chunk)) as converted:
+                frame = self._convert_chunk(chunk)
+                converted.rows = len(frame)
+            if len(frame):
+                frames.append(frame)
 
-                processed_listing = {
-                    'ID': str(listing.get('id', '')),
-                    'Title': str(listing.get('title', '')),
-                    'Description': str(listing.get('description', '')),
-                    'Room Type': str(listing.get('roomType', '')),
-                    'URL': str(listing.get('url', '')),
-                    'Thumbnail': str(listing.get('thumbnail', '')),
-                    'Latitude': float(coordinates.get('latitude', 0)),
-                    'Longitude': float(coordinates.get('longitude', 0)),
-                    'Price per Night': price,
-                    'Capacity': self.extract_capacity(listing),
-                    'Superhost': bool(listing.get('isSuperHost', False)),
-                    
-                    # Rating information
-                    'Overall Rating': ratings['guestSatisfaction'],
-                    'Reviews Count': ratings['reviewsCount'],
-                    'Location Rating': ratings['location'],
-                    'Cleanliness Rating': ratings['cleanliness'],
-                    'Value Rating': ratings['value'],
-                    'Accuracy Rating': ratings['accuracy'],
-                    'Communication Rating': ratings['communication']
-                }
-                
-                # Only add listings with valid coordinates
-                if processed_listing['Latitude'] != 0 and processed_listing['Longitude'] != 0:
-                    processed_data.append(processed_listing)
-                
-            except Exception as e:
-                print(f"Error processing listing {listing.get('id', 'unknown')}: {str(e)}")
-                continue
-        
-        if not processed_data:
+        self._count_rows(stats, read, frames)
+        return self._combine_frames(frames)
+
+    def convert_parallel(self, listings: Iterable[Dict], workers: Optional[int] = None,
+                         chunk_size: int = PARALLEL_CHUNK_SIZE,
+                         stats: Optional[Dict[str, int]] = None) -> pd.DataFrame:
+        """
+        Convert listings in a pool of worker processes.
+
+        Batches of ``chunk_size`` listings are converted in parallel and joined
+        in input order, so the result equals ``convert_to_dataframe`` over the
+        same listings. In a process running no other threads, a list of
+        listings is inherited by forked workers, which then only receive slice
+        bounds. Otherwise, since forking a multithreaded process can leave the
+        children blocked on locks held by other threads, workers are started
+        by a fork server (or spawned) and the listings are sent to them batch
+        by batch, with at most PARALLEL_PREFETCH batches per worker in flight,
+        so a streamed payload is never fully materialised.
+
+        Args:
+            listings: Raw listings, e.g. a list or the generator from iter_listings
+            workers: Number of worker processes (default: one per CPU)
+            chunk_size: Listings per batch
+            stats: Optional dict filled with the read, converted and rejected
+                listing counts summed over all batches, and the number of batches
+
+        Returns:
+            Listings DataFrame
+        """
+        workers = workers or os.cpu_count() or 1
+        if workers == 1:
+            df = self.convert_to_dataframe(listings, chunk_size, stats)
+            if stats is not None:
+                stats['batches'] = -(-stats['read'] // chunk_size)
+            return df
+
+        with span("convert", workers=workers) as converted:
+            if (isinstance(listings, list) and threading.active_count() == 1
+                    and "fork" in multiprocessing.get_all_start_methods()):
+                frames = self._convert_forked(listings, workers, chunk_size)
+                read = len(listings)
+            else:
+                frames, read = self._convert_streamed(listings, workers, chunk_size)
+            converted.rows = sum(len(frame) for frame in frames)
+            converted.fields['listings'] = read
+
+        if stats is not None:
+            stats['batches'] = len(frames)
+        frames = [frame for frame in frames if len(frame)]
+        self._count_rows(stats, read, frames)
+        return self._combine_frames(frames)
+
+    @staticmethod
+    def _convert_forked(listings: List[Dict], workers: int, chunk_size: int) -> List[pd.DataFrame]:
+        """Convert a list in forked workers that share its memory instead of unpickling copies."""
+        global _shared_listings
+        starts = list(range(0, len(listings), chunk_size))
+        stops = [min(start + chunk_size, len(listings)) for start in starts]
+        # Only called without other threads running, so no other conversion can publish its listings
+        _shared_listings = listings
+        try:
+            with ProcessPoolExecutor(max_workers=min(workers, len(starts)) or 1,
+                                     mp_context=multiprocessing.get_context("fork"),
+                                     initializer=_init_convert_worker) as executor:
+                return list(executor.map(_convert_shared_range, starts, stops))
+        finally:
+            _shared_listings = None
+
+    @staticmethod
+    def _convert_streamed(listings: Iterable[Dict], workers: int,
+                          chunk_size: int) -> Tuple[List[pd.DataFrame], int]:
+        """Send batches of an iterable to worker processes. Returns the frames and the listings read."""
+        iterator = iter(listings)
+        pending = deque()
+        frames = []
+        read = 0
+        # Fork is the default on Linux, but the caller may be one of several threads
+        method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context(method),
+                                 initializer=_init_convert_worker) as executor:
+            while True:
+                chunk = list(islice(iterator, chunk_size))
+                if not chunk:
+                    break
+                read += len(chunk)
+                pending.append(executor.submit(_convert_in_worker, chunk))
+                if len(pending) >= PARALLEL_PREFETCH * workers:
+                    frames.append(pending.popleft().result())
+            while pending:
+                frames.append(pending.popleft().result())
+        return frames, read
+
+    @staticmethod
+    def _count_rows(stats: Optional[Dict[str, int]], read: int, frames: List[pd.DataFrame]) -> None:
+        """Record how many of the listings read were converted and how many were rejected."""
+        if stats is None:
+            return
+        converted = sum(len(frame) for frame in frames)
+        stats.update({'read': read, 'converted': converted, 'rejected': read - converted})
+
+    def convert_with_amenities(self, listings: Iterable[Dict],
+                               chunk_size: int = CONVERT_CHUNK_SIZE) -> Tuple[pd.DataFrame, AmenityMatrix]:
+        """
+        Convert listings and encode their amenities in the same pass over the payload.
+
+        Returns:
+            The DataFrame from convert_to_dataframe and an AmenityMatrix whose rows
+            are aligned with the DataFrame's rows
+        """
+        encoder = AmenityEncoder()
+        df = self.convert_to_dataframe(encoder.tap(listings), chunk_size)
+        ids = df['ID'] if 'ID' in df.columns else []
+        return df, encoder.build().align(ids)
+
+    def iter_dataframes(self, listings: Iterable[Dict],
+                        batch_size: int = DATASET_PAGE_SIZE) -> Iterator[Tuple[pd.DataFrame, int]]:
+        """
+        Convert listings batch by batch for progressive display.
+
+        After every batch, yields the DataFrame of all listings converted so far,
+        in the order they were read, and the number of raw listings read. Each
+        batch is converted and cast once and appended to the running frame. Once
+        the listings are exhausted, the final frame, equal to
+        ``convert_to_dataframe`` over the same listings, is yielded last.
+        """
+        iterator = iter(listings)
+        frames = []
+        partial = pd.DataFrame()
+        read = 0
+        while True:
+            chunk = list(islice(iterator, batch_size))
+            if not chunk:
+                break
+            read += len(chunk)
+            # Timed per batch, so reading a streamed payload is not counted as conversion
+            with span("convert", listings=len(chunk)) as converted:
+                frame = self._convert_chunk(chunk)
+                converted.rows = len(frame)
+            if len(frame):
+                frames.append(frame)
+                frame = apply_listing_schema(frame)
+                partial = pd.concat([partial, frame], ignore_index=True) if len(partial) else frame
+            yield partial, read
+
+        # Sorted and combined once, so a long stream is not re-sorted after every batch
+        yield self._combine_frames(frames), read
+
+    @staticmethod
+    def _combine_frames(frames: List[pd.DataFrame]) -> pd.DataFrame:
+        """Join converted chunks into the final listings frame."""
+        if not frames:
             return pd.DataFrame()
 
-        # Create DataFrame and convert columns to appropriate types
-        df = pd.DataFrame(processed_data)
-        
-        # Define column types
-        numeric_columns = {
-            'Price per Night': 'float64',
-            'Overall Rating': 'float64',
-            'Reviews Count': 'int64',
-            'Location Rating': 'float64',
-            'Cleanliness Rating': 'float64',
-            'Value Rating': 'float64',
-            'Accuracy Rating': 'float64',
-            'Communication Rating': 'float64',
-            'Capacity': 'int64'
-        }
-        
-        # Convert column types
-        for col, dtype in numeric_columns.items():
-            if col in df.columns:
-                try:
-                    df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0)
-                    df[col] = df[col].astype(dtype)
-                except Exception as e:
-                    print(f"Error converting column {col}: {str(e)}")
-                    continue
+        with span("combine", frames=len(frames)) as combined:
+            df = pd.concat(frames, ignore_index=True) if len(frames) > 1 else frames[0].reset_index(drop=True)
+
+            df = apply_listing_schema(df)
 
-        return df.sort_values('Price per Night', ignore_index=True)
\ No newline at end of file
+            df = df.sort_values('Price per Night', ignore_index=True)
+            combined.rows = len(df)
+            combined.bytes = int(df.memory_usage(index=False).sum())
+        return df
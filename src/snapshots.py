@@ -0,0 +1,312 @@
+import hashlib
+import marshal
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+import pandas as pd
+
+try:
+    from .config import SNAPSHOT_DB
+    from .scraper import apply_listing_schema
+except ImportError:  # Running as a script from src/ (streamlit run src/main.py)
+    from config import SNAPSHOT_DB
+    from scraper import apply_listing_schema
+
+# Converted listing columns and their SQLite storage types, in convert_to_dataframe order
+LISTING_COLUMNS = {
+    'ID': 'TEXT',
+    'Title': 'TEXT',
+    'Description': 'TEXT',
+    'Room Type': 'TEXT',
+    'URL': 'TEXT',
+    'Thumbnail': 'TEXT',
+    'Latitude': 'REAL',
+    'Longitude': 'REAL',
+    'Price per Night': 'REAL',
+    'Capacity': 'INTEGER',
+    'Superhost': 'INTEGER',
+    'Overall Rating': 'REAL',
+    'Reviews Count': 'INTEGER',
+    'Location Rating': 'REAL',
+    'Cleanliness Rating': 'REAL',
+    'Value Rating': 'REAL',
+    'Accuracy Rating': 'REAL',
+    'Communication Rating': 'REAL'
+}
+# Raw listing fields read by the converter; a listing is re-converted only when one of them changes
+HASHED_FIELDS = (
+    'id', 'title', 'description', 'roomType', 'url', 'thumbnail', 'coordinates',
+    'price', 'rating', 'subDescription', 'personCapacity', 'isSuperHost'
+)
+
+_DATA_COLUMNS = ", ".join(f'"{col}"' for col in LISTING_COLUMNS)
+
+_SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS scrapes (
+    scrape_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    market TEXT NOT NULL,
+    currency TEXT NOT NULL,
+    scraped_at REAL NOT NULL,
+    listings INTEGER NOT NULL,
+    changed INTEGER NOT NULL,
+    avg_price REAL,
+    median_price REAL,
+    avg_rating REAL
+);
+CREATE INDEX IF NOT EXISTS scrapes_market_time ON scrapes (market, currency, scraped_at);
+
+CREATE TABLE IF NOT EXISTS listings (
+    market TEXT NOT NULL,
+    currency TEXT NOT NULL,
+    listing_id TEXT NOT NULL,
+    content_hash TEXT NOT NULL,
+    valid INTEGER NOT NULL,
+    first_seen REAL NOT NULL,
+    last_changed REAL NOT NULL,
+    {", ".join(f'"{col}" {sql_type}' for col, sql_type in LISTING_COLUMNS.items())},
+    PRIMARY KEY (market, currency, listing_id)
+);
+
+CREATE TABLE IF NOT EXISTS members (
+    market TEXT NOT NULL,
+    currency TEXT NOT NULL,
+    listing_id TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    PRIMARY KEY (market, currency, listing_id)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS history (
+    market TEXT NOT NULL,
+    currency TEXT NOT NULL,
+    listing_id TEXT NOT NULL,
+    scraped_at REAL NOT NULL,
+    price REAL,
+    rating REAL,
+    reviews INTEGER
+);
+CREATE INDEX IF NOT EXISTS history_listing_time ON history (listing_id, scraped_at);
+CREATE INDEX IF NOT EXISTS history_market_time ON history (market, currency, scraped_at);
+"""
+
+
+def content_hash(listing: Dict) -> str:
+    """Hash the fields of a raw listing that affect its converted row."""
+    values = [(field, listing[field]) for field in HASHED_FIELDS if field in listing]
+    # marshal format 2 writes no object back-references, so equal payloads always serialize
+    # identically; it is several times faster than repr or json for nested dicts
+    return hashlib.blake2b(marshal.dumps(values, 2), digest_size=16).hexdigest()
+
+
+def market_key(location: str) -> str:
+    """Normalize a location into the key its snapshots are stored under."""
+    return location.strip().lower()
+
+
+class SnapshotStore:
+    """SQLite store of listing snapshots keyed by market, currency and listing ID.
+
+    The ``listings`` table holds the latest converted row of every listing with
+    the hash of the raw payload it came from, and is only written for listings
+    whose payload changed. ``members`` is a narrow table of the listing IDs in
+    each market's most recent scrape, ``history`` holds the price, rating and
+    review count of a listing each time its payload changed, and ``scrapes``
+    holds one row of market aggregates per refresh.
+    """
+
+    def __init__(self, scraper, db_path: str = SNAPSHOT_DB):
+        """Open (and create if needed) the store around an AirbnbScraper instance."""
+        self.scraper = scraper
+        self.db_path = db_path
+        # SQLite allows one writer at a time; refreshes from worker threads take turns
+        self._write_lock = threading.Lock()
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """Open a connection, committing on success and rolling back on error."""
+        conn = sqlite3.connect(self.db_path)
+        try:
+            yield conn
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+
+    def refresh(self, location: str, listings: Iterable[Dict], currency: str = "USD",
+                scraped_at: float = None) -> pd.DataFrame:
+        """
+        Record a new scrape of a market, converting only listings that changed.
+
+        Args:
+            location: Market the listings belong to
+            listings: Raw listings, e.g. from AirbnbScraper.iter_listings
+            currency: Currency of the prices
+            scraped_at: Scrape timestamp (default: now)
+
+        Returns:
+            DataFrame equal to convert_to_dataframe over the same listings with
+            one row per listing ID: a repeated ID keeps its last occurrence, at
+            that occurrence's position, and listings without an ID count as
+            one listing with the ID ''
+        """
+        market = market_key(location)
+        scraped_at = time.time() if scraped_at is None else scraped_at
+
+        # Last occurrence wins for listings repeated within one payload
+        latest: Dict[str, Tuple[int, str, Dict]] = {}
+        for position, listing in enumerate(listings):
+            latest[str(listing.get('id', ''))] = (position, content_hash(listing), listing)
+
+        with self._write_lock, self._connect() as conn:
+            known = dict(conn.execute(
+                "SELECT listing_id, content_hash FROM listings WHERE market = ? AND currency = ?",
+                (market, currency)
+            ))
+            changed = [
+                (listing_id, digest, listing)
+                for listing_id, (_, digest, listing) in latest.items()
+                if known.get(listing_id) != digest
+            ]
+
+            scrape_id = conn.execute(
+                "INSERT INTO scrapes (market, currency, scraped_at, listings, changed) VALUES (?, ?, ?, 0, ?)",
+                (market, currency, scraped_at, len(changed))
+            ).lastrowid
+
+            self._write_changed(conn, market, currency, scraped_at, changed)
+
+            # Replace the market's membership with this scrape's listings, in payload order
+            conn.execute("DELETE FROM members WHERE market = ? AND currency = ?", (market, currency))
+            conn.executemany(
+                "INSERT INTO members VALUES (?, ?, ?, ?)",
+                ((market, currency, listing_id, entry[0]) for listing_id, entry in latest.items())
+            )
+
+            df = self._read_members(conn, market, currency)
+            conn.execute(
+                """UPDATE scrapes SET listings = ?, avg_price = ?, median_price = ?, avg_rating = ?
+                   WHERE scrape_id = ?""",
+                (
+                    len(df),
+                    float(df['Price per Night'].mean()) if len(df) else None,
+                    float(df['Price per Night'].median()) if len(df) else None,
+                    float(df['Overall Rating'].mean()) if len(df) else None,
+                    scrape_id
+                )
+            )
+        return df
+
+    def _write_changed(self, conn: sqlite3.Connection, market: str, currency: str, scraped_at: float,
+                       changed: List[Tuple[str, str, Dict]]) -> None:
+        """Convert changed listings and upsert them, appending their history rows."""
+        if not changed:
+            return
+
+        converted = self.scraper.convert_to_dataframe([listing for _, _, listing in changed])
+        rows = {}
+        if len(converted):
+            records = converted[list(LISTING_COLUMNS)].astype(object).where(converted.notna(), None)
+            rows = {row[0]: row for row in records.itertuples(index=False, name=None)}
+
+        empty_row = (None,) * len(LISTING_COLUMNS)
+        conn.executemany(
+            f"""INSERT INTO listings (market, currency, listing_id, content_hash, valid, first_seen,
+                                      last_changed, {_DATA_COLUMNS})
+                VALUES ({", ".join("?" * (7 + len(LISTING_COLUMNS)))})
+                ON CONFLICT (market, currency, listing_id) DO UPDATE SET
+                    content_hash = excluded.content_hash, valid = excluded.valid,
+                    last_changed = excluded.last_changed,
+                    {", ".join(f'"{col}" = excluded."{col}"' for col in LISTING_COLUMNS)}""",
+            (
+                (market, currency, listing_id, digest, listing_id in rows, scraped_at, scraped_at,
+                 *rows.get(listing_id, empty_row))
+                for listing_id, digest, _ in changed
+            )
+        )
+
+        if rows:
+            history = converted[['ID', 'Price per Night', 'Overall Rating', 'Reviews Count']]
+            conn.executemany(
+                "INSERT INTO history VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    (market, currency, listing_id, scraped_at, float(price), float(rating), int(reviews))
+                    for listing_id, price, rating, reviews in history.itertuples(index=False, name=None)
+                )
+            )
+
+    def _read_members(self, conn: sqlite3.Connection, market: str, currency: str) -> pd.DataFrame:
+        """Load the valid listings of a market's latest scrape, ordered like convert_to_dataframe output."""
+        columns = ", ".join(f'l."{col}"' for col in LISTING_COLUMNS)
+        df = pd.read_sql_query(
+            f"""SELECT {columns} FROM members m
+                JOIN listings l ON l.market = m.market AND l.currency = m.currency AND l.listing_id = m.listing_id
+                WHERE m.market = ? AND m.currency = ? AND l.valid = 1
+                ORDER BY m.position""",
+            conn, params=(market, currency)
+        )
+        if df.empty:
+            return pd.DataFrame()
+        df['Superhost'] = df['Superhost'].astype(bool)
+        df = apply_listing_schema(df)
+        return df.sort_values('Price per Night', ignore_index=True)
+
+    def latest(self, location: str, currency: str = "USD") -> Optional[pd.DataFrame]:
+        """Return the listings of a market's most recent scrape, or None if it was never scraped."""
+        market = market_key(location)
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT 1 FROM scrapes WHERE market = ? AND currency = ? LIMIT 1", (market, currency)
+            ).fetchone()
+            if row is None:
+                return None
+            return self._read_members(conn, market, currency)
+
+    def price_trend(self, location: str, currency: str = "USD", start: float = None,
+                    end: float = None) -> pd.DataFrame:
+        """
+        Return per-scrape market aggregates within a time range.
+
+        Args:
+            location: Market to query
+            currency: Currency of the prices
+            start: Earliest scrape timestamp (inclusive, default: no limit)
+            end: Latest scrape timestamp (inclusive, default: no limit)
+
+        Returns:
+            DataFrame with one row per scrape, oldest first
+        """
+        with self._connect() as conn:
+            return pd.read_sql_query(
+                """SELECT scraped_at, listings, changed, avg_price, median_price, avg_rating FROM scrapes
+                   WHERE market = ? AND currency = ? AND scraped_at BETWEEN ? AND ?
+                   ORDER BY scraped_at""",
+                conn,
+                params=(market_key(location), currency,
+                        float('-inf') if start is None else start, float('inf') if end is None else end)
+            )
+
+    def listing_history(self, listing_id: str, start: float = None, end: float = None) -> pd.DataFrame:
+        """
+        Return the recorded price, rating and review count changes of one listing.
+
+        Each row holds the values from its scrape until the next row.
+        """
+        with self._connect() as conn:
+            return pd.read_sql_query(
+                """SELECT market, currency, scraped_at, price, rating, reviews FROM history
+                   WHERE listing_id = ? AND scraped_at BETWEEN ? AND ?
+                   ORDER BY scraped_at""",
+                conn,
+                params=(str(listing_id), float('-inf') if start is None else start,
+                        float('inf') if end is None else end)
+            )
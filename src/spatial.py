@@ -0,0 +1,182 @@
+from typing import Optional, Tuple
+import numpy as np
+import pandas as pd
+
+# Mean Earth radius used for great-circle distances
+EARTH_RADIUS_KM = 6371.0088
+# Average number of listings per grid cell when the cell size is derived from the data
+TARGET_CELL_OCCUPANCY = 16
+# Smallest cell edge, about 11 m of latitude
+MIN_CELL_DEGREES = 1e-4
+
+
+def haversine_km(lat1, lon1, lat2, lon2) -> np.ndarray:
+    """Great-circle distance in km between coordinates in degrees, broadcasting over arrays."""
+    lat1, lon1, lat2, lon2 = (np.radians(np.asarray(v, dtype=np.float64)) for v in (lat1, lon1, lat2, lon2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+def radius_bbox(latitude: float, longitude: float, radius_km: float) -> Tuple[float, float, float, float]:
+    """
+    Return the (south, west, north, east) box containing a circle.
+
+    West is greater than east when the box crosses the antimeridian, and the
+    box spans every longitude when the circle reaches a pole.
+    """
+    dlat = np.degrees(radius_km / EARTH_RADIUS_KM)
+    south, north = max(latitude - dlat, -90.0), min(latitude + dlat, 90.0)
+    cos_lat = np.cos(np.radians(latitude))
+    if south <= -90.0 or north >= 90.0 or cos_lat <= 0:
+        return south, -180.0, north, 180.0
+    # Widest longitude offset of the circle, reached at its tangent points
+    ratio = np.sin(radius_km / EARTH_RADIUS_KM) / cos_lat
+    if ratio >= 1:
+        return south, -180.0, north, 180.0
+    dlon = np.degrees(np.arcsin(ratio))
+    west = (longitude - dlon + 180.0) % 360.0 - 180.0
+    east = (longitude + dlon + 180.0) % 360.0 - 180.0
+    return south, west, north, east
+
+
+class SpatialIndex:
+    """Uniform grid index over listing coordinates.
+
+    Points are sorted by grid cell, numbered row by row, so the cells of one
+    grid row inside a query box form a single contiguous run that two
+    searchsorted calls find. Bounding box queries gather those runs for all
+    grid rows at once and refine the candidates with exact comparisons;
+    radius and nearest-neighbour queries refine them with vectorized
+    haversine distances. Positions returned refer to the rows the index was
+    built from; rows without finite coordinates are never returned.
+    """
+
+    def __init__(self, latitudes: np.ndarray, longitudes: np.ndarray, cell_degrees: Optional[float] = None):
+        """
+        Build the index.
+
+        Args:
+            latitudes: Latitude of each row in degrees
+            longitudes: Longitude of each row in degrees
+            cell_degrees: Grid cell edge in degrees (default: sized for TARGET_CELL_OCCUPANCY)
+        """
+        latitudes = np.asarray(latitudes, dtype=np.float64)
+        longitudes = np.asarray(longitudes, dtype=np.float64)
+        self.size = len(latitudes)
+        positions = np.flatnonzero(np.isfinite(latitudes) & np.isfinite(longitudes))
+        lat, lon = latitudes[positions], longitudes[positions]
+
+        if len(positions):
+            self.origin = (float(lat.min()), float(lon.min()))
+            extent = (float(lat.max()) - self.origin[0], float(lon.max()) - self.origin[1])
+        else:
+            self.origin, extent = (0.0, 0.0), (0.0, 0.0)
+        if cell_degrees is None:
+            cells = max(len(positions) / TARGET_CELL_OCCUPANCY, 1.0)
+            cell_degrees = np.sqrt(max(extent[0], MIN_CELL_DEGREES) * max(extent[1], MIN_CELL_DEGREES) / cells)
+        self.cell = max(float(cell_degrees), MIN_CELL_DEGREES)
+        self.rows = int(extent[0] // self.cell) + 1
+        self.cols = int(extent[1] // self.cell) + 1
+
+        keys = self._row_of(lat) * self.cols + self._col_of(lon)
+        order = np.argsort(keys, kind="stable")
+        self.keys = keys[order]
+        self.positions = positions[order]
+        self.lat = lat[order]
+        self.lon = lon[order]
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, cell_degrees: Optional[float] = None) -> "SpatialIndex":
+        """Index the Latitude and Longitude columns of a listings frame."""
+        return cls(df['Latitude'].to_numpy(dtype=np.float64, na_value=np.nan),
+                   df['Longitude'].to_numpy(dtype=np.float64, na_value=np.nan), cell_degrees)
+
+    def __len__(self) -> int:
+        """Number of indexed points."""
+        return len(self.positions)
+
+    def _row_of(self, lat: np.ndarray) -> np.ndarray:
+        """Grid row of latitudes, clipped to the grid."""
+        return np.clip((lat - self.origin[0]) // self.cell, 0, self.rows - 1).astype(np.int64)
+
+    def _col_of(self, lon: np.ndarray) -> np.ndarray:
+        """Grid column of longitudes, clipped to the grid."""
+        return np.clip((lon - self.origin[1]) // self.cell, 0, self.cols - 1).astype(np.int64)
+
+    def _candidates(self, south: float, west: float, north: float, east: float) -> np.ndarray:
+        """Return sorted-order indices of the points in the grid cells overlapping a box (west <= east)."""
+        if not len(self) or south > north or west > east:
+            return np.empty(0, dtype=np.int64)
+        first_row, last_row = self._row_of(np.array([south, north]))
+        first_col, last_col = self._col_of(np.array([west, east]))
+        row_keys = np.arange(first_row, last_row + 1, dtype=np.int64) * self.cols
+        starts = np.searchsorted(self.keys, row_keys + first_col, side="left")
+        stops = np.searchsorted(self.keys, row_keys + last_col, side="right")
+        lengths = stops - starts
+        total = int(lengths.sum())
+        # Concatenate the runs [start, stop) of every grid row in one vectorized step
+        offsets = np.repeat(starts - (np.cumsum(lengths) - lengths), lengths)
+        return np.arange(total, dtype=np.int64) + offsets
+
+    def _in_box(self, south: float, west: float, north: float, east: float) -> np.ndarray:
+        """Return sorted-order indices of the points inside a box, which may cross the antimeridian."""
+        spans = [(west, east)] if west <= east else [(west, 180.0), (-180.0, east)]
+        found = []
+        for low, high in spans:
+            candidates = self._candidates(south, low, north, high)
+            lat, lon = self.lat[candidates], self.lon[candidates]
+            found.append(candidates[(lat >= south) & (lat <= north) & (lon >= low) & (lon <= high)])
+        return np.concatenate(found)
+
+    def _within(self, latitude: float, longitude: float, radius_km: float) -> Tuple[np.ndarray, np.ndarray]:
+        """Return sorted-order indices and distances of the points within a radius."""
+        candidates = self._in_box(*radius_bbox(latitude, longitude, radius_km))
+        distances = haversine_km(latitude, longitude, self.lat[candidates], self.lon[candidates])
+        inside = distances <= radius_km
+        return candidates[inside], distances[inside]
+
+    def bbox(self, south: float, west: float, north: float, east: float) -> np.ndarray:
+        """
+        Return the positions of the rows inside a bounding box, in row order.
+
+        A box with west greater than east crosses the antimeridian.
+        """
+        return np.sort(self.positions[self._in_box(south, west, north, east)])
+
+    def radius(self, latitude: float, longitude: float, radius_km: float) -> np.ndarray:
+        """Return the positions of the rows within radius_km of a point, in row order."""
+        found, _ = self._within(latitude, longitude, radius_km)
+        return np.sort(self.positions[found])
+
+    def nearest(self, latitude: float, longitude: float, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Return the k rows nearest to a point.
+
+        The search radius starts from the expected distance of the k-th
+        neighbour at the data's average density and doubles until it holds k
+        points; every point outside it is farther than those inside.
+
+        Returns:
+            Positions of the rows and their distances in km, nearest first
+        """
+        k = min(int(k), len(self))
+        if k <= 0:
+            return np.empty(0, dtype=np.int64), np.empty(0)
+
+        half_circumference = np.pi * EARTH_RADIUS_KM
+        km_per_degree = np.pi / 180 * EARTH_RADIUS_KM
+        grid_km = (self.rows * self.cell * km_per_degree,
+                   self.cols * self.cell * km_per_degree * max(np.cos(np.radians(self.origin[0])), 0.1))
+        radius_km = max(np.sqrt(k * grid_km[0] * grid_km[1] / (np.pi * len(self))), 0.01)
+        while True:
+            found, distances = self._within(latitude, longitude, radius_km)
+            if len(found) >= k or radius_km >= half_circumference:
+                break
+            radius_km *= 2
+
+        if len(found) < k:
+            found = np.arange(len(self))
+            distances = haversine_km(latitude, longitude, self.lat, self.lon)
+        closest = np.argpartition(distances, k - 1)[:k] if k < len(found) else np.arange(len(found))
+        closest = closest[np.argsort(distances[closest], kind="stable")]
+        return self.positions[found[closest]], distances[closest]
@@ -0,0 +1,227 @@
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List, Optional
+
+# Logger receiving one JSON object per finished span
+logger = logging.getLogger("airbnb_scraper.telemetry")
+logger.addHandler(logging.NullHandler())
+logger.propagate = False
+
+# Per-stage counters exported in the Prometheus text format: (metric, field, help)
+PROMETHEUS_METRICS = (
+    ("airbnb_stage_calls_total", "calls", "Number of times each pipeline stage ran."),
+    ("airbnb_stage_errors_total", "errors", "Number of runs of each pipeline stage that raised."),
+    ("airbnb_stage_seconds_total", "seconds", "Wall time spent in each pipeline stage."),
+    ("airbnb_stage_rows_total", "rows", "Rows produced by each pipeline stage."),
+    ("airbnb_stage_bytes_total", "bytes", "Bytes produced by each pipeline stage."),
+)
+
+
+class Span:
+    """One timed run of a pipeline stage, with the rows and bytes it produced."""
+
+    def __init__(self, name: str, rows: Optional[int] = None, bytes: Optional[int] = None,
+                 parent: Optional["Span"] = None, **fields: Any):
+        self.name = name
+        self.rows = rows
+        self.bytes = bytes
+        self.fields = fields
+        self.parent = parent
+        self.seconds = 0.0
+        self.error: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the span as a JSON-serializable log record."""
+        record = {"stage": self.name, "seconds": round(self.seconds, 6), "rows": self.rows,
+                  "bytes": self.bytes, "parent": self.parent.name if self.parent else None}
+        if self.error:
+            record["error"] = self.error
+        record.update(self.fields)
+        return record
+
+
+class Trace:
+    """Spans finished during one unit of work, such as a Streamlit rerun or a CLI sweep."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.spans: List[Span] = []
+        self.started = time.perf_counter()
+        self._lock = threading.Lock()
+
+    def add(self, span: Span) -> None:
+        """Record a finished span."""
+        with self._lock:
+            self.spans.append(span)
+
+    def elapsed(self) -> float:
+        """Seconds since the trace started."""
+        return time.perf_counter() - self.started
+
+    def breakdown(self) -> List[Dict[str, Any]]:
+        """
+        Sum the spans of each stage, in the order stages first finished.
+
+        Returns:
+            One dict per stage with its name, calls, seconds, rows and bytes
+            (rows and bytes are None if no span of the stage reported them)
+        """
+        stages: Dict[str, Dict[str, Any]] = {}
+        with self._lock:
+            spans = list(self.spans)
+        for span in spans:
+            stage = stages.setdefault(span.name, {"stage": span.name, "calls": 0, "seconds": 0.0,
+                                                  "rows": None, "bytes": None})
+            stage["calls"] += 1
+            stage["seconds"] += span.seconds
+            for field in ("rows", "bytes"):
+                value = getattr(span, field)
+                if value is not None:
+                    stage[field] = (stage[field] or 0) + value
+        return list(stages.values())
+
+
+_current_trace: ContextVar[Optional[Trace]] = ContextVar("current_trace", default=None)
+_current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+_totals: Dict[str, Dict[str, float]] = {}
+_totals_lock = threading.Lock()
+
+
+def current_trace() -> Optional[Trace]:
+    """Return the trace spans are currently added to, if any."""
+    return _current_trace.get()
+
+
+@contextmanager
+def trace(name: str) -> Iterator[Trace]:
+    """Collect the spans finished inside the block, in this thread, into a new Trace."""
+    collected = Trace(name)
+    token = _current_trace.set(collected)
+    try:
+        yield collected
+    finally:
+        _current_trace.reset(token)
+
+
+@contextmanager
+def span(name: str, rows: Optional[int] = None, bytes: Optional[int] = None, **fields: Any) -> Iterator[Span]:
+    """
+    Time a pipeline stage.
+
+    The yielded Span's rows, bytes and fields can be set inside the block once
+    they are known. On exit the span is added to the current trace, the
+    process-wide stage totals and the JSON log.
+
+    Args:
+        name: Stage name, e.g. "convert"
+        rows: Rows produced by the stage, if known up front
+        bytes: Bytes produced by the stage, if known up front
+        **fields: Extra values written to the log record
+    """
+    current = Span(name, rows, bytes, _current_span.get(), **fields)
+    token = _current_span.set(current)
+    start = time.perf_counter()
+    try:
+        yield current
+    except BaseException as e:
+        current.error = type(e).__name__
+        raise
+    finally:
+        current.seconds = time.perf_counter() - start
+        _current_span.reset(token)
+        _finish(current)
+
+
+def record(name: str, seconds: float, rows: Optional[int] = None, bytes: Optional[int] = None,
+           **fields: Any) -> Span:
+    """Record a stage timed by the caller, e.g. work spread over the steps of a generator."""
+    finished = Span(name, rows, bytes, _current_span.get(), **fields)
+    finished.seconds = seconds
+    _finish(finished)
+    return finished
+
+
+def _finish(finished: Span) -> None:
+    """Add a finished span to the current trace, the stage totals and the log."""
+    collected = _current_trace.get()
+    if collected is not None:
+        collected.add(finished)
+
+    with _totals_lock:
+        totals = _totals.setdefault(finished.name, {field: 0 for _, field, _ in PROMETHEUS_METRICS})
+        totals["calls"] += 1
+        totals["errors"] += finished.error is not None
+        totals["seconds"] += finished.seconds
+        totals["rows"] += finished.rows or 0
+        totals["bytes"] += finished.bytes or 0
+
+    if logger.isEnabledFor(logging.INFO):
+        logger.info(json.dumps({"ts": round(time.time(), 3), **finished.to_dict()}, default=str))
+
+
+def stage_totals() -> Dict[str, Dict[str, float]]:
+    """Return a copy of the process-wide totals of every stage."""
+    with _totals_lock:
+        return {name: dict(totals) for name, totals in _totals.items()}
+
+
+def reset_totals() -> None:
+    """Forget the process-wide stage totals."""
+    with _totals_lock:
+        _totals.clear()
+
+
+def prometheus_text() -> str:
+    """Render the stage totals in the Prometheus text exposition format."""
+    totals = stage_totals()
+    lines = []
+    for metric, field, help_text in PROMETHEUS_METRICS:
+        lines.append(f"# HELP {metric} {help_text}")
+        lines.append(f"# TYPE {metric} counter")
+        for name in sorted(totals):
+            stage = name.replace("\\", "\\\\").replace('"', '\\"')
+            lines.append(f'{metric}{{stage="{stage}"}} {totals[name][field]:g}')
+    return "\n".join(lines) + "\n"
+
+
+def write_prometheus(path: str) -> None:
+    """
+    Write the stage totals to a Prometheus text file.
+
+    The file is replaced atomically, so a collector such as node_exporter's
+    textfile collector never reads a partial file.
+    """
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    # Streamlit sessions are threads of one process, so each write needs its own temporary file
+    fd, tmp_path = tempfile.mkstemp(dir=directory or ".", prefix=f"{os.path.basename(path)}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as fh:
+            fh.write(prometheus_text())
+        # mkstemp creates the file readable by its owner only; collectors often run as another user
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def configure_json_log(path: str) -> None:
+    """Append one JSON line per finished span to a file. Calling it again with the same path has no effect."""
+    path = os.path.abspath(path)
+    if any(getattr(handler, "baseFilename", None) == path for handler in logger.handlers):
+        return
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    handler = logging.FileHandler(path, encoding="utf-8")
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
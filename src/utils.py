@@ -1,5 +1,14 @@
 import pandas as pd
-from typing import Dict, List
+from typing import Dict, List, Sequence, Tuple, Union
+
+try:
+    from .metrics import compute_aggregates
+    from .amenities import AmenityMatrix
+    from .dataset import ListingDataset
+except ImportError:  # Running as a script from src/ (streamlit run src/main.py)
+    from metrics import compute_aggregates
+    from amenities import AmenityMatrix
+    from dataset import ListingDataset
 
 def format_currency(amount: float, currency: str = "USD") -> str:
     """Format currency amount with proper symbol."""
@@ -11,36 +20,68 @@ def format_currency(amount: float, currency: str = "USD") -> str:
     symbol = currency_symbols.get(currency, "$")
     return f"{symbol}{amount:,.2f}"
 
-def calculate_market_metrics(df: pd.DataFrame) -> Dict:
-    """Calculate key market metrics from the DataFrame."""
+def format_bytes(num_bytes: float) -> str:
+    """Format a byte count with a human readable unit."""
+    for unit in ["B", "KB", "MB"]:
+        if abs(num_bytes) < 1024:
+            return f"{num_bytes:.1f} {unit}"
+        num_bytes /= 1024
+    return f"{num_bytes:.1f} GB"
+
+def dataframe_memory(df: pd.DataFrame) -> int:
+    """Return the total memory used by a DataFrame in bytes, including string contents."""
+    return int(df.memory_usage(deep=True).sum())
+
+def calculate_market_metrics(df: Union[pd.DataFrame, ListingDataset], stats: Dict = None) -> Dict:
+    """Calculate key market metrics from the DataFrame, or from its precomputed aggregates.
+
+    A ListingDataset is aggregated batch by batch without loading it.
+    """
+    if stats is None:
+        stats = df.aggregates() if isinstance(df, ListingDataset) else compute_aggregates(df)
     return {
-        "total_listings": len(df),
-        "avg_price": df["Price per Night"].mean(),
-        "median_price": df["Price per Night"].median(),
-        "avg_rating": df["Overall Rating"].mean(),
-        "superhost_ratio": (df["Superhost"].mean() * 100),
-        "avg_reviews": df["Reviews Count"].mean(),
-        "most_common_type": df["Room Type"].mode().iloc[0],
+        "total_listings": stats["count"],
+        "avg_price": stats["avg_price"],
+        "median_price": stats["median_price"],
+        "avg_rating": stats["avg_rating"],
+        "superhost_ratio": stats["superhost_ratio"],
+        "avg_reviews": stats["avg_reviews"],
+        "most_common_type": stats["most_common_type"],
         "price_range": {
-            "min": df["Price per Night"].min(),
-            "max": df["Price per Night"].max()
+            "min": stats["min_price"],
+            "max": stats["max_price"]
         }
     }
 
+def filter_listings(df: Union[pd.DataFrame, ListingDataset], price_range: Tuple[float, float], min_rating: float,
+                    room_types: Sequence[str], superhost_only: bool = False,
+                    min_guests: int = 1) -> pd.DataFrame:
+    """Return the listings matching the sidebar filter values.
+
+    A ListingDataset is scanned batch by batch and only the matches are loaded.
+    """
+    if isinstance(df, ListingDataset):
+        return df.filter(price_range, min_rating, room_types, superhost_only, min_guests)
+
+    mask = (
+        (df['Price per Night'] >= price_range[0]) &
+        (df['Price per Night'] <= price_range[1]) &
+        # Compare in the column's own precision so float32 ratings equal to the threshold are kept
+        (df['Overall Rating'] >= df['Overall Rating'].dtype.type(min_rating)) &
+        (df['Room Type'].isin(room_types))
+    )
+
+    if 'Capacity' in df.columns:
+        mask &= (df['Capacity'] >= min_guests)
+
+    if superhost_only and 'Superhost' in df.columns:
+        mask &= df['Superhost']
+
+    return df[mask]
+
 def prepare_amenities_analysis(amenities_data: List[Dict]) -> pd.DataFrame:
     """Analyze amenities frequency across listings."""
-    all_amenities = {}
-    for listing_amenities in amenities_data:
-        for category in listing_amenities:
-            for amenity in category["values"]:
-                if amenity["available"]:
-                    name = amenity["title"]
-                    all_amenities[name] = all_amenities.get(name, 0) + 1
-    
-    return pd.DataFrame(
-        list(all_amenities.items()),
-        columns=["Amenity", "Count"]
-    ).sort_values("Count", ascending=False)
+    return AmenityMatrix.from_amenities(amenities_data).frequency()
 
 def calculate_price_ranges(prices: pd.Series) -> List[Dict]:
     """Calculate price ranges for filtering."""
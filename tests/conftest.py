@@ -0,0 +1,8 @@
+import pytest
+from src import governor
+
+
+@pytest.fixture(autouse=True)
+def fresh_run_governor(monkeypatch):
+    """Give every test its own process-wide run governor, so runs started by earlier tests never throttle it."""
+    monkeypatch.setattr(governor, "_default_governor", None)
@@ -0,0 +1,100 @@
+import random
+import numpy as np
+import pandas as pd
+import pytest
+from benchmarks.payloads import generate_listings
+from src.amenities import AmenityMatrix
+from src.filters import FilterIndex
+from src.scraper import AirbnbScraper
+
+
+def available(listing):
+    return {a['title'] for c in listing.get('amenities') or [] for a in c['values'] if a['available']}
+
+
+@pytest.fixture(scope="module")
+def listings():
+    return generate_listings(2000, seed=3)
+
+
+def test_frequency_counts_available_amenities(listings):
+    matrix = AmenityMatrix.from_listings(listings)
+    expected = {}
+    for listing in listings:
+        for name in available(listing):
+            expected[name] = expected.get(name, 0) + 1
+
+    frequency = matrix.frequency()
+    assert dict(zip(frequency['Amenity'], frequency['Count'])) == expected
+    assert frequency['Count'].is_monotonic_decreasing
+    assert len(matrix) == len(listings)
+    assert matrix.indices.dtype == np.int16
+
+
+def test_mask_matches_set_logic(listings):
+    matrix = AmenityMatrix.from_listings(listings)
+    rows = [available(listing) for listing in listings]
+    rng = random.Random(0)
+
+    for _ in range(50):
+        all_of, none_of, any_of = (rng.sample(matrix.vocabulary, rng.randint(0, 2)) for _ in range(3))
+        expected = [
+            set(all_of) <= row and not set(none_of) & row and (not any_of or bool(set(any_of) & row))
+            for row in rows
+        ]
+        np.testing.assert_array_equal(matrix.mask(all_of, none_of, any_of), expected)
+
+    assert not matrix.mask(['Helipad']).any()
+    assert matrix.mask(none_of=['Helipad']).all()
+
+
+def test_align_take_and_save(listings, tmp_path):
+    payload = listings[:5] + [dict(listings[0], amenities=[])]  # repeated ID, last occurrence wins
+    matrix = AmenityMatrix.from_listings(payload)
+
+    aligned = matrix.align([payload[2]['id'], 'unknown', payload[0]['id']])
+    assert list(aligned.ids) == [payload[2]['id'], 'unknown', payload[0]['id']]
+    assert set(aligned.amenities_of(0)) == available(payload[2])
+    assert aligned.amenities_of(1) == [] and aligned.amenities_of(2) == []
+
+    subset = matrix.take(np.array([3, 1]))
+    assert [set(subset.amenities_of(i)) for i in range(2)] == [available(payload[3]), available(payload[1])]
+
+    path = str(tmp_path / "amenities.npz")
+    matrix.save(path)
+    loaded = AmenityMatrix.load(path)
+    assert loaded.vocabulary == matrix.vocabulary
+    assert list(loaded.ids) == list(matrix.ids)
+    np.testing.assert_array_equal(loaded.indices, matrix.indices)
+
+
+def test_convert_with_amenities_aligns_rows(listings):
+    scraper = AirbnbScraper(api_token="test")
+    df, matrix = scraper.convert_with_amenities(iter(listings))
+    by_id = {listing['id']: listing for listing in listings}
+
+    pd.testing.assert_frame_equal(df, scraper.convert_to_dataframe(listings))
+    assert list(matrix.ids) == df['ID'].tolist()
+    for position in range(0, len(df), 97):
+        assert set(matrix.amenities_of(position)) == available(by_id[df['ID'].iloc[position]])
+
+    # Filtering by amenity goes through the matrix, not the raw payload
+    index = FilterIndex(df, amenities=matrix)
+    positions = index.query((0, 10000), 0.0, df['Room Type'].unique().tolist(), amenities=['Wifi', 'Kitchen'])
+    expected = [i for i, listing_id in enumerate(df['ID']) if {'Wifi', 'Kitchen'} <= available(by_id[listing_id])]
+    assert positions.tolist() == expected
+
+
+def test_malformed_amenity_blocks_are_skipped():
+    wifi = {'title': 'Wifi', 'available': True}
+    payloads = [
+        [{'title': 'Basic', 'values': None}, {'title': 'Basic', 'values': [wifi]}],
+        [{'title': 'Basic', 'values': [{'available': True}, None, 'Pool', wifi]}],
+        'Wifi',
+        {'title': 'Basic', 'values': [wifi]},
+        [None, 'Basic', {'values': {'title': 'Pool', 'available': True}}],
+    ]
+    matrix = AmenityMatrix.from_listings({'id': str(i), 'amenities': a} for i, a in enumerate(payloads))
+
+    assert list(matrix.ids) == ['0', '1', '2', '3', '4']
+    assert [matrix.amenities_of(i) for i in range(len(payloads))] == [['Wifi'], ['Wifi'], [], [], []]
@@ -0,0 +1,72 @@
+import random
+import pytest
+from benchmarks.payloads import generate_listing, generate_listings
+from benchmarks.run import BENCHMARKS, compare_results, run_benchmarks
+from src.scraper import AirbnbScraper
+
+
+def test_generate_listings_is_seeded():
+    assert generate_listings(50, seed=3) == generate_listings(50, seed=3)
+    assert generate_listings(50, seed=3) != generate_listings(50, seed=4)
+
+
+def test_generated_listings_cover_payload_shapes():
+    listings = generate_listings(2000, seed=1, invalid_rate=0.1)
+
+    prices = [listing.get("price") for listing in listings]
+    assert any(p and "label" in p for p in prices)
+    assert any(p and isinstance(p.get("price"), str) for p in prices)
+    assert any(p and isinstance(p.get("price"), float) for p in prices)
+    assert any(p is None for p in prices)
+    assert any(listing.get("rating") is None for listing in listings)
+    assert any("coordinates" not in listing for listing in listings)
+    assert any("guests" in listing["subDescription"]["items"][0] for listing in listings)
+    assert all("amenities" in listing for listing in listings)
+
+    without_amenities = generate_listing(random.Random(0), 0, amenities=False)
+    assert "amenities" not in without_amenities
+
+
+def test_generated_listings_convert():
+    listings = generate_listings(1000, seed=2, invalid_rate=0.1)
+    df = AirbnbScraper(api_token="test").convert_to_dataframe(listings)
+
+    # Invalid prices and missing coordinates are dropped, everything else is kept
+    assert 850 < len(df) < 1000
+    assert (df["Price per Night"] > 0).all()
+    assert (df["Capacity"] >= 1).all()
+
+
+def test_run_benchmarks_records_each_size():
+    results = run_benchmarks([50, 100], ["convert_to_dataframe", "export_csv"], verbose=False)
+
+    assert set(results["results"]) == {"convert_to_dataframe", "export_csv"}
+    assert set(results["results"]["export_csv"]) == {"50", "100"}
+    assert results["meta"]["sizes"] == [50, 100]
+
+    with pytest.raises(ValueError):
+        run_benchmarks([50], ["nope"], verbose=False)
+
+
+def test_run_benchmarks_skips_sizes_above_limit(monkeypatch):
+    body, _ = BENCHMARKS["export_csv"]
+    monkeypatch.setitem(BENCHMARKS, "export_csv", (body, 60))
+
+    results = run_benchmarks([50, 100], ["export_csv"], verbose=False)
+
+    assert set(results["results"]["export_csv"]) == {"50"}
+
+
+def test_compare_results_flags_regressions():
+    baseline = {"results": {"a": {"1000": 0.100, "10000": 1.0}, "b": {"1000": 0.001}}}
+    current = {"results": {
+        "a": {"1000": 0.200, "10000": 1.2, "100000": 9.0},
+        "b": {"1000": 0.004},
+        "c": {"1000": 5.0}
+    }}
+
+    regressions = compare_results(current, baseline, tolerance=1.5)
+
+    # b is 4x slower but within the noise floor; sizes and benchmarks missing from the baseline are ignored
+    assert [(r["benchmark"], r["size"]) for r in regressions] == [("a", 1000)]
+    assert regressions[0]["ratio"] == pytest.approx(2.0)
@@ -0,0 +1,175 @@
+import os
+import threading
+import time
+import pytest
+from unittest.mock import Mock, patch
+import pandas as pd
+from src.cache import ScrapeCache
+from src.scraper import AirbnbScraper
+
+
+def make_listing(listing_id, price=100):
+    return {
+        'id': listing_id,
+        'title': f'Listing {listing_id}',
+        'roomType': 'Entire home/apt',
+        'coordinates': {'latitude': 51.5074, 'longitude': -0.1278},
+        'price': {'label': f'${price} per night'},
+        'rating': {'guestSatisfaction': 4.8, 'reviewsCount': 12},
+        'personCapacity': 2
+    }
+
+
+@pytest.fixture
+def scraper():
+    with patch.dict('os.environ', {'APIFY_API_TOKEN': 'test_token'}):
+        scraper = AirbnbScraper()
+    scraper.iter_listings = Mock(side_effect=lambda *args, **kwargs: iter(
+        [make_listing('1', 120), make_listing('2', 80)]
+    ))
+    return scraper
+
+
+@pytest.fixture
+def cache(scraper, tmp_path):
+    return ScrapeCache(scraper, cache_dir=str(tmp_path), ttl_seconds=60, max_bytes=10 * 1024 * 1024)
+
+
+def test_repeat_search_hits_cache(cache, scraper):
+    first = cache.get_dataframe('London', 'USD', 10)
+    second = cache.get_dataframe('london ', 'USD', 10)
+
+    assert scraper.iter_listings.call_count == 1
+    pd.testing.assert_frame_equal(first, second)
+    assert list(second['Price per Night']) == [80.0, 120.0]
+
+
+def test_raw_payload_is_stored(cache):
+    cache.get_dataframe('London', 'USD', 10)
+    raw = cache.load_raw('London', 'USD', 10)
+
+    assert [listing['id'] for listing in raw] == ['1', '2']
+
+
+def test_key_includes_currency_and_max_results(cache, scraper):
+    cache.get_dataframe('London', 'USD', 10)
+    cache.get_dataframe('London', 'EUR', 10)
+    cache.get_dataframe('London', 'USD', 20)
+
+    assert scraper.iter_listings.call_count == 3
+
+
+def test_force_refresh_bypasses_cache(cache, scraper):
+    cache.get_dataframe('London', 'USD', 10)
+    cache.get_dataframe('London', 'USD', 10, force_refresh=True)
+
+    assert scraper.iter_listings.call_count == 2
+
+
+def test_expired_entry_is_refetched(cache, scraper):
+    cache.get_dataframe('London', 'USD', 10)
+    with patch('src.cache.time.time', return_value=time.time() + 120):
+        assert cache.get('London', 'USD', 10) is None
+        cache.get_dataframe('London', 'USD', 10)
+
+    assert scraper.iter_listings.call_count == 2
+
+
+def test_lru_eviction_respects_max_bytes(cache):
+    cache.get_dataframe('London', 'USD', 10)
+    cache.get_dataframe('Paris', 'USD', 10)
+    entry_size = max(entry['size'] for entry in cache._entries())
+
+    # Make London the most recently used entry, then shrink the budget
+    london_meta = cache._paths(cache.make_key('London', 'USD', 10))['meta']
+    paris_meta = cache._paths(cache.make_key('Paris', 'USD', 10))['meta']
+    os.utime(paris_meta, (time.time() - 10, time.time() - 10))
+    cache.get('London', 'USD', 10)
+    cache.max_bytes = entry_size
+
+    assert cache.evict() == 1
+    assert os.path.exists(london_meta)
+    assert not os.path.exists(paris_meta)
+
+
+def test_concurrent_misses_for_one_key_do_not_collide(cache, scraper):
+    barrier = threading.Barrier(2, timeout=5)
+
+    def listings(*args, **kwargs):
+        yield make_listing('1', 120)
+        # Both scrapes are now writing their raw payload
+        barrier.wait()
+        yield make_listing('2', 80)
+
+    scraper.iter_listings.side_effect = listings
+    results = {}
+    threads = [threading.Thread(target=lambda name: results.update({name: cache.get_dataframe(name, 'USD', 10)}),
+                                args=(name,)) for name in ('London', ' london')]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(10)
+
+    assert [len(results[name]) for name in ('London', ' london')] == [2, 2]
+    pd.testing.assert_frame_equal(cache.get('London', 'USD', 10), results['London'])
+    assert len(cache.load_raw('London', 'USD', 10)) == 2
+    assert [name for name in os.listdir(cache.cache_dir) if name.endswith('.tmp')] == []
+
+
+def test_failed_frame_write_keeps_the_previous_entry(cache, scraper):
+    df = cache.get_dataframe('London', 'USD', 10)
+    with patch.object(pd.DataFrame, 'to_parquet', side_effect=OSError('disk full')), pytest.raises(OSError):
+        cache.get_dataframe('London', 'USD', 10, force_refresh=True)
+
+    pd.testing.assert_frame_equal(cache.get('London', 'USD', 10), df)
+    assert [name for name in os.listdir(cache.cache_dir) if name.endswith('.tmp')] == []
+
+
+def test_empty_results_are_not_cached(cache, scraper):
+    scraper.iter_listings.side_effect = lambda *args, **kwargs: iter([])
+
+    assert cache.get_dataframe('Nowhere', 'USD', 10).empty
+    assert os.listdir(cache.cache_dir) == []
+
+
+def test_progress_callback_streams_partial_frames(cache, scraper):
+    scraper.iter_listings.side_effect = lambda *args, **kwargs: iter(
+        [make_listing(str(i), 50 + i) for i in range(250)]
+    )
+    progress = []
+    df = cache.get_dataframe('London', 'USD', 250, on_progress=lambda frame, read: progress.append((len(frame), read)))
+
+    assert scraper.iter_listings.call_args.kwargs['stream'] is True
+    assert progress == [(100, 100), (200, 200), (250, 250), (250, 250)]
+    assert len(df) == 250
+    # The streamed result is cached like any other
+    pd.testing.assert_frame_equal(cache.get('London', 'USD', 250), df)
+
+
+def test_amenities_are_encoded_with_the_entry(cache, scraper):
+    with_amenities = [
+        dict(make_listing('1', 120), amenities=[{'title': 'Basic', 'values': [{'title': 'Wifi', 'available': True}]}]),
+        make_listing('2', 80)
+    ]
+    scraper.iter_listings.side_effect = lambda *args, **kwargs: iter(with_amenities)
+    cache.get_dataframe('London', 'USD', 10)
+
+    matrix = cache.get_amenities('London', 'USD', 10)
+    assert list(matrix.ids) == ['1', '2']
+    assert matrix.amenities_of(0) == ['Wifi']
+    assert cache.get_amenities('Paris', 'USD', 10) is None
+
+    # Entries without a stored matrix get one built from the raw payload
+    os.remove(cache._paths(cache.make_key('London', 'USD', 10))['amenities'])
+    assert cache.get_amenities('London', 'USD', 10).amenities_of(0) == ['Wifi']
+    assert scraper.iter_listings.call_count == 1
+
+
+def test_amenities_of_evicted_entry_are_not_built(cache):
+    cache.get_dataframe('London', 'USD', 10)
+    key = cache.make_key('London', 'USD', 10)
+    os.remove(cache._paths(key)['amenities'])
+    os.remove(cache._paths(key)['raw'])
+
+    assert cache.get_amenities('London', 'USD', 10) is None
+    assert not os.path.exists(cache._paths(key)['amenities'])
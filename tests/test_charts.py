@@ -0,0 +1,50 @@
+import numpy as np
+import plotly.graph_objects as go
+import pytest
+from src.charts import bin_edges, histogram_counts, histogram_trace, shared_edges
+
+
+def test_fixed_edges_are_round_and_cover_the_values():
+    values = np.array([23.0, 57.0, 140.0, 799.0, np.nan])
+    edges = bin_edges(values, bins=30)
+
+    step = np.diff(edges)
+    np.testing.assert_allclose(step, 50.0)
+    assert edges[0] <= 23 and edges[-1] >= 799
+    assert len(edges) - 1 <= 30
+    np.testing.assert_array_equal(bin_edges(np.array([4.5, 4.5]), bins=20), [4.0, 5.0])
+    assert len(bin_edges(np.array([np.nan]))) == 0
+
+
+def test_quantile_edges_balance_the_bins():
+    values = np.random.default_rng(0).lognormal(4.8, 0.6, 10000)
+    counts = histogram_counts(values, bin_edges(values, bins=10, method="quantile"))
+
+    assert counts.sum() == len(values)
+    assert counts.min() >= 900 and counts.max() <= 1100
+    with pytest.raises(ValueError):
+        bin_edges(values, method="kmeans")
+
+
+def test_counts_match_numpy_histogram():
+    values = np.random.default_rng(1).uniform(0, 5, 5000)
+    values[::10] = np.nan
+    edges = shared_edges([values, values[:100]], bins=20)
+
+    counts = histogram_counts(values, edges)
+    np.testing.assert_array_equal(counts, np.histogram(values[~np.isnan(values)], bins=edges)[0])
+    assert counts.sum() == 4500
+
+
+def test_trace_size_does_not_grow_with_listings():
+    rng = np.random.default_rng(2)
+    sizes = []
+    for n in (300, 300_000):
+        values = rng.lognormal(4.8, 0.6, n)
+        edges = bin_edges(np.array([0.0, 2000.0]), bins=30)
+        trace = histogram_trace(values, edges, "Properties", "#FF385C", "Price", prefix="$")
+        assert isinstance(trace, go.Bar)
+        assert sum(trace.y) == np.count_nonzero(values <= 2000)
+        sizes.append(len(go.Figure(trace).to_json()))
+
+    assert abs(sizes[1] - sizes[0]) < 200
@@ -0,0 +1,151 @@
+import json
+import os
+import subprocess
+import sys
+from unittest.mock import patch
+import pandas as pd
+import pytest
+from benchmarks.payloads import generate_listings
+from src import cli
+from src.scraper import AirbnbScraper
+
+
+@pytest.fixture
+def scraper():
+    scraper = AirbnbScraper(api_token="test")
+
+    def fake_iter_listings(location, currency="USD", max_results=None):
+        if location == "Atlantis":
+            raise RuntimeError("Actor run failed")
+        if location == "Nowhere":
+            return iter([])
+        return iter(generate_listings(max_results or 50, seed=len(location), amenities=False))
+
+    scraper.iter_listings = fake_iter_listings
+    return scraper
+
+
+def test_read_locations(tmp_path):
+    path = tmp_path / "markets.txt"
+    path.write_text("London\n\n# comment\nNew York  # city\n")
+
+    assert cli.read_locations(str(path)) == ["London", "New York"]
+
+
+def test_market_slug():
+    assert cli.market_slug("New York, NY") == "new-york-ny"
+    assert cli.market_slug("São Paulo") == "s-o-paulo"
+    assert cli.market_slug("!!!") == "market"
+
+
+def test_sweep_writes_files_and_summary(tmp_path, scraper):
+    records = cli.sweep(["London", "Atlantis", "Nowhere", "London"], str(tmp_path),
+                        max_results=40, workers=2, scraper=scraper)
+
+    assert [(r["location"], r["status"]) for r in records] == [
+        ("London", "ok"), ("Atlantis", "error"), ("Nowhere", "empty")
+    ]
+    assert records[1]["error"] == "Actor run failed"
+
+    df = pd.read_parquet(tmp_path / "london.parquet")
+    assert len(df) == records[0]["rows"] > 0
+    assert not (tmp_path / "atlantis.parquet").exists()
+
+    with open(tmp_path / "summary.json") as fh:
+        summary = json.load(fh)
+    assert [m["location"] for m in summary["markets"]] == ["London", "Atlantis", "Nowhere"]
+    assert summary["markets"][0]["metrics"]["total_listings"] == len(df)
+
+
+def test_summary_is_strict_json_with_non_finite_metrics(tmp_path, scraper):
+    metrics = {"avg_price": float("nan"), "avg_rating": float("inf"), "price_range": {"min": float("nan")}}
+    with patch.object(cli, "calculate_market_metrics", return_value=metrics):
+        cli.sweep(["London"], str(tmp_path), max_results=10, scraper=scraper)
+
+    def reject(constant):
+        raise ValueError(f"{constant} is not valid JSON")
+
+    with open(tmp_path / "summary.json") as fh:
+        summary = json.load(fh, parse_constant=reject)
+    assert summary["markets"][0]["metrics"] == {"avg_price": None, "avg_rating": None, "price_range": {"min": None}}
+
+
+def test_sweep_converts_in_worker_processes(tmp_path, scraper):
+    serial = cli.sweep(["London"], str(tmp_path / "serial"), max_results=400, scraper=scraper)
+    parallel = cli.sweep(["London"], str(tmp_path / "parallel"), max_results=400, scraper=scraper,
+                         convert_workers=2)
+
+    assert parallel[0]["rows"] == serial[0]["rows"] > 0
+    assert parallel[0]["rejected"] == serial[0]["rejected"] == 400 - serial[0]["rows"]
+    pd.testing.assert_frame_equal(pd.read_parquet(parallel[0]["file"]), pd.read_parquet(serial[0]["file"]))
+
+
+def test_sweep_out_of_core_matches_in_memory(tmp_path, scraper):
+    in_memory = cli.sweep(["London", "Nowhere"], str(tmp_path / "memory"), max_results=300, min_reviews=5,
+                          scraper=scraper)
+    streamed = cli.sweep(["London", "Nowhere"], str(tmp_path / "streamed"), max_results=300, min_reviews=5,
+                         scraper=scraper, out_of_core=True)
+
+    assert [r["status"] for r in streamed] == ["ok", "empty"]
+    assert streamed[0]["rows"] == in_memory[0]["rows"]
+    assert streamed[0]["rejected"] == in_memory[0]["rejected"]
+    metrics, expected = streamed[0]["metrics"], in_memory[0]["metrics"]
+    assert metrics["price_range"] == expected["price_range"]
+    assert metrics["most_common_type"] == expected["most_common_type"]
+    for key in ("total_listings", "avg_price", "median_price", "avg_rating", "superhost_ratio", "avg_reviews"):
+        assert metrics[key] == pytest.approx(expected[key]), key
+    assert not (tmp_path / "streamed" / "nowhere.parquet").exists()
+
+
+def test_main_exit_codes(tmp_path, scraper, capsys):
+    with patch.object(cli, "AirbnbScraper", return_value=scraper):
+        assert cli.main(["sweep", "--location", "London", "--out", str(tmp_path)]) == 0
+        assert cli.main(["sweep", "--location", "London", "--location", "Atlantis",
+                         "--out", str(tmp_path)]) == 1
+
+    output = capsys.readouterr().out
+    assert "ERROR  Atlantis: Actor run failed" in output
+    assert "1/2 markets succeeded" in output
+
+    with pytest.raises(SystemExit) as exc:
+        cli.main(["sweep", "--out", str(tmp_path)])
+    assert exc.value.code == 2
+
+
+def test_cli_does_not_import_ui_libraries():
+    code = "import sys, src.cli; print(sorted(m for m in ('streamlit', 'plotly', 'folium') if m in sys.modules))"
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    output = subprocess.run([sys.executable, "-c", code], cwd=root, capture_output=True, text=True, check=True)
+
+    assert output.stdout.strip() == "[]"
+
+
+def test_sweep_records_snapshots_and_trend(tmp_path, scraper, capsys):
+    db = str(tmp_path / "snapshots.sqlite")
+    with patch.object(cli, "AirbnbScraper", return_value=scraper):
+        for _ in range(2):
+            assert cli.main(["sweep", "--location", "London", "--out", str(tmp_path / "out"),
+                             "--snapshot-db", db]) == 0
+    capsys.readouterr()
+
+    assert cli.main(["trend", "--location", "London", "--snapshot-db", db]) == 0
+    lines = capsys.readouterr().out.strip().splitlines()
+    assert lines[0] == "scraped_at,listings,changed,avg_price,median_price,avg_rating"
+    assert len(lines) == 3
+    assert lines[2].split(",")[2] == "0"
+
+    assert cli.main(["trend", "--location", "Paris", "--snapshot-db", db]) == 1
+    assert cli.main(["trend", "--location", "London", "--snapshot-db", str(tmp_path / "none.sqlite")]) == 2
+
+
+def test_sweep_reports_stage_timings(tmp_path, scraper):
+    metrics_file = tmp_path / "airbnb.prom"
+    with patch.object(cli, "AirbnbScraper", return_value=scraper):
+        assert cli.main(["sweep", "--location", "London", "--out", str(tmp_path / "out"),
+                         "--metrics-file", str(metrics_file)]) == 0
+
+    with open(tmp_path / "out" / "summary.json") as fh:
+        stages = {stage["stage"]: stage for stage in json.load(fh)["markets"][0]["stages"]}
+    assert stages["write_parquet"]["bytes"] == os.path.getsize(tmp_path / "out" / "london.parquet")
+    assert stages["convert"]["rows"] == stages["combine"]["rows"]
+    assert 'airbnb_stage_calls_total{stage="write_parquet"}' in metrics_file.read_text()
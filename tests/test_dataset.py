@@ -0,0 +1,102 @@
+import numpy as np
+import pandas as pd
+import pytest
+from unittest.mock import patch
+from benchmarks.payloads import generate_listings
+from src import dataset
+from src.dataset import ListingDataset, write_listings
+from src.metrics import compute_aggregates
+from src.scraper import AirbnbScraper
+from src.utils import calculate_market_metrics, filter_listings
+
+
+@pytest.fixture
+def scraper():
+    return AirbnbScraper(api_token="test")
+
+
+def in_price_order(df):
+    return df.sort_values(['Price per Night', 'ID'], ignore_index=True)
+
+
+def test_write_streams_batches_into_row_groups(tmp_path, scraper):
+    listings = generate_listings(5000, amenities=False)
+    stats = {}
+    ds = write_listings(scraper, iter(listings), str(tmp_path / "london.parquet"), batch_size=1200, stats=stats)
+    expected = scraper.convert_to_dataframe(listings)
+
+    assert ds._file.num_row_groups == 5
+    assert stats == {'read': 5000, 'converted': len(expected), 'rejected': 5000 - len(expected),
+                     'written': len(expected)}
+    pd.testing.assert_frame_equal(in_price_order(ds.to_dataframe()), in_price_order(expected))
+    assert sum(len(frame) for frame in ds.iter_frames(['ID'], batch_size=700)) == len(ds)
+    assert not (tmp_path / "london.parquet.tmp").exists()
+
+
+def test_write_failure_leaves_no_file(tmp_path, scraper):
+    def broken_stream():
+        yield from generate_listings(10, amenities=False)
+        raise RuntimeError("Actor run failed")
+
+    with pytest.raises(RuntimeError):
+        write_listings(scraper, broken_stream(), str(tmp_path / "x.parquet"), batch_size=4)
+    assert list(tmp_path.iterdir()) == []
+
+
+@pytest.mark.parametrize("exact_limit", [dataset.SELECT_EXACT_LIMIT, 50])
+def test_aggregates_match_in_memory(tmp_path, scraper, exact_limit):
+    listings = generate_listings(4000, amenities=False)
+    ds = write_listings(scraper, listings, str(tmp_path / "m.parquet"), batch_size=900)
+    expected = compute_aggregates(scraper.convert_to_dataframe(listings))
+
+    # A small exact limit makes the median go through the histogram passes
+    with patch("src.dataset.SELECT_EXACT_LIMIT", exact_limit):
+        stats = ds.aggregates(batch_size=500)
+
+    for key, value in expected.items():
+        if isinstance(value, float):
+            assert stats[key] == pytest.approx(value, rel=1e-9), key
+        else:
+            assert stats[key] == value, key
+    assert calculate_market_metrics(ds)["median_price"] == expected["median_price"]
+
+
+def test_filter_matches_filter_listings(tmp_path, scraper):
+    listings = generate_listings(4000, amenities=False)
+    ds = write_listings(scraper, listings, str(tmp_path / "f.parquet"), batch_size=1000)
+    df = scraper.convert_to_dataframe(listings)
+    args = ((80, 200), 4.5, ['Entire home/apt', 'Private room'], True, 2)
+
+    expected = in_price_order(filter_listings(df, *args))
+    pd.testing.assert_frame_equal(in_price_order(filter_listings(ds, *args)), expected, check_categorical=False)
+
+    written = ds.filter(*args, path=str(tmp_path / "subset.parquet"))
+    assert isinstance(written, ListingDataset)
+    pd.testing.assert_frame_equal(in_price_order(written.to_dataframe()), expected, check_categorical=False)
+
+    # Row groups whose statistics exclude every match are not read
+    assert ds._row_groups((1e6, 2e6), 0.0, 1) == []
+    assert filter_listings(ds, (1e6, 2e6), 0.0, ['Private room']).empty
+
+
+def test_filter_failure_leaves_no_file(tmp_path, scraper):
+    ds = write_listings(scraper, generate_listings(2000, amenities=False), str(tmp_path / "f.parquet"),
+                        batch_size=500)
+    batches = ds.iter_batches
+
+    def broken_batches(*args, **kwargs):
+        yield next(batches(*args, **kwargs))
+        raise OSError("disk full")
+
+    with patch.object(ds, "iter_batches", broken_batches), pytest.raises(OSError):
+        ds.filter((0, 1e6), 0.0, ['Entire home/apt', 'Private room'], path=str(tmp_path / "subset.parquet"))
+    assert [p.name for p in tmp_path.iterdir()] == ["f.parquet"]
+
+
+def test_empty_dataset(tmp_path, scraper):
+    ds = write_listings(scraper, [], str(tmp_path / "empty.parquet"))
+
+    assert len(ds) == 0
+    assert ds.aggregates()["count"] == 0
+    assert np.isnan(ds.aggregates()["median_price"])
+    assert ds.filter((0, 100), 0.0, ['Private room']).empty
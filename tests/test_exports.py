@@ -0,0 +1,106 @@
+import io
+import json
+import pandas as pd
+import pytest
+from openpyxl import load_workbook
+from src.exports import EXPORT_FORMATS, ExportCache, frame_fingerprint
+from src.scraper import apply_listing_schema
+from src.telemetry import trace
+
+
+def make_frame(n=3):
+    return apply_listing_schema(pd.DataFrame({
+        'ID': [str(i) for i in range(n)],
+        'Title': [f'Flat {i}' for i in range(n)],
+        'Description': ['' for _ in range(n)],
+        'URL': [f'https://airbnb.com/rooms/{i}' for i in range(n)],
+        'Thumbnail': ['' for _ in range(n)],
+        'Room Type': ['Entire home/apt'] * n,
+        'Price per Night': [100.0 + i for i in range(n)],
+        'Capacity': [2] * n,
+        'Reviews Count': [10] * n,
+        'Overall Rating': [4.5] * n,
+        'Accuracy Rating': [4.5] * n,
+        'Cleanliness Rating': [4.5] * n,
+        'Check-in Rating': [4.5] * n,
+        'Communication Rating': [4.5] * n,
+        'Location Rating': [4.5] * n,
+        'Value Rating': [4.5] * n,
+        'Superhost': [True, False, True][:n],
+        'Latitude': [51.5] * n,
+        'Longitude': [-0.12] * n
+    }))
+
+
+def test_frame_fingerprint_tracks_content():
+    df = make_frame()
+
+    assert frame_fingerprint(df) == frame_fingerprint(df.copy())
+    assert frame_fingerprint(df) != frame_fingerprint(df.iloc[:2])
+    changed = df.copy()
+    changed.loc[0, 'Price per Night'] = 1.0
+    assert frame_fingerprint(df) != frame_fingerprint(changed)
+
+
+@pytest.mark.parametrize("fmt", list(EXPORT_FORMATS))
+def test_exports_round_trip(fmt):
+    df = make_frame()
+    data = ExportCache().build(df, fmt)
+
+    if fmt == "csv":
+        loaded = pd.read_csv(io.BytesIO(data))
+    elif fmt == "json":
+        loaded = pd.DataFrame(json.loads(data))
+    elif fmt == "parquet":
+        loaded = pd.read_parquet(io.BytesIO(data))
+    else:
+        rows = list(load_workbook(io.BytesIO(data), read_only=True).active.values)
+        loaded = pd.DataFrame(rows[1:], columns=rows[0])
+
+    assert list(loaded.columns) == list(df.columns)
+    assert loaded['Title'].tolist() == df['Title'].tolist()
+    assert loaded['Price per Night'].tolist() == df['Price per Night'].tolist()
+    assert loaded['Superhost'].tolist() == df['Superhost'].tolist()
+
+
+def test_export_cache_serializes_once(monkeypatch):
+    calls = []
+    label, extension, mime, writer = EXPORT_FORMATS["csv"]
+
+    def counting_writer(df):
+        calls.append(len(df))
+        return writer(df)
+
+    monkeypatch.setitem(EXPORT_FORMATS, "csv", (label, extension, mime, counting_writer))
+    cache = ExportCache()
+    df = make_frame()
+
+    with trace("exports") as exports:
+        first = cache.build(df, "csv")
+        second = cache.build(df.copy(), "csv")
+        cache.build(df.iloc[:2], "csv")
+
+    assert first == second
+    assert calls == [3, 2]
+    assert [(s.rows, s.bytes) for s in exports.spans] == [(3, len(first)), (2, len(cache.build(df.iloc[:2], "csv")))]
+    assert cache.get(frame_fingerprint(df), "json") is None
+
+
+def test_export_cache_evicts_least_recently_used():
+    cache = ExportCache(max_entries=2)
+    frames = [make_frame(n) for n in (1, 2, 3)]
+    keys = [frame_fingerprint(df) for df in frames]
+
+    cache.build(frames[0], "csv")
+    cache.build(frames[1], "csv")
+    cache.get(keys[0], "csv")
+    cache.build(frames[2], "csv")
+
+    assert cache.get(keys[0], "csv") is not None
+    assert cache.get(keys[1], "csv") is None
+    assert cache.get(keys[2], "csv") is not None
+
+
+def test_export_cache_rejects_unknown_format():
+    with pytest.raises(ValueError):
+        ExportCache().build(make_frame(), "xml")
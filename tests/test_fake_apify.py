@@ -0,0 +1,149 @@
+import gzip
+import json
+import time
+import pandas as pd
+import pytest
+from unittest.mock import patch
+from benchmarks.fake_apify import FakeApifyClient, FakeApifyError, load_dataset
+from benchmarks.load_test import run_load_test
+from benchmarks.payloads import generate_listings
+from src.scraper import AirbnbScraper
+
+
+def test_scraper_reads_synthetic_dataset():
+    client = FakeApifyClient()
+    scraper = AirbnbScraper(client=client)
+
+    first = scraper.scrape_listings("London", max_results=250)
+    again = scraper.scrape_listings("london ", max_results=250)
+
+    assert len(first) == 250
+    assert first == again
+    assert scraper.scrape_listings("Paris", max_results=10) != first[:10]
+    # 100-item pages
+    assert client.stats["pages"] == 3 + 3 + 1
+    assert client.stats["items"] == 510
+
+
+def test_recorded_datasets_are_replayed(tmp_path):
+    recorded = generate_listings(40, seed=7)
+    path = tmp_path / "london.jsonl.gz"
+    with gzip.open(path, "wt", encoding="utf-8") as fh:
+        for listing in recorded:
+            fh.write(json.dumps(listing) + "\n")
+    json_path = tmp_path / "london.json"
+    json_path.write_text(json.dumps(recorded))
+
+    assert load_dataset(str(path)) == recorded
+    assert load_dataset(str(json_path)) == recorded
+
+    scraper = AirbnbScraper(client=FakeApifyClient(datasets={"London": load_dataset(str(path))}))
+    assert scraper.scrape_listings("London", max_results=300) == recorded
+    assert scraper.scrape_listings("London", max_results=15) == recorded[:15]
+
+
+def test_run_duration_and_wait_secs():
+    client = FakeApifyClient(run_seconds=0.3)
+
+    start = time.monotonic()
+    run = client.actor("any").start(run_input={"locationQueries": ["London"], "maxListings": 5})
+    assert run["status"] == "RUNNING"
+    assert client.run(run["id"]).wait_for_finish(wait_secs=0.05)["status"] == "RUNNING"
+    assert client.run(run["id"]).wait_for_finish()["status"] == "SUCCEEDED"
+    assert time.monotonic() - start >= 0.3
+    assert client.run(run["id"]).get()["status"] == "SUCCEEDED"
+
+
+def test_items_stream_while_running_and_after_ready_delay():
+    streaming = FakeApifyClient(run_seconds=0.4, stream_items=True)
+    run = streaming.actor("any").start(run_input={"locationQueries": ["London"], "maxListings": 100})
+    dataset = streaming.dataset(run["defaultDatasetId"])
+    time.sleep(0.2)
+    partial = len(dataset.list_items(offset=0, limit=100).items)
+    assert 0 < partial < 100
+
+    delayed = FakeApifyClient(ready_delay=0.2)
+    run = delayed.actor("any").call(run_input={"locationQueries": ["London"], "maxListings": 100})
+    dataset = delayed.dataset(run["defaultDatasetId"])
+    assert dataset.list_items(offset=0, limit=100).items == []
+    time.sleep(0.2)
+    assert len(dataset.list_items(offset=0, limit=100).items) == 100
+
+
+def test_failures():
+    client = FakeApifyClient(fail_locations=["Atlantis"])
+    scraper = AirbnbScraper(client=client)
+    with pytest.raises(FakeApifyError):
+        scraper.scrape_listings("Atlantis")
+
+    failed = FakeApifyClient(fail_locations=["Atlantis"], failure_mode="failed")
+    run = failed.actor("any").call(run_input={"locationQueries": ["Atlantis"]})
+    assert run["status"] == "FAILED"
+    assert failed.dataset(run["defaultDatasetId"]).list_items(offset=0, limit=10).items == []
+
+    random_failures = FakeApifyClient(failure_rate=0.5, seed=1)
+    results = AirbnbScraper(client=random_failures).scrape_many([f"City {i}" for i in range(20)], concurrency=4)
+    errors = sum(result["error"] is not None for result in results.values())
+    assert errors == random_failures.stats["failed_runs"]
+    assert 0 < errors < 20
+
+    with pytest.raises(ValueError):
+        FakeApifyClient(failure_mode="sometimes")
+
+
+def test_concurrency_is_observable():
+    client = FakeApifyClient(run_seconds=0.2)
+    AirbnbScraper(client=client).scrape_many([f"City {i}" for i in range(6)], max_results=5, concurrency=3)
+
+    assert client.stats["runs"] == 6
+    assert client.stats["peak_concurrent_runs"] == 3
+
+
+def test_run_load_test_summary():
+    summary = run_load_test(FakeApifyClient(run_seconds=0.05, fail_locations=["Market 1"]),
+                            markets=4, listings=50, concurrency=2)
+
+    assert summary["failed"] == 1
+    assert summary["backend"]["runs"] == 4
+    assert [r["listings"] for r in summary["records"]] == [50, 0, 50, 50]
+    assert summary["latency"]["p50"] >= 0.05
+    assert summary["time_to_first_item"]["max"] <= summary["latency"]["max"]
+
+
+def test_scraper_waits_on_run_status():
+    client = FakeApifyClient(run_seconds=0.2, ready_delay=0.4, fail_locations=["Atlantis"], failure_mode="failed")
+    scraper = AirbnbScraper(client=client)
+
+    metrics = {}
+    listings = scraper.scrape_listings("London", max_results=20, metrics=metrics)
+    assert len(listings) == 20
+    assert 0.2 <= metrics["time_to_complete"] < 0.4 <= metrics["time_to_first_item"]
+
+    start = time.monotonic()
+    with pytest.raises(RuntimeError, match="FAILED"):
+        scraper.scrape_listings("Atlantis")
+    assert time.monotonic() - start < 1
+
+    slow = AirbnbScraper(client=FakeApifyClient(run_seconds=5))
+    with pytest.raises(TimeoutError):
+        slow.scrape_listings("London", timeout=1)
+
+
+def test_streaming_yields_items_before_the_run_finishes():
+    client = FakeApifyClient(run_seconds=2.0, stream_items=True)
+    scraper = AirbnbScraper(client=client)
+
+    metrics = {}
+    # Status requests wait at least a second, so streaming reads the dataset about once per second
+    with patch("src.scraper.STREAM_POLL_SECONDS", 1.0):
+        streamed = list(scraper.iter_listings("London", max_results=200, metrics=metrics, stream=True))
+    assert metrics["time_to_first_item"] < 1.5 < metrics["time_to_complete"]
+    assert metrics["items"] == 200
+    assert streamed == AirbnbScraper(client=FakeApifyClient()).scrape_listings("London", max_results=200)
+
+    frames = list(scraper.iter_dataframes(iter(streamed), batch_size=50))
+    # Partial frames after every batch, then the final frame once
+    assert [read for _, read in frames] == [50, 100, 150, 200, 200]
+    assert [len(df) for df, _ in frames[:-1]] == sorted(len(df) for df, _ in frames[:-1])
+    pd.testing.assert_frame_equal(frames[-1][0], scraper.convert_to_dataframe(streamed))
+    assert list(AirbnbScraper(client=client).iter_dataframes([]))[0][1] == 0
@@ -0,0 +1,95 @@
+import numpy as np
+import pandas as pd
+import pytest
+from src.filters import FilterIndex
+from src.spatial import haversine_km
+from src.utils import filter_listings
+
+ROOM_TYPES = ['Entire home/apt', 'Private room', 'Shared room', 'Hotel room']
+
+
+def make_listings(n, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'Price per Night': rng.uniform(20, 800, n).round(0),
+        'Overall Rating': rng.choice(np.arange(0, 5.01, 0.1), n).astype('float32'),
+        'Room Type': pd.Categorical(rng.choice(ROOM_TYPES, n)),
+        'Capacity': rng.integers(1, 12, n).astype('int16'),
+        'Superhost': rng.random(n) < 0.3
+    })
+
+
+def expected_positions(df, *args):
+    return np.flatnonzero(df.index.isin(filter_listings(df, *args).index))
+
+
+def test_query_matches_filter_listings():
+    df = make_listings(2000)
+    index = FilterIndex(df)
+    rng = np.random.default_rng(1)
+
+    for _ in range(200):
+        args = (
+            tuple(sorted(rng.uniform(0, 900, 2).round(0))),
+            round(float(rng.uniform(0, 5)), 1),
+            list(rng.choice(ROOM_TYPES, rng.integers(0, 5), replace=False)),
+            bool(rng.random() < 0.3),
+            int(rng.integers(1, 12))
+        )
+        np.testing.assert_array_equal(index.query(*args), expected_positions(df, *args))
+
+
+def test_incremental_slider_moves():
+    df = make_listings(500)
+    index = FilterIndex(df)
+
+    # Widen, narrow, jump past and back over the previous range
+    for low, high in [(100, 700), (50, 750), (300, 400), (500, 600), (0, 800), (450, 450), (900, 1000)]:
+        args = ((low, high), 3.5, ROOM_TYPES, False, 2)
+        np.testing.assert_array_equal(index.query(*args), expected_positions(df, *args))
+
+
+def test_query_excludes_missing_ratings():
+    df = make_listings(50)
+    df.loc[::5, 'Overall Rating'] = np.nan
+    index = FilterIndex(df)
+
+    positions = index.query((0, 1000), 0.0, ROOM_TYPES)
+
+    assert len(positions) == 40
+    assert not df['Overall Rating'].iloc[positions].isna().any()
+
+
+def test_filtered_fingerprint_and_summary():
+    df = make_listings(100)
+    index = FilterIndex(df, "abc")
+    positions = index.query((100, 400), 4.0, ['Private room'])
+    subset = df.iloc[positions]
+
+    assert index.filtered_fingerprint(positions) == FilterIndex(df, "abc").filtered_fingerprint(positions.copy())
+    assert index.filtered_fingerprint(positions) != index.filtered_fingerprint(positions[:-1])
+
+    stats = index.summarize(positions)
+    assert stats["count"] == len(subset)
+    assert stats["avg_price"] == pytest.approx(subset['Price per Night'].mean())
+    assert stats["avg_rating"] == pytest.approx(subset['Overall Rating'].mean())
+    assert stats["avg_capacity"] == pytest.approx(subset['Capacity'].mean())
+    assert index.summarize(positions[:0])["count"] == 0
+
+
+def test_query_near_a_point():
+    df = make_listings(3000)
+    rng = np.random.default_rng(2)
+    df['Latitude'] = 40.7 + rng.normal(0, 0.03, len(df))
+    df['Longitude'] = -74.0 + rng.normal(0, 0.03, len(df))
+    index = FilterIndex(df)
+
+    near = (40.7, -74.0, 1.5)
+    args = ((0, 1000), 2.0, ROOM_TYPES)
+    distances = haversine_km(40.7, -74.0, df['Latitude'], df['Longitude'])
+    expected = np.intersect1d(expected_positions(df, *args, False, 1), np.flatnonzero(distances <= 1.5))
+
+    np.testing.assert_array_equal(index.query(*args, near=near), expected)
+    # Without coordinates the circle is ignored
+    plain = FilterIndex(df.drop(columns=['Latitude', 'Longitude']))
+    np.testing.assert_array_equal(plain.query(*args, near=near), expected_positions(df, *args, False, 1))
@@ -0,0 +1,115 @@
+import threading
+import time
+import pytest
+from benchmarks.fake_apify import FakeApifyClient
+from benchmarks.load_test import run_load_test
+from src.governor import PRIORITY_BATCH, PRIORITY_INTERACTIVE, RunGovernor
+from src.scraper import AirbnbScraper
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_token_bucket_limits_run_starts():
+    clock = FakeClock()
+    governor = RunGovernor(max_concurrent=None, starts_per_minute=60, burst=2, clock=clock)
+    governor.acquire()
+    governor.acquire()
+
+    with pytest.raises(TimeoutError):
+        governor.acquire(timeout=0)
+    assert governor.stats()["abandoned"] == 1
+
+    clock.now = 1.0
+    assert governor.acquire(timeout=0).waited == 0
+    assert governor.stats()["started"] == 3
+
+
+def test_concurrency_cap_and_release():
+    governor = RunGovernor(max_concurrent=1, starts_per_minute=None)
+    first = governor.acquire()
+    with pytest.raises(TimeoutError):
+        governor.acquire(timeout=0.05)
+
+    governor.release(first)
+    governor.release(first)
+    second = governor.acquire(timeout=0)
+    assert governor.stats()["running"] == 1
+    governor.release(second)
+    assert governor.stats()["running"] == 0
+
+
+def test_queue_order_position_and_estimated_wait():
+    governor = RunGovernor(max_concurrent=1, starts_per_minute=None)
+    running = governor.acquire()
+    order, reports = [], {}
+
+    def search(name, priority, delay):
+        time.sleep(delay)
+        ticket = governor.acquire(priority, on_wait=lambda ahead, wait: reports.setdefault(name, (ahead, wait)))
+        order.append(name)
+        governor.release(ticket)
+
+    threads = [threading.Thread(target=search, args=args) for args in (
+        ("batch", PRIORITY_BATCH, 0.0), ("first", PRIORITY_INTERACTIVE, 0.05), ("second", PRIORITY_INTERACTIVE, 0.1)
+    )]
+    for thread in threads:
+        thread.start()
+    time.sleep(0.3)
+    assert governor.stats()["queued"] == 3
+    governor.release(running)
+    for thread in threads:
+        thread.join(5)
+
+    assert order == ["first", "second", "batch"]
+    assert reports["batch"][0] == 0
+    assert reports["second"][0] == 1
+    # One run holds the only slot, so the second in line waits for two average runs
+    assert reports["second"][1] == pytest.approx(2 * 60.0)
+    assert governor.stats()["peak_running"] == 1
+
+
+def test_governor_prevents_refused_and_duplicate_runs():
+    client = FakeApifyClient(run_seconds=0.2, max_concurrent_runs=3)
+    summary = run_load_test(client, markets=9, listings=20, concurrency=9,
+                            governor=RunGovernor(max_concurrent=3, starts_per_minute=None))
+
+    assert summary["failed"] == 0
+    assert client.stats["runs"] == 9
+    assert client.stats["refused_starts"] == 0
+    assert summary["governor"]["peak_running"] == 3
+    assert summary["governor"]["peak_queued"] > 1
+
+
+def test_refused_starts_are_retried_without_duplicates():
+    client = FakeApifyClient(run_seconds=0.2, max_concurrent_runs=2)
+    results = AirbnbScraper(client=client, governor=RunGovernor(None, None)).scrape_many(
+        [f"City {i}" for i in range(5)], max_results=10, concurrency=5
+    )
+
+    assert all(result["error"] is None for result in results.values())
+    assert client.stats["runs"] == 5
+    assert client.stats["refused_starts"] > 0
+    assert client.stats["peak_concurrent_runs"] == 2
+
+
+def test_abandoned_stream_aborts_its_run_before_releasing_the_slot():
+    client = FakeApifyClient(run_seconds=30, stream_items=True, max_concurrent_runs=1)
+    governor = RunGovernor(max_concurrent=1, starts_per_minute=None)
+    scraper = AirbnbScraper(client=client, governor=governor)
+
+    for location in ("London", "Paris"):
+        listings = scraper.iter_listings(location, max_results=100, page_size=1, stream=True)
+        next(listings)
+        listings.close()
+        assert governor.stats()["running"] == 0
+
+    # The account's only run slot was free again for the second search
+    assert client.stats["runs"] == 2
+    assert client.stats["aborted_runs"] == 2
+    assert client.stats["refused_starts"] == 0
@@ -0,0 +1,83 @@
+import threading
+import pytest
+from benchmarks.fake_apify import FakeApifyClient
+from src.cache import ScrapeCache
+from src.governor import RunGovernor
+from src.jobs import SearchRunner
+from src.scraper import AirbnbScraper
+
+
+@pytest.fixture
+def backend():
+    return FakeApifyClient(run_seconds=0.3, stream_items=True, fail_locations=["Atlantis"],
+                           failure_mode="failed")
+
+
+@pytest.fixture
+def runner(backend, tmp_path):
+    scraper = AirbnbScraper(client=backend, governor=RunGovernor(None, None))
+    runner = SearchRunner(ScrapeCache(scraper, cache_dir=str(tmp_path)), workers=2)
+    yield runner
+    runner.shutdown()
+
+
+def test_identical_searches_share_one_run(runner, backend):
+    first = runner.submit("London", "USD", 50)
+    second = runner.submit(" london", "USD", 50)
+    other = runner.submit("London", "EUR", 50)
+
+    assert second is first and other is not first
+    assert first.subscribers == 2
+    assert runner.stats() == {"in_flight": 2, "subscribers": 3}
+
+    results = {}
+    threads = [threading.Thread(target=lambda name, job: results.update({name: job.result(10)}), args=args)
+               for args in (("first", first), ("second", second))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(10)
+    other.result(10)
+
+    assert results["first"] is results["second"]
+    assert len(results["first"]) > 0
+    assert backend.stats["runs"] == 2
+    assert runner.in_flight() == 0
+    assert {span.name for span in first.trace.spans} >= {"actor_start", "convert"}
+
+
+def test_finished_search_is_served_from_cache(runner, backend):
+    df = runner.submit("Paris", "USD", 20).result(10)
+    again = runner.submit("Paris", "USD", 20)
+
+    assert again.result(10).equals(df)
+    assert backend.stats["runs"] == 1
+
+
+def test_job_reports_partial_results(runner):
+    job = runner.submit("Rome", "USD", 300)
+    job.result(10)
+
+    df, read = job.partial()
+    assert read == 300
+    assert len(df) == len(job.result())
+    assert job.queue() is None
+
+
+def test_non_progressive_search_skips_partial_results(runner):
+    job = runner.submit("Madrid", "USD", 300, progressive=False)
+
+    assert len(job.result(10)) > 0
+    assert job.partial() == (None, 0)
+    assert job.queue() is None
+
+
+def test_failed_search_reaches_every_subscriber(runner, backend):
+    first = runner.submit("Atlantis", "USD", 20)
+    second = runner.submit("Atlantis", "USD", 20)
+
+    for job in (first, second):
+        with pytest.raises(RuntimeError, match="FAILED"):
+            job.result(10)
+    assert backend.stats["runs"] == 1
+    assert runner.in_flight() == 0
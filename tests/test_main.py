@@ -0,0 +1,38 @@
+import os
+import sys
+import pytest
+from unittest.mock import patch
+from streamlit.testing.v1 import AppTest
+from benchmarks.fake_apify import FakeApifyClient
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+
+
+@pytest.fixture
+def app_modules(monkeypatch, tmp_path):
+    """Import the app's modules the way streamlit run src/main.py does, with the cache in tmp_path."""
+    monkeypatch.setenv("APIFY_API_TOKEN", "test_token")
+    monkeypatch.setenv("CACHE_DIR", str(tmp_path))
+    monkeypatch.syspath_prepend(SRC_DIR)
+    for name in ("config", "scraper", "cache", "main"):
+        monkeypatch.delitem(sys.modules, name, raising=False)
+    # AppTest leaves the script installed as __main__, which spawned worker processes would re-run
+    monkeypatch.setitem(sys.modules, "__main__", sys.modules["__main__"])
+    import scraper
+    return scraper
+
+
+def test_search_without_listings_shows_a_warning(app_modules):
+    client = FakeApifyClient(datasets={"nowhere": []})
+    # An empty dataset is otherwise re-read for DATASET_SETTLE_SECONDS
+    with patch.object(app_modules, "ApifyClient", lambda token: client), \
+            patch.object(app_modules, "DATASET_SETTLE_SECONDS", 0):
+        at = AppTest.from_file(os.path.join(SRC_DIR, "main.py"), default_timeout=60)
+        at.run()
+        at.text_input[0].input("Nowhere")
+        at.button[0].click()
+        at.run()
+
+    assert not at.exception
+    assert [warning.value for warning in at.warning] == ["No listings found for Nowhere. Try another location."]
+    assert not at.session_state.search_performed
@@ -0,0 +1,90 @@
+import numpy as np
+import pandas as pd
+from src.maps import bin_density, build_listings_map, build_marker_rows, build_popup_html, densest_point, in_viewport
+from src.spatial import SpatialIndex
+
+
+def make_listings(n, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'Title': [f'Flat <{i}>' for i in range(n)],
+        'Room Type': rng.choice(['Entire home/apt', 'Private room'], n),
+        'URL': [f'https://airbnb.com/rooms/{i}' for i in range(n)],
+        'Latitude': 51.5 + rng.normal(0, 0.02, n),
+        'Longitude': -0.12 + rng.normal(0, 0.02, n),
+        'Price per Night': rng.uniform(50, 300, n),
+        'Overall Rating': rng.uniform(4, 5, n).astype('float32'),
+        'Reviews Count': rng.integers(0, 500, n).astype('int32'),
+        'Capacity': rng.integers(1, 8, n).astype('int16'),
+        'Superhost': rng.random(n) < 0.3
+    })
+
+
+def test_build_popup_html_formats_and_escapes():
+    df = make_listings(1).assign(**{
+        'Price per Night': [123.456],
+        'Overall Rating': np.array([4.87], dtype='float32'),
+        'Reviews Count': [42],
+        'Capacity': [3]
+    })
+    popup = build_popup_html(df).iloc[0]
+
+    assert '<h4 style="color: #FF385C; margin-bottom: 10px;">Flat &lt;0&gt;</h4>' in popup
+    assert '$123.46/night' in popup
+    assert '4.9/5 (42 reviews)' in popup
+    assert '3 guests' in popup
+
+
+def test_build_marker_rows_encodes_icon_and_color():
+    df = make_listings(2)
+    df['Superhost'] = [True, False]
+    df['Room Type'] = ['Entire home/apt', 'Private room']
+    rows = build_marker_rows(df)
+
+    assert [row[4:] for row in rows] == [['red', 'home'], ['blue', 'bed']]
+    assert rows[0][3].endswith('/night - Entire home/apt')
+
+
+def test_bin_density_preserves_counts():
+    df = make_listings(1000)
+    cells = bin_density(df['Latitude'].to_numpy(), df['Longitude'].to_numpy(), bins=10)
+
+    assert cells.shape[1] == 3
+    assert len(cells) <= 100
+    assert cells[:, 2].sum() == 1000
+
+
+def test_map_switches_to_density_layer():
+    small = build_listings_map(make_listings(50), density_threshold=100).get_root().render()
+    assert 'markerClusterGroup' in small
+    assert 'heatLayer' not in small
+
+    medium, large = (
+        build_listings_map(make_listings(n), density_threshold=100, bins=20).get_root().render()
+        for n in (1000, 20000)
+    )
+    assert 'heatLayer' in medium
+    assert 'markerClusterGroup' not in medium
+    # The density payload is bounded by the grid, not the listing count
+    assert len(large) < len(medium) * 1.5
+
+
+def test_map_viewport_limits_rendered_listings():
+    df = make_listings(2000)
+    viewport = (51.49, -0.13, 51.51, -0.11)
+    inside = in_viewport(df, viewport)
+
+    assert 0 < len(inside) < len(df)
+    assert inside['Latitude'].between(51.49, 51.51).all()
+    assert inside.index.equals(in_viewport(df, viewport, SpatialIndex.from_frame(df)).index)
+
+    # The whole market is dense, but the viewport holds few enough listings for markers
+    html = build_listings_map(df, density_threshold=len(inside), viewport=viewport).get_root().render()
+    assert 'markerClusterGroup' in html
+    assert 'fitBounds' in html
+
+
+def test_densest_point_picks_the_crowded_area():
+    df = pd.concat([make_listings(900), make_listings(60, seed=1).assign(Latitude=48.85, Longitude=2.35)])
+    lat, lon = densest_point(df, bins=50)
+    assert abs(lat - 51.5) < 0.5 and abs(lon + 0.12) < 0.5
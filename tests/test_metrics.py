@@ -0,0 +1,85 @@
+import numpy as np
+import pandas as pd
+import pytest
+from src.metrics import compute_aggregates
+from src.filters import FilterIndex
+
+ROOM_TYPES = ['Entire home/apt', 'Private room', 'Shared room', 'Hotel room']
+
+
+def make_listings(n, seed=0):
+    rng = np.random.default_rng(seed)
+    rating = rng.choice(np.arange(3, 5.01, 0.1), n).astype('float32')
+    rating[rng.random(n) < 0.05] = np.nan
+    return pd.DataFrame({
+        'Price per Night': rng.uniform(20, 800, n).round(0),
+        'Overall Rating': rating,
+        'Room Type': pd.Categorical(rng.choice(ROOM_TYPES, n)),
+        'Capacity': rng.integers(1, 12, n).astype('int16'),
+        'Reviews Count': rng.integers(0, 400, n).astype('int32'),
+        'Superhost': rng.random(n) < 0.3
+    })
+
+
+def test_aggregates_match_pandas():
+    df = make_listings(5000)
+    stats = compute_aggregates(df)
+    prices = df['Price per Night']
+
+    assert stats['count'] == 5000
+    assert stats['avg_price'] == pytest.approx(prices.mean())
+    assert stats['std_price'] == pytest.approx(prices.std())
+    assert stats['median_price'] == prices.median()
+    assert (stats['min_price'], stats['max_price']) == (prices.min(), prices.max())
+    assert stats['avg_rating'] == pytest.approx(df['Overall Rating'].mean())
+    assert stats['superhost_ratio'] == pytest.approx(df['Superhost'].mean() * 100)
+    assert stats['avg_reviews'] == pytest.approx(df['Reviews Count'].mean())
+    assert stats['avg_capacity'] == pytest.approx(df['Capacity'].mean())
+    assert stats['most_common_type'] == df['Room Type'].mode().iloc[0]
+    assert 'groups' not in stats
+
+
+@pytest.mark.parametrize("group_by", [['room_type'], ['superhost'], ['room_type', 'superhost']])
+def test_groups_match_groupby(group_by):
+    df = make_listings(3000, seed=1)
+    # Leave one room type without listings; empty groups are dropped
+    df = df[df['Room Type'] != 'Hotel room']
+    columns = [{'room_type': 'Room Type', 'superhost': 'Superhost'}[key] for key in group_by]
+
+    groups = compute_aggregates(df, group_by)['groups']
+    expected = df.groupby(columns, observed=True).agg(
+        count=('Price per Night', 'size'),
+        avg_price=('Price per Night', 'mean'),
+        median_price=('Price per Night', 'median'),
+        avg_rating=('Overall Rating', 'mean'),
+        avg_capacity=('Capacity', 'mean'),
+        avg_reviews=('Reviews Count', 'mean'),
+    )
+    expected['superhost_ratio'] = df.groupby(columns, observed=True)['Superhost'].mean() * 100
+
+    assert list(groups.index) == list(expected.index)
+    for column in expected.columns:
+        np.testing.assert_allclose(groups[column], expected[column], rtol=1e-6)
+
+
+def test_empty_frame_and_unknown_group():
+    stats = compute_aggregates(make_listings(0), ['room_type'])
+    assert stats['count'] == 0
+    assert np.isnan(stats['avg_price']) and np.isnan(stats['median_price'])
+    assert stats['most_common_type'] is None
+    assert stats['groups'].empty
+
+    with pytest.raises(ValueError, match="Unknown group_by"):
+        compute_aggregates(make_listings(10), ['city'])
+
+
+def test_filter_index_summary_matches_frame_aggregates():
+    df = make_listings(2000, seed=2)
+    index = FilterIndex(df)
+    positions = index.query((100, 500), 4.0, ROOM_TYPES[:2])
+
+    summary = index.summarize(positions)
+    expected = compute_aggregates(df.take(positions))
+    assert summary.keys() == expected.keys()
+    for key, value in expected.items():
+        assert summary[key] == (pytest.approx(value) if isinstance(value, float) else value)
@@ -1,7 +1,10 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
 import pytest
 from unittest.mock import Mock, patch
 import pandas as pd
-from src.scraper import AirbnbScraper
+from benchmarks.payloads import generate_listings
+from src.scraper import AirbnbScraper, LISTING_SCHEMA, apply_listing_schema
 
 @pytest.fixture
 def sample_listing():
@@ -89,7 +92,7 @@ def test_convert_to_dataframe(mock_scraper, sample_listing):
     assert len(df) == 1
     assert df['Title'].iloc[0] == 'Test Listing'
     assert df['Price per Night'].iloc[0] == 100.0
-    assert df['Overall Rating'].iloc[0] == 4.8
+    assert df['Overall Rating'].iloc[0] == pytest.approx(4.8)
     assert df['Host Name'].iloc[0] == 'Test Host'
 
 @patch('apify_client.ApifyClient')
@@ -118,4 +121,280 @@ def test_scrape_listings(mock_client, mock_scraper, sample_listing, max_results,
     
     assert len(results) == expected_count
     assert results[0]['id'] == '12345'
-    mock_client_instance.actor.assert_called_once_with('GsNzxEKzE2vQ5d9HN')
\ No newline at end of file
+    mock_client_instance.actor.assert_called_once_with('GsNzxEKzE2vQ5d9HN')
+
+def _mock_dataset(items):
+    """Build a dataset mock whose list_items honours offset/limit."""
+    dataset = Mock()
+    dataset.list_items.side_effect = lambda offset=0, limit=None: Mock(
+        items=items[offset:offset + limit]
+    )
+    return dataset
+
+
+@pytest.mark.parametrize("max_results,page_size,expected_count,expected_calls", [
+    (None, 2, 5, 3),  # Reads every page, stops on the short last page
+    (3, 2, 3, 2),     # Stops as soon as max_results is reached
+    (None, 5, 5, 2),  # Full page followed by an empty page
+])
+def test_iter_listings_pages(mock_scraper, sample_listing, max_results, page_size,
+                             expected_count, expected_calls):
+    items = [dict(sample_listing, id=str(i)) for i in range(5)]
+    dataset = _mock_dataset(items)
+    mock_scraper.client = Mock()
+    mock_scraper.client.actor.return_value.start.return_value = {
+        'id': 'run_id', 'status': 'SUCCEEDED', 'defaultDatasetId': 'test_id'
+    }
+    mock_scraper.client.dataset.return_value = dataset
+
+    results = list(mock_scraper.iter_listings('London', max_results=max_results, page_size=page_size))
+
+    assert [r['id'] for r in results] == [str(i) for i in range(expected_count)]
+    assert dataset.list_items.call_count == expected_calls
+    for call in dataset.list_items.call_args_list:
+        assert call.kwargs['limit'] <= page_size
+
+
+def _running(status='RUNNING'):
+    return {'id': 'run_id', 'status': status, 'defaultDatasetId': 'test_id'}
+
+
+def test_wait_for_run_long_polls_until_finished(mock_scraper):
+    mock_scraper.client = Mock()
+    clock = [0.0]
+    statuses = iter(['RUNNING', 'SUCCEEDED'])
+
+    def long_poll(wait_secs):
+        # The server holds the request for the whole wait while the run is in progress
+        clock[0] += wait_secs
+        return _running(next(statuses))
+
+    mock_scraper.client.run.return_value.wait_for_finish.side_effect = long_poll
+    metrics = {}
+    with patch('src.scraper.time.monotonic', lambda: clock[0]), patch('src.scraper.time.sleep') as sleep:
+        run = mock_scraper.wait_for_run(_running(), timeout=100, metrics=metrics)
+
+    assert run['status'] == 'SUCCEEDED'
+    assert metrics == {'polls': 2, 'status': 'SUCCEEDED'}
+    waits = [c.kwargs['wait_secs'] for c in mock_scraper.client.run.return_value.wait_for_finish.call_args_list]
+    assert waits == [60, 40]
+    # No client-side backoff is added on top of server-side waits
+    sleep.assert_not_called()
+
+
+def test_wait_for_run_backs_off_without_long_polling(mock_scraper):
+    mock_scraper.client = Mock()
+    statuses = iter(['RUNNING', 'RUNNING', 'RUNNING', 'SUCCEEDED'])
+    mock_scraper.client.run.return_value.wait_for_finish.side_effect = lambda wait_secs: _running(next(statuses))
+
+    with patch('src.scraper.time.sleep') as sleep, patch('src.scraper.random.uniform', side_effect=lambda a, b: b):
+        run = mock_scraper.wait_for_run(_running(), timeout=60)
+
+    assert run['status'] == 'SUCCEEDED'
+    assert [c.args[0] for c in sleep.call_args_list] == [0.5, 1.0, 2.0]
+
+
+def test_wait_for_run_tolerates_transient_errors(mock_scraper):
+    mock_scraper.client = Mock()
+    responses = iter([ConnectionError('reset'), _running('SUCCEEDED')])
+
+    def flaky(wait_secs):
+        response = next(responses)
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+    mock_scraper.client.run.return_value.wait_for_finish.side_effect = flaky
+    with patch('src.scraper.time.sleep'):
+        assert mock_scraper.wait_for_run(_running(), timeout=60)['status'] == 'SUCCEEDED'
+
+    mock_scraper.client.run.return_value.wait_for_finish.side_effect = ConnectionError('reset')
+    with patch('src.scraper.time.sleep'), pytest.raises(RuntimeError, match="reset"):
+        mock_scraper.wait_for_run(_running(), timeout=60)
+
+
+def test_wait_for_run_times_out(mock_scraper):
+    mock_scraper.client = Mock()
+    mock_scraper.client.run.return_value.wait_for_finish.side_effect = lambda wait_secs: _running()
+
+    with pytest.raises(TimeoutError, match="did not finish within 0.2s"):
+        mock_scraper.wait_for_run(_running(), timeout=0.2)
+
+
+def test_iter_listings_waits_only_for_the_rest_of_the_timeout(mock_scraper):
+    mock_scraper.client = Mock()
+    clock = [0.0]
+
+    def slow_start(**kwargs):
+        # Start retries used up most of the timeout
+        clock[0] += 70
+        return _running()
+
+    def long_poll(wait_secs):
+        clock[0] += wait_secs
+        return _running()
+
+    mock_scraper.client.actor.return_value.start.side_effect = slow_start
+    mock_scraper.client.run.return_value.wait_for_finish.side_effect = long_poll
+    with patch('src.scraper.time.monotonic', lambda: clock[0]), patch('src.scraper.time.sleep'), \
+            pytest.raises(TimeoutError, match="did not finish within 100s"):
+        list(mock_scraper.iter_listings('London', timeout=100))
+
+    waits = [c.kwargs['wait_secs'] for c in mock_scraper.client.run.return_value.wait_for_finish.call_args_list]
+    assert waits == [30]
+    assert clock[0] == 100
+
+
+def test_iter_listings_reports_metrics_and_failed_runs(mock_scraper, sample_listing):
+    mock_scraper.client = Mock()
+    actor = mock_scraper.client.actor.return_value
+    actor.start.return_value = _running()
+    mock_scraper.client.run.return_value.wait_for_finish.return_value = _running('SUCCEEDED')
+    mock_scraper.client.dataset.return_value = _mock_dataset([sample_listing] * 3)
+
+    metrics = {}
+    assert len(mock_scraper.scrape_listings('London', timeout=30, metrics=metrics)) == 3
+    mock_scraper.client.actor.assert_called_with('GsNzxEKzE2vQ5d9HN')
+    assert actor.start.call_args.kwargs['timeout_secs'] == 30
+    assert metrics['run_id'] == 'run_id'
+    assert metrics['status'] == 'SUCCEEDED'
+    assert metrics['items'] == 3
+    assert 0 <= metrics['time_to_complete'] <= metrics['time_to_first_item'] <= metrics['total_seconds']
+
+    mock_scraper.client.run.return_value.wait_for_finish.return_value = _running('FAILED')
+    with pytest.raises(RuntimeError, match="finished with status FAILED"):
+        mock_scraper.scrape_listings('London')
+
+
+def test_iter_listings_empty_dataset_settles(mock_scraper):
+    mock_scraper.client = Mock()
+    mock_scraper.client.actor.return_value.start.return_value = _running('SUCCEEDED')
+    mock_scraper.client.dataset.return_value = _mock_dataset([])
+
+    with patch('src.scraper.DATASET_SETTLE_SECONDS', 0.05):
+        assert mock_scraper.scrape_listings('Nowhere') == []
+    assert mock_scraper.client.dataset.return_value.list_items.call_count >= 2
+
+
+def test_convert_to_dataframe_accepts_generator(mock_scraper, sample_listing):
+    listings = (dict(sample_listing, id=str(i)) for i in range(3))
+    df = mock_scraper.convert_to_dataframe(listings)
+
+    assert len(df) == 3
+    assert df['Price per Night'].iloc[0] == 100.0
+
+
+def test_scrape_many_isolates_failures(mock_scraper, sample_listing):
+    def fake_scrape(location, currency, max_results, timeout, metrics):
+        if location == 'Nowhere':
+            raise Exception('actor failed')
+        return [dict(sample_listing, city=location)]
+
+    with patch.object(mock_scraper, 'scrape_listings', side_effect=fake_scrape):
+        results = mock_scraper.scrape_many(['London', 'Nowhere', 'Paris', 'London'], concurrency=2)
+
+    assert list(results) == ['London', 'Nowhere', 'Paris']
+    assert results['London']['listings'][0]['city'] == 'London'
+    assert results['London']['error'] is None
+    assert results['Nowhere'] == {'listings': [], 'error': 'actor failed', 'metrics': {}}
+    assert results['Paris']['listings'][0]['city'] == 'Paris'
+
+
+def test_scrape_many_runs_in_parallel(mock_scraper):
+    barrier = threading.Barrier(3, timeout=5)
+
+    def fake_scrape(location, currency, max_results, timeout, metrics):
+        # Every call blocks until all three are running at the same time
+        barrier.wait()
+        return []
+
+    with patch.object(mock_scraper, 'scrape_listings', side_effect=fake_scrape):
+        results = mock_scraper.scrape_many(['A', 'B', 'C'], concurrency=3)
+
+    assert all(r['error'] is None for r in results.values())
+
+
+def test_scrape_many_rejects_invalid_concurrency(mock_scraper):
+    with pytest.raises(ValueError, match="concurrency must be at least 1"):
+        mock_scraper.scrape_many(['London'], concurrency=0)
+
+
+def _rowwise_dataframe(scraper, listings):
+    """Reference conversion built from the row-by-row path."""
+    rows = [row for row in (scraper._process_listing(listing) for listing in listings) if row is not None]
+    df = apply_listing_schema(pd.DataFrame(rows))
+    return df.sort_values('Price per Night', ignore_index=True)
+
+
+def test_convert_to_dataframe_matches_rowwise(mock_scraper, sample_listing):
+    variants = [
+        {},
+        {'price': {'price': '$1,250 total'}},
+        {'price': {'price': 80}},
+        {'price': {'price': None}},
+        {'price': {'label': 'free'}},
+        {'price': '$100'},
+        {'rating': None},
+        {'rating': {'guestSatisfaction': '4.5', 'reviewsCount': 3}},
+        {'rating': {'reviewsCount': 7.9}},
+        {'coordinates': {'latitude': 0, 'longitude': 1}},
+        {'coordinates': None},
+        {'personCapacity': None},
+        {'personCapacity': '6'},
+        {'personCapacity': 3.0},
+        {'subDescription': {'items': ['Studio', '3 guests', '5 guests']}},
+        {'subDescription': {'items': [2, '3 guests']}},
+        {'subDescription': {'items': [None, '3 guests']}},
+        {'isSuperHost': None, 'title': None},
+    ]
+    listings = []
+    for i, variant in enumerate(variants):
+        listing = dict(sample_listing, id=str(i), **variant)
+        if 'subDescription' in variant:
+            listing.pop('personCapacity')
+        listings.append(listing)
+
+    expected = _rowwise_dataframe(mock_scraper, listings)
+
+    pd.testing.assert_frame_equal(mock_scraper.convert_to_dataframe(listings), expected)
+    pd.testing.assert_frame_equal(mock_scraper.convert_to_dataframe(iter(listings), chunk_size=4), expected)
+
+
+def test_convert_parallel_matches_serial(mock_scraper):
+    listings = generate_listings(3000, amenities=False)
+    listings[10]['price'] = None
+    listings[20]['coordinates'] = {'latitude': 0, 'longitude': 0}
+    listings[2500]['rating'] = {'guestSatisfaction': '4.5', 'reviewsCount': 3}
+
+    serial_stats = {}
+    expected = mock_scraper.convert_to_dataframe(listings, stats=serial_stats)
+    assert serial_stats['read'] == 3000
+    assert serial_stats['rejected'] >= 2
+
+    for source in (listings, iter(listings)):
+        stats = {}
+        df = mock_scraper.convert_parallel(source, workers=2, chunk_size=700, stats=stats)
+        pd.testing.assert_frame_equal(df, expected)
+        assert stats == dict(serial_stats, batches=5)
+
+
+def test_convert_parallel_does_not_fork_beside_other_threads(mock_scraper, monkeypatch):
+    listings = generate_listings(1200, amenities=False)
+    expected = mock_scraper.convert_to_dataframe(listings)
+
+    def forked(*args):
+        raise AssertionError("forked a multithreaded process")
+
+    monkeypatch.setattr(AirbnbScraper, '_convert_forked', staticmethod(forked))
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        df = executor.submit(mock_scraper.convert_parallel, listings, 2, 500).result()
+    pd.testing.assert_frame_equal(df, expected)
+
+
+def test_convert_to_dataframe_applies_compact_schema(mock_scraper, sample_listing):
+    df = mock_scraper.convert_to_dataframe([sample_listing, dict(sample_listing, id='2', personCapacity=100000)])
+
+    for col, dtype in LISTING_SCHEMA.items():
+        assert str(df[col].dtype) == str(pd.Series(dtype=dtype).dtype), col
+    assert df['Room Type'].cat.categories.tolist() == ['Entire home/apt']
+    assert df['Capacity'].max() == 32767
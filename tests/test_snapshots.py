@@ -0,0 +1,104 @@
+import copy
+import pandas as pd
+import pytest
+from benchmarks.payloads import generate_listings
+from src.scraper import AirbnbScraper
+from src.snapshots import SnapshotStore, content_hash
+
+
+@pytest.fixture
+def scraper():
+    return AirbnbScraper(api_token="test")
+
+
+@pytest.fixture
+def store(tmp_path, scraper):
+    return SnapshotStore(scraper, str(tmp_path / "snapshots.sqlite"))
+
+
+@pytest.fixture
+def listings():
+    return generate_listings(300, seed=4, invalid_rate=0.1, amenities=False)
+
+
+def reprice(listings, count, label="$999 per night"):
+    updated = copy.deepcopy(listings)
+    for listing in updated[:count]:
+        listing["price"] = {"label": label}
+    return updated
+
+
+def test_content_hash_tracks_converted_fields(listings):
+    listing = listings[0]
+
+    assert content_hash(listing) == content_hash(copy.deepcopy(listing))
+    assert content_hash(listing) != content_hash(dict(listing, title="Renamed"))
+    assert content_hash(listing) == content_hash(dict(listing, amenities=[{"title": "Extra"}]))
+    # A missing key and an explicit None convert differently
+    assert content_hash(dict(listing, personCapacity=None)) != content_hash(
+        {k: v for k, v in listing.items() if k != "personCapacity"}
+    )
+
+
+def test_refresh_matches_convert_to_dataframe(store, scraper, listings):
+    first = store.refresh("London", listings, scraped_at=1)
+    pd.testing.assert_frame_equal(first, scraper.convert_to_dataframe(listings))
+
+    second_payload = reprice(listings, 20)[10:] + generate_listings(5, seed=99, amenities=False)
+    for index, listing in enumerate(second_payload[-5:]):
+        listing["id"] = f"new-{index}"
+    second = store.refresh("London", second_payload, scraped_at=2)
+    pd.testing.assert_frame_equal(second, scraper.convert_to_dataframe(second_payload))
+    pd.testing.assert_frame_equal(store.latest("london"), second)
+
+
+def test_refresh_keeps_last_occurrence_of_repeated_ids(store, scraper, listings):
+    valid = [listing for listing in listings if listing.get("price")][:4]
+    payload = valid + [dict(valid[1], title="Moved")]
+    df = store.refresh("London", payload, scraped_at=1)
+
+    expected = scraper.convert_to_dataframe([valid[0], valid[2], valid[3], payload[-1]])
+    pd.testing.assert_frame_equal(df, expected)
+
+
+def test_refresh_converts_only_changed_listings(store, scraper, listings, monkeypatch):
+    store.refresh("London", listings, scraped_at=1)
+
+    converted = []
+    convert = scraper.convert_to_dataframe
+    monkeypatch.setattr(scraper, "convert_to_dataframe",
+                        lambda items: converted.append(len(items)) or convert(items))
+
+    store.refresh("London", listings, scraped_at=2)
+    store.refresh("London", reprice(listings, 7), scraped_at=3)
+
+    # Unchanged and previously invalid listings are not converted again
+    assert converted == [7]
+    trend = store.price_trend("London")
+    assert trend["changed"].tolist() == [300, 0, 7]
+
+
+def test_history_and_price_trend(store, listings):
+    store.refresh("London", listings, scraped_at=100)
+    store.refresh("London", reprice(listings, 1, "$250 per night"), scraped_at=200)
+    store.refresh("London", reprice(listings, 1, "$300 per night"), scraped_at=300)
+    store.refresh("Paris", listings, scraped_at=400)
+
+    listing_id = listings[0]["id"]
+    history = store.listing_history(listing_id)
+    assert history["scraped_at"].tolist() == [100, 200, 300, 400]
+    assert history["price"].tolist()[1:3] == [250.0, 300.0]
+
+    trend = store.price_trend("LONDON ", start=150, end=300)
+    assert trend["scraped_at"].tolist() == [200, 300]
+    assert trend["avg_price"].iloc[1] > trend["avg_price"].iloc[0]
+    assert store.price_trend("Berlin").empty
+    assert store.latest("Berlin") is None
+
+
+def test_markets_and_currencies_are_separate(store, listings):
+    store.refresh("London", listings, currency="USD", scraped_at=1)
+    eur = store.refresh("London", listings[:100], currency="EUR", scraped_at=2)
+
+    assert len(store.latest("London", "USD")) > len(eur)
+    pd.testing.assert_frame_equal(store.latest("London", "EUR"), eur)
@@ -0,0 +1,63 @@
+import numpy as np
+import pytest
+from src.spatial import SpatialIndex, haversine_km, radius_bbox
+
+
+def make_points(n, seed=0):
+    rng = np.random.default_rng(seed)
+    lat = 51.5 + rng.normal(0, 0.05, n)
+    lon = -0.12 + rng.normal(0, 0.08, n)
+    lat[::97] = np.nan
+    return lat, lon
+
+
+def test_haversine_known_distance():
+    # London to Paris is about 344 km
+    assert haversine_km(51.5074, -0.1278, 48.8566, 2.3522) == pytest.approx(343.5, abs=1)
+    assert haversine_km(10.0, 20.0, 10.0, 20.0) == 0
+
+
+def test_bbox_and_radius_match_full_scan():
+    lat, lon = make_points(20000)
+    index = SpatialIndex(lat, lon)
+    rng = np.random.default_rng(1)
+
+    for _ in range(50):
+        south, north = sorted(rng.uniform(51.3, 51.7, 2))
+        west, east = sorted(rng.uniform(-0.4, 0.2, 2))
+        expected = np.flatnonzero((lat >= south) & (lat <= north) & (lon >= west) & (lon <= east))
+        np.testing.assert_array_equal(index.bbox(south, west, north, east), expected)
+
+        center, radius = (rng.uniform(51.4, 51.6), rng.uniform(-0.3, 0.1)), rng.uniform(0.1, 5)
+        distances = haversine_km(center[0], center[1], lat, lon)
+        np.testing.assert_array_equal(index.radius(*center, radius), np.flatnonzero(distances <= radius))
+
+
+def test_nearest_matches_full_scan():
+    lat, lon = make_points(5000)
+    index = SpatialIndex(lat, lon)
+    distances = np.nan_to_num(haversine_km(51.5, -0.12, lat, lon), nan=np.inf)
+
+    positions, found = index.nearest(51.5, -0.12, 25)
+    np.testing.assert_array_equal(positions, np.argsort(distances, kind="stable")[:25])
+    np.testing.assert_allclose(found, np.sort(distances)[:25])
+
+    # A point far outside the data still finds its neighbours
+    far, _ = index.nearest(0.0, 0.0, 3)
+    np.testing.assert_array_equal(far, np.argsort(np.nan_to_num(haversine_km(0, 0, lat, lon), nan=np.inf))[:3])
+    assert len(index.nearest(51.5, -0.12, 10 ** 6)[0]) == len(index)
+
+
+def test_queries_across_the_antimeridian_and_empty_index():
+    index = SpatialIndex(np.array([0.0, 0.5, 0.0]), np.array([179.9, -179.9, 0.0]))
+    south, west, north, east = radius_bbox(0.0, 180.0, 50)
+
+    assert west > east
+    np.testing.assert_array_equal(index.bbox(-1, 179, 1, -179), [0, 1])
+    np.testing.assert_array_equal(index.radius(0.0, 180.0, 50), [0])
+    np.testing.assert_array_equal(index.nearest(0.0, 179.95, 2)[0], [0, 1])
+
+    empty = SpatialIndex(np.array([]), np.array([]))
+    assert len(empty.bbox(0, 0, 1, 1)) == 0
+    assert len(empty.radius(0, 0, 10)) == 0
+    assert len(empty.nearest(0, 0, 3)[0]) == 0
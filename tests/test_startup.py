@@ -0,0 +1,19 @@
+import pytest
+from benchmarks.import_time import DEFERRED_MODULES, measure_imports
+
+
+@pytest.fixture(scope="module")
+def import_times():
+    return measure_imports("main")
+
+
+def test_app_defers_visualization_and_export_imports(import_times):
+    assert "main" in import_times
+    assert [name for name in DEFERRED_MODULES if name in import_times] == []
+
+
+def test_app_import_time_stays_below_streamlit(import_times):
+    # Measured against streamlit's own import in the same process, so the check holds on slow machines
+    app_only = import_times["main"][1] - import_times["streamlit"][1]
+
+    assert app_only < import_times["streamlit"][1]
@@ -0,0 +1,121 @@
+import json
+import logging
+import threading
+import pytest
+from src import telemetry
+from src.telemetry import record, span, trace
+
+
+@pytest.fixture(autouse=True)
+def fresh_totals():
+    telemetry.reset_totals()
+    yield
+    telemetry.reset_totals()
+
+
+def test_trace_breakdown_sums_spans_per_stage():
+    with trace("rerun") as rerun:
+        with span("filter", rows=10) as outer:
+            with span("chart", rows=4, figure="price") as inner:
+                pass
+        with span("filter") as again:
+            again.rows = 5
+            again.bytes = 100
+        record("actor_wait", 1.5)
+
+    assert inner.parent is outer and outer.parent is None
+    assert [s.name for s in rerun.spans] == ["chart", "filter", "filter", "actor_wait"]
+    by_stage = {stage["stage"]: stage for stage in rerun.breakdown()}
+    assert [stage["stage"] for stage in rerun.breakdown()] == ["chart", "filter", "actor_wait"]
+    assert by_stage["filter"]["calls"] == 2
+    assert by_stage["filter"]["rows"] == 15
+    assert by_stage["filter"]["bytes"] == 100
+    assert by_stage["chart"]["bytes"] is None
+    assert by_stage["actor_wait"]["seconds"] == 1.5
+
+
+def test_spans_outside_a_trace_only_update_totals():
+    with span("export", rows=3, bytes=42):
+        pass
+    with pytest.raises(ValueError):
+        with span("export"):
+            raise ValueError("boom")
+
+    assert telemetry.current_trace() is None
+    totals = telemetry.stage_totals()["export"]
+    assert totals["calls"] == 2
+    assert totals["errors"] == 1
+    assert totals["rows"] == 3
+    assert totals["bytes"] == 42
+
+
+def test_prometheus_text_and_file(tmp_path):
+    record("convert", 0.25, rows=100, bytes=2048)
+    record("convert", 0.5, rows=50)
+    record('odd"stage', 0.125)
+
+    text = telemetry.prometheus_text()
+    assert "# TYPE airbnb_stage_seconds_total counter" in text
+    assert 'airbnb_stage_seconds_total{stage="convert"} 0.75' in text
+    assert 'airbnb_stage_calls_total{stage="convert"} 2' in text
+    assert 'airbnb_stage_rows_total{stage="convert"} 150' in text
+    assert 'airbnb_stage_bytes_total{stage="convert"} 2048' in text
+    assert 'airbnb_stage_calls_total{stage="odd\\"stage"} 1' in text
+
+    path = tmp_path / "metrics" / "airbnb.prom"
+    telemetry.write_prometheus(str(path))
+    assert path.read_text() == text
+    assert [p.name for p in path.parent.iterdir()] == ["airbnb.prom"]
+
+
+def test_concurrent_prometheus_writes_do_not_collide(tmp_path):
+    record("convert", 0.25, rows=100)
+    path = tmp_path / "airbnb.prom"
+    errors = []
+
+    def write():
+        try:
+            for _ in range(50):
+                telemetry.write_prometheus(str(path))
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=write) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert path.read_text() == telemetry.prometheus_text()
+    assert [p.name for p in tmp_path.iterdir()] == ["airbnb.prom"]
+
+
+def test_failed_prometheus_write_leaves_no_temporary_file(tmp_path, monkeypatch):
+    def broken():
+        raise RuntimeError("render failed")
+
+    monkeypatch.setattr(telemetry, "prometheus_text", broken)
+    with pytest.raises(RuntimeError):
+        telemetry.write_prometheus(str(tmp_path / "airbnb.prom"))
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_json_log_writes_one_record_per_span(tmp_path):
+    path = tmp_path / "perf.jsonl"
+    telemetry.configure_json_log(str(path))
+    telemetry.configure_json_log(str(path))
+    try:
+        with span("map", rows=7, zoom=13):
+            pass
+        record("dataset_read", 0.5, rows=100)
+    finally:
+        for handler in list(telemetry.logger.handlers):
+            if isinstance(handler, logging.FileHandler):
+                telemetry.logger.removeHandler(handler)
+                handler.close()
+
+    records = [json.loads(line) for line in path.read_text().splitlines()]
+    assert [(r["stage"], r["rows"]) for r in records] == [("map", 7), ("dataset_read", 100)]
+    assert records[0]["zoom"] == 13
+    assert records[1]["seconds"] == 0.5
@@ -2,6 +2,9 @@ import pytest
 import pandas as pd
 from src.utils import (
     format_currency,
+    format_bytes,
+    dataframe_memory,
+    filter_listings,
     calculate_market_metrics,
     prepare_amenities_analysis,
     calculate_price_ranges
@@ -13,6 +16,31 @@ def test_format_currency():
     assert format_currency(100.50, "GBP") == "£100.50"
     assert format_currency(100.50, "XXX") == "$100.50"  # Default to USD
 
+def test_format_bytes():
+    assert format_bytes(512) == "512.0 B"
+    assert format_bytes(2048) == "2.0 KB"
+    assert format_bytes(5 * 1024 ** 2) == "5.0 MB"
+    assert format_bytes(3 * 1024 ** 3) == "3.0 GB"
+
+def test_dataframe_memory_counts_string_contents():
+    short = pd.DataFrame({"Title": ["a"] * 100})
+    long = pd.DataFrame({"Title": ["a" * 1000] * 100})
+    assert dataframe_memory(long) > dataframe_memory(short) + 90000
+
+def test_filter_listings():
+    df = pd.DataFrame({
+        "Price per Night": [50.0, 100.0, 150.0, 200.0],
+        "Overall Rating": pd.Series([4.0, 4.7, 4.9, 4.2], dtype="float32"),
+        "Room Type": ["Private room", "Entire home", "Entire home", "Entire home"],
+        "Superhost": [False, True, True, False],
+        "Capacity": [1, 2, 4, 6]
+    })
+
+    assert len(filter_listings(df, (0, 500), 0.0, ["Private room", "Entire home"])) == 4
+    assert filter_listings(df, (75, 175), 0.0, ["Entire home"])["Price per Night"].tolist() == [100.0, 150.0]
+    assert filter_listings(df, (0, 500), 4.7, ["Private room", "Entire home"])["Price per Night"].tolist() == [100.0, 150.0]
+    assert filter_listings(df, (0, 500), 0.0, ["Entire home"], superhost_only=True, min_guests=3)["Price per Night"].tolist() == [150.0]
+
 def test_calculate_market_metrics():
     # Create sample DataFrame
     data = {